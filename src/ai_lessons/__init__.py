@@ -15,6 +15,7 @@ from .core import (
     # Lessons
     add_lesson,
     get_lesson,
+    get_lessons,
     update_lesson,
     delete_lesson,
     recall,
@@ -22,6 +23,7 @@ from .core import (
     link_lessons,
     unlink_lessons,
     list_tags,
+    list_tag_columns,
     list_sources,
     list_confidence_levels,
     # Resources and chunks
@@ -36,6 +38,7 @@ __all__ = [
     # Lessons
     "add_lesson",
     "get_lesson",
+    "get_lessons",
     "update_lesson",
     "delete_lesson",
     "recall",
@@ -43,6 +46,7 @@ __all__ = [
     "link_lessons",
     "unlink_lessons",
     "list_tags",
+    "list_tag_columns",
     "list_sources",
     "list_confidence_levels",
     # Resources and chunks
@@ -9,7 +9,7 @@ import click
 
 from .. import core
 from ..config import get_config, DEFAULT_LESSONS_DIR
-from ..db import init_db, get_db
+from ..db import fetch_column, init_db, get_db, quantize_embeddings
 from .display import ID_DISPLAY_LENGTH, format_rule
 from .utils import parse_tags
 
@@ -108,27 +108,46 @@ def approve_rule(rule_id: str, approved_by: Optional[str]):
 
 @admin.command("reindex")
 def reindex_resources():
-    """Reindex all resources (re-generate embeddings)."""
+    """Re-embed all resources and their chunks with the configured model.
+
+    Changed source files update the stored content, but are not re-chunked;
+    re-import a resource to rebuild its chunks.
+    """
     config = get_config()
     core.ensure_initialized(config)
 
     with get_db(config) as conn:
-        cursor = conn.execute("SELECT id FROM resources")
-        resource_ids = [row["id"] for row in cursor.fetchall()]
+        resource_ids = fetch_column(conn, "SELECT id FROM resources")
 
     if not resource_ids:
         click.echo("No resources to reindex.")
         return
 
     count = 0
-    with click.progressbar(resource_ids, label="Reindexing resources") as bar:
-        for resource_id in bar:
-            if core.refresh_resource(resource_id):
-                count += 1
+    batch_size = core.REINDEX_BATCH_SIZE
+    with click.progressbar(length=len(resource_ids), label="Reindexing resources") as bar:
+        for start in range(0, len(resource_ids), batch_size):
+            batch = resource_ids[start:start + batch_size]
+            count += core.reindex_resources(batch, config)
+            bar.update(len(batch))
 
     click.echo(f"Reindexed {count} resources.")
 
 
+@admin.command("quantize-embeddings")
+def quantize_embeddings_cmd():
+    """Convert stored float32 embeddings to int8 (4x smaller, no re-embedding)."""
+    config = get_config()
+    try:
+        count = quantize_embeddings(config)
+    except ValueError as e:
+        click.echo(str(e), err=True)
+        sys.exit(1)
+
+    click.echo(f"Quantized {count} embeddings to int8.")
+    click.echo("Set 'embedding.storage: int8' in your config to use the database.")
+
+
 @admin.command("generate-summaries")
 @click.option("--resource-id", "-r", help="Generate summaries for a specific resource by ID")
 @click.option("--pattern", "-p", help="Filter resources by title (case-insensitive substring)")
@@ -399,8 +418,7 @@ def clear_resources(
             # Delete edges involving this resource (resource_anchors cascade deletes)
             conn.execute("DELETE FROM edges WHERE (from_id = ? AND from_type = 'resource') OR (to_id = ? AND to_type = 'resource')", (resource.id, resource.id))
 
-            cursor = conn.execute("SELECT id FROM resource_chunks WHERE resource_id = ?", (resource.id,))
-            chunk_ids = [row["id"] for row in cursor.fetchall()]
+            chunk_ids = fetch_column(conn, "SELECT id FROM resource_chunks WHERE resource_id = ?", (resource.id,))
             for chunk_id in chunk_ids:
                 conn.execute("DELETE FROM chunk_embeddings WHERE chunk_id = ?", (chunk_id,))
 
@@ -10,6 +10,7 @@ import click
 
 from .. import core
 from ..config import get_config
+from ..db import transaction
 from .display import ID_DISPLAY_LENGTH, display_chunking_preview
 from .utils import determine_root_dir, generate_title, parse_tags, warn_deprecation
 
@@ -81,21 +82,22 @@ def add(
             sys.exit(1)
 
     if entity_type == "lesson":
-        # Validate lesson-specific requirements
-        lesson_id = core.add_lesson(
-            title=title,
-            content=content,
-            tags=parse_tags(tags),
-            contexts=list(contexts) if contexts else None,
-            anti_contexts=list(anti_contexts) if anti_contexts else None,
-            confidence=confidence,
-            source=source,
-            source_notes=source_notes,
-        )
-
-        # Create links to resources
-        for resource_id in linked_resources:
-            core.link_lesson_to_resource(lesson_id, resource_id)
+        # Add the lesson and its resource links in one commit
+        with transaction():
+            lesson_id = core.add_lesson(
+                title=title,
+                content=content,
+                tags=parse_tags(tags),
+                contexts=list(contexts) if contexts else None,
+                anti_contexts=list(anti_contexts) if anti_contexts else None,
+                confidence=confidence,
+                source=source,
+                source_notes=source_notes,
+            )
+
+            # Create links to resources
+            for resource_id in linked_resources:
+                core.link_lesson_to_resource(lesson_id, resource_id)
 
         click.echo(f"Added lesson: {lesson_id}")
         if linked_resources:
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import subprocess
 import sys
+from pathlib import Path
 from typing import Optional
 
 import click
@@ -241,9 +242,15 @@ def show(id: str, verbose: bool, type_hint: Optional[str]):
             click.echo()
             click.echo("---")
             click.echo("Linked resources:")
+            resources = {
+                resource.id: resource
+                for resource in core.get_resources(
+                    [link.resolved_resource_id for link in links if link.resolved_resource_id]
+                )
+            }
             for link in links:
                 if link.resolved_resource_id:
-                    resource = core.get_resource(link.resolved_resource_id)
+                    resource = resources.get(link.resolved_resource_id)
                     if resource:
                         target = f"[{link.resolved_resource_id[:ID_DISPLAY_LENGTH]}] {resource.title}"
                     else:
@@ -335,13 +342,21 @@ def related(id: str, depth: int, relation: tuple, bidirectional: bool):
             click.echo(f"Resource not found: {id}", err=True)
             sys.exit(1)
 
+        linked = {
+            linked_resource.id: linked_resource
+            for linked_resource in core.get_resources(
+                [link.resolved_resource_id for link in outgoing if link.resolved_resource_id]
+                + [link.from_resource_id for link in incoming]
+            )
+        }
+
         has_any = False
         if outgoing:
             has_any = True
             click.echo(f"Links from \"{resource.title}\":")
             for link in outgoing:
                 if link.resolved_resource_id:
-                    target = core.get_resource(link.resolved_resource_id)
+                    target = linked.get(link.resolved_resource_id)
                     if target:
                         click.echo(f"  -> [{link.resolved_resource_id[:ID_DISPLAY_LENGTH]}] {target.title}")
                     else:
@@ -354,7 +369,7 @@ def related(id: str, depth: int, relation: tuple, bidirectional: bool):
             has_any = True
             click.echo(f"Links to \"{resource.title}\":")
             for link in incoming:
-                source = core.get_resource(link.from_resource_id)
+                source = linked.get(link.from_resource_id)
                 if source:
                     click.echo(f"  <- [{link.from_resource_id[:ID_DISPLAY_LENGTH]}] {source.title}")
                 else:
@@ -374,8 +389,11 @@ def related(id: str, depth: int, relation: tuple, bidirectional: bool):
         if rule.linked_lessons:
             has_any = True
             click.echo(f"Linked lessons ({len(rule.linked_lessons)}):")
+            linked_lessons_by_id = {
+                lesson.id: lesson for lesson in core.get_lessons(rule.linked_lessons)
+            }
             for lesson_id in rule.linked_lessons:
-                lesson = core.get_lesson(lesson_id)
+                lesson = linked_lessons_by_id.get(lesson_id)
                 if lesson:
                     click.echo(f"  -> [{lesson_id[:ID_DISPLAY_LENGTH]}] {lesson.title}")
                 else:
@@ -385,8 +403,11 @@ def related(id: str, depth: int, relation: tuple, bidirectional: bool):
         if rule.linked_resources:
             has_any = True
             click.echo(f"Linked resources ({len(rule.linked_resources)}):")
+            linked_resources_by_id = {
+                resource.id: resource for resource in core.get_resources(rule.linked_resources)
+            }
             for resource_id in rule.linked_resources:
-                resource = core.get_resource(resource_id)
+                resource = linked_resources_by_id.get(resource_id)
                 if resource:
                     click.echo(f"  -> [{resource_id[:ID_DISPLAY_LENGTH]}] {resource.title}")
                 else:
@@ -568,7 +589,6 @@ def run_resource(resource_id: str, args: tuple):
         click.echo("Error: Script has no path", err=True)
         sys.exit(1)
 
-    from pathlib import Path
     if not Path(resource.path).exists():
         click.echo(f"Error: Script file not found: {resource.path}", err=True)
         sys.exit(1)
@@ -5,7 +5,7 @@ from __future__ import annotations
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import yaml
 
@@ -24,6 +24,7 @@ class EmbeddingConfig:
     model: str = "all-MiniLM-L6-v2"
     api_key: Optional[str] = None
     dimensions: Optional[int] = None  # Auto-detected if not specified
+    storage: str = "float32"  # "float32" or "int8" (quantized, 4x smaller)
 
     def __post_init__(self):
         # Resolve environment variables in api_key
@@ -31,6 +32,11 @@ class EmbeddingConfig:
             env_var = self.api_key[2:-1]
             self.api_key = os.environ.get(env_var)
 
+        if self.storage not in ("float32", "int8"):
+            raise ValueError(
+                f"Unknown embedding storage: {self.storage} (expected 'float32' or 'int8')"
+            )
+
         # Default dimensions based on model
         if self.dimensions is None:
             self.dimensions = self._default_dimensions()
@@ -88,6 +94,10 @@ class Config:
     known_tags: list[str] = field(default_factory=list)
     suggest_feedback: bool = True  # Show feedback reminder after commands
 
+    def __post_init__(self):
+        # Normalize once here so tag resolution is a plain dict lookup
+        self.tag_aliases = _normalize_tag_aliases(self.tag_aliases)
+
     @classmethod
     def load(cls, config_path: Optional[Path] = None) -> "Config":
         """Load configuration from YAML file."""
@@ -107,6 +117,7 @@ class Config:
             model=embedding_data.get("model", "all-MiniLM-L6-v2"),
             api_key=embedding_data.get("api_key"),
             dimensions=embedding_data.get("dimensions"),
+            storage=embedding_data.get("storage", "float32"),
         )
 
         # Parse search config
@@ -135,7 +146,7 @@ class Config:
             embedding=embedding,
             search=search,
             summaries=summaries,
-            tag_aliases=data.get("tag_aliases", {}),
+            tag_aliases=data.get("tag_aliases") or {},
             known_tags=data.get("known_tags", []),
             suggest_feedback=data.get("suggest_feedback", True),
         )
@@ -147,7 +158,7 @@ class Config:
 
         config_path.parent.mkdir(parents=True, exist_ok=True)
 
-        data = {
+        data: dict[str, Any] = {
             "embedding": {
                 "backend": self.embedding.backend,
                 "model": self.embedding.model,
@@ -163,6 +174,8 @@ class Config:
             data["embedding"]["api_key"] = self.embedding.api_key
         if self.embedding.dimensions:
             data["embedding"]["dimensions"] = self.embedding.dimensions
+        if self.embedding.storage != "float32":
+            data["embedding"]["storage"] = self.embedding.storage
 
         # Add summaries config if configured
         if self.summaries.enabled:
@@ -186,6 +199,19 @@ class Config:
             yaml.dump(data, f, default_flow_style=False, sort_keys=False)
 
 
+def _normalize_tag_aliases(aliases: dict) -> dict[str, str]:
+    """Normalize alias keys and targets the way tags are normalized.
+
+    Done once when a Config is built (loaded or constructed directly), so
+    resolving a tag is a single dict lookup and hand-written keys like "JS"
+    still match.
+    """
+    return {
+        str(alias).lower().strip(): str(canonical).lower().strip()
+        for alias, canonical in aliases.items()
+    }
+
+
 # Global config instance (lazy loaded)
 _config: Optional[Config] = None
 
@@ -2,33 +2,48 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-import sqlite3
-import struct
+import os
 import subprocess
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
-
-from ulid import ULID
+from typing import Any, Optional, Sequence, TYPE_CHECKING
 
 from . import __version__
 from .config import Config, get_config
-from .db import get_db, init_db
-from .embeddings import embed_text
+from .db import (
+    begin_write,
+    bulk_insert_embeddings,
+    fetch_column,
+    get_db,
+    in_placeholders,
+    init_db,
+    transaction,
+    vector_param,
+)
+from .embeddings import embed_batch_array, serialize_embedding
 from .links import (
     ExtractedLink,
+    build_chunk_index,
+    chunk_position_for_line,
     extract_links,
     find_chunk_for_line,
     resolve_fragment_to_chunk,
     resolve_link_to_resource,
 )
 from .chunk_ids import generate_chunk_id, parse_chunk_id
+from .chunking import ChunkingConfig, chunk_document
+from .schema import SCHEMA_VERSION
 from .search import SearchResult, hybrid_search, keyword_search, vector_search
 
 if TYPE_CHECKING:
-    from .chunking import ChunkingConfig, ChunkingResult
+    from .chunking import Chunk, ChunkingResult
 
 
 # Unified entity table mappings for tags and embeddings
@@ -75,7 +90,7 @@ def generate_entity_id(entity_type: str) -> str:
         raise ValueError(f"Invalid entity_type: {entity_type}. Must be one of: {list(prefix_map.keys())}")
 
     prefix = prefix_map[entity_type]
-    return f"{prefix}{ULID()}"
+    return f"{prefix}{_generate_id()}"
 
 
 def parse_entity_id(id_str: str) -> tuple[str, str]:
@@ -119,7 +134,7 @@ def parse_entity_id(id_str: str) -> tuple[str, str]:
     return (prefix_map[prefix], base_id)
 
 
-@dataclass
+@dataclass(slots=True)
 class Lesson:
     """A lesson with all its metadata.
 
@@ -132,20 +147,12 @@ class Lesson:
     confidence: Optional[str] = None
     source: Optional[str] = None
     source_notes: Optional[str] = None
-    tags: list[str] = None
-    contexts: list[str] = None
-    anti_contexts: list[str] = None
+    tags: list[str] = field(default_factory=list)
+    contexts: list[str] = field(default_factory=list)
+    anti_contexts: list[str] = field(default_factory=list)
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    def __post_init__(self):
-        if self.tags is None:
-            self.tags = []
-        if self.contexts is None:
-            self.contexts = []
-        if self.anti_contexts is None:
-            self.anti_contexts = []
-
 
 @dataclass
 class Resource:
@@ -225,7 +232,7 @@ class Rule:
             self.linked_resources = []
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceType:
     """A source type with its metadata."""
     name: str
@@ -234,7 +241,7 @@ class SourceType:
     count: int = 0  # Optional usage count
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfidenceLevel:
     """A confidence level with its ordinal."""
     name: str
@@ -242,7 +249,7 @@ class ConfidenceLevel:
     count: int = 0  # Optional usage count
 
 
-@dataclass
+@dataclass(slots=True)
 class Tag:
     """A tag with optional count."""
     name: str
@@ -282,42 +289,181 @@ class ResourceLink:
     resolved_chunk_id: Optional[str] = None
 
 
+# Databases this process has already initialized: (path, device, inode,
+# embedding dimensions, embedding storage)
+_initialized_databases: set[tuple] = set()
+
+
 def ensure_initialized(config: Optional[Config] = None) -> None:
-    """Ensure the database is initialized and migrated."""
+    """Ensure the database is initialized and migrated.
+
+    init_db() runs the whole schema script, the migration check and the
+    vector table checks, so it only runs once per database file and
+    embedding settings per process. A file's identity can outlive its
+    contents (a backup copied over it keeps the inode, and a deleted file's
+    inode number may be reused at once), so each call also reads the
+    file's schema version and runs init_db() again if it is behind.
+    """
     if config is None:
         config = get_config()
-    # Always call init_db - it handles both new DBs and migrations
+
+    key = _database_key(config)
+    if key is not None and key in _initialized_databases:
+        with get_db(config) as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        _initialized_databases.discard(key)
+
+    # init_db handles both new DBs and migrations
     init_db(config)
 
+    key = _database_key(config)
+    if key is not None:
+        _initialized_databases.add(key)
+
+
+def _database_key(config: Config) -> Optional[tuple]:
+    """Identify a database file and the embedding settings it is used with."""
+    try:
+        st = os.stat(config.db_path)
+    except OSError:
+        return None
+    return (
+        str(config.db_path),
+        st.st_dev,
+        st.st_ino,
+        config.embedding.dimensions,
+        config.embedding.storage,
+    )
+
+
+def _column_changes(**columns) -> dict[str, object]:
+    """Keep the column values that were actually given (not None), in order."""
+    return {column: value for column, value in columns.items() if value is not None}
+
+
+@lru_cache(maxsize=64)
+def _update_sql(table: str, columns: tuple[str, ...]) -> str:
+    """Build an UPDATE setting columns (and updated_at) for one row by id.
+
+    Memoized per (table, columns) shape, so repeated updates of the same
+    fields reuse one SQL string and hit the statement cache.
+    """
+    sets = "".join(f"{column} = ?, " for column in columns)
+    return f"UPDATE {table} SET {sets}updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+
+@lru_cache(maxsize=4096)
+def _normalize_tag(tag: str) -> str:
+    """Normalize a tag for comparison (lowercase, surrounding whitespace removed).
+
+    Memoized because the same tag strings recur on nearly every add, update,
+    and search call.
+    """
+    return tag.lower().strip()
+
 
 def _resolve_tag_aliases(tags: list[str], config: Config) -> list[str]:
-    """Resolve tag aliases to canonical forms."""
+    """Resolve tag aliases to canonical forms, deduplicated in first-seen order."""
+    # Aliases are looked up live, so config reloads need no invalidation
+    aliases = config.tag_aliases
+    seen: set[str] = set()
     resolved = []
     for tag in tags:
-        tag_lower = tag.lower().strip()
-        # Check aliases
-        canonical = config.tag_aliases.get(tag_lower, tag_lower)
-        resolved.append(canonical)
-    return list(set(resolved))  # Deduplicate
+        tag_lower = _normalize_tag(tag)
+        canonical = aliases.get(tag_lower, tag_lower)
+        if canonical not in seen:
+            seen.add(canonical)
+            resolved.append(canonical)
+    return resolved
+
+
+# Crockford base32 (the ULID alphabet), as every two-character pair so a
+# 128-bit ULID encodes in 13 lookups of 10 bits each
+_ULID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID_PAIRS = [a + b for a in _ULID_ALPHABET for b in _ULID_ALPHABET]
+_ULID_SHIFTS = tuple(range(120, -1, -10))
+_ulid_lock = threading.Lock()
+_last_ulid_ms = 0
+_last_ulid_random = 0
 
 
 def _generate_id() -> str:
-    """Generate a new ULID.
+    """Generate a new monotonic ULID.
 
     ULIDs (Universally Unique Lexicographically Sortable Identifiers) provide:
     - Time-ordered sorting (first 48 bits encode timestamp)
     - 80 bits of randomness for uniqueness
     - URL-safe, case-insensitive representation
 
+    IDs generated within the same millisecond reuse the previous random
+    part plus one, so they still sort in creation order (e.g. lessons from
+    one add_lessons_batch() call) and skip the urandom call.
+
     Returns:
         26-character ULID string.
     """
-    return str(ULID())
+    global _last_ulid_ms, _last_ulid_random
+
+    ms = time.time_ns() // 1_000_000
+    with _ulid_lock:
+        if ms > _last_ulid_ms:
+            random_part = int.from_bytes(os.urandom(10), "big")
+        elif _last_ulid_random < (1 << 80) - 1:
+            # Same millisecond (or the clock stepped back): count up
+            ms = _last_ulid_ms
+            random_part = _last_ulid_random + 1
+        else:
+            # Random part exhausted within one millisecond: borrow the next
+            ms = _last_ulid_ms + 1
+            random_part = int.from_bytes(os.urandom(10), "big")
+        _last_ulid_ms, _last_ulid_random = ms, random_part
+
+    value = (ms << 80) | random_part
+    return "".join([_ULID_PAIRS[(value >> shift) & 1023] for shift in _ULID_SHIFTS])
 
 
 # --- Tag Helpers ---
 
 
+MULTI_INSERT_MAX_ROWS = 16
+
+
+def _multi_insert(
+    conn, sql_prefix: str, rows: list[tuple], sql_suffix: str = ""
+) -> None:
+    """Insert rows using multi-row VALUES statements.
+
+    Small row lists are written as one ``VALUES (...), (...)`` statement per
+    power-of-two slice (e.g. 7 rows -> 4 + 2 + 1), so only a handful of
+    distinct statements ever reach the statement cache. Lists longer than
+    MULTI_INSERT_MAX_ROWS fall back to executemany.
+
+    Args:
+        conn: Database connection (within transaction).
+        sql_prefix: Statement up to and including ``VALUES``.
+        rows: Parameter tuples, all of the same length.
+        sql_suffix: Clause after the values (e.g. ``ON CONFLICT DO NOTHING``).
+    """
+    if not rows:
+        return
+    row_sql = "(" + ",".join("?" * len(rows[0])) + ")"
+    if len(rows) > MULTI_INSERT_MAX_ROWS:
+        conn.executemany(f"{sql_prefix} {row_sql} {sql_suffix}", rows)
+        return
+
+    start = 0
+    while start < len(rows):
+        size = 1 << ((len(rows) - start).bit_length() - 1)
+        chunk = rows[start:start + size]
+        conn.execute(
+            f"{sql_prefix} {','.join([row_sql] * size)} {sql_suffix}",
+            [value for row in chunk for value in row],
+        )
+        start += size
+
+
 def _save_tags(
     conn,
     entity_id: str,
@@ -340,8 +486,9 @@ def _save_tags(
         raise ValueError(f"Entity type '{entity_type}' does not support tags")
 
     table, id_col = entity_info['tags']
-    conn.executemany(
-        f"INSERT INTO {table} ({id_col}, tag) VALUES (?, ?)",
+    _multi_insert(
+        conn,
+        f"INSERT INTO {table} ({id_col}, tag) VALUES",
         [(entity_id, tag) for tag in tags],
     )
 
@@ -366,6 +513,38 @@ def _delete_tags(
     conn.execute(f"DELETE FROM {table} WHERE {id_col} = ?", (entity_id,))
 
 
+def _replace_tags(
+    conn,
+    entity_id: str,
+    entity_type: str,
+    tags: Optional[list[str]],
+) -> None:
+    """Replace an entity's tags, writing only the rows that changed.
+
+    Args:
+        conn: Database connection (within transaction).
+        entity_id: ID of the entity.
+        entity_type: One of 'lesson', 'resource', 'rule'.
+        tags: The complete new tag list (None or empty removes all tags).
+    """
+    entity_info = ENTITY_TABLE_MAP.get(entity_type)
+    if entity_info is None or 'tags' not in entity_info:
+        raise ValueError(f"Entity type '{entity_type}' does not support tags")
+
+    table, id_col = entity_info['tags']
+    current = set(_get_tags(conn, entity_id, entity_type))
+    wanted = dict.fromkeys(tags or [])
+
+    removed = [tag for tag in current if tag not in wanted]
+    if removed:
+        placeholders = ",".join("?" * len(removed))
+        conn.execute(
+            f"DELETE FROM {table} WHERE {id_col} = ? AND tag IN ({placeholders})",
+            [entity_id, *removed],
+        )
+    _save_tags(conn, entity_id, entity_type, [tag for tag in wanted if tag not in current])
+
+
 def _get_tags(
     conn,
     entity_id: str,
@@ -386,11 +565,7 @@ def _get_tags(
         raise ValueError(f"Entity type '{entity_type}' does not support tags")
 
     table, id_col = entity_info['tags']
-    cursor = conn.execute(
-        f"SELECT tag FROM {table} WHERE {id_col} = ?",
-        (entity_id,),
-    )
-    return [row["tag"] for row in cursor.fetchall()]
+    return fetch_column(conn, f"SELECT tag FROM {table} WHERE {id_col} = ?", (entity_id,))
 
 
 # --- Property Fetch Helpers ---
@@ -428,12 +603,89 @@ def _fetch_lesson_properties(
     return tags, contexts, anti_contexts
 
 
+def _split_concat(value: Optional[str]) -> list[str]:
+    """Split a group_concat(..., char(31)) column back into a list.
+
+    char(31) (ASCII unit separator) is used as the delimiter because it
+    does not occur in tags, contexts, versions, or IDs.
+    """
+    return value.split("\x1f") if value else []
+
+
+def _values_rows(params: list) -> str:
+    """Build ``(?),(?),...`` rows for a single-column ``VALUES`` list."""
+    return ",".join(["(?)"] * len(params))
+
+
+def _fetch_lessons(conn, lesson_ids: list[str]) -> list[Lesson]:
+    """Fetch several lessons with their tags and contexts.
+
+    Lessons, tags, contexts, and anti-contexts come back in a single query
+    regardless of how many lessons are requested.
+
+    Args:
+        conn: Database connection.
+        lesson_ids: IDs of the lessons to fetch.
+
+    Returns:
+        Lessons in the order of lesson_ids; IDs that don't exist are skipped.
+    """
+    if not lesson_ids:
+        return []
+
+    placeholders, params = in_placeholders(lesson_ids)
+
+    # Plain tuples: the column order below matches Lesson's fields, so rows
+    # are unpacked positionally instead of looked up by name
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(
+        f"""
+        SELECT l.id, l.title, l.content, l.confidence, l.source, l.source_notes,
+            (SELECT group_concat(tag, char(31)) FROM lesson_tags
+             WHERE lesson_id = l.id) AS tag_list,
+            (SELECT group_concat(context, char(31)) FROM lesson_contexts
+             WHERE lesson_id = l.id AND applies) AS context_list,
+            (SELECT group_concat(context, char(31)) FROM lesson_contexts
+             WHERE lesson_id = l.id AND NOT applies) AS anti_context_list,
+            l.created_at, l.updated_at
+        FROM lessons l
+        WHERE l.id IN ({placeholders})
+        """,
+        params,
+    )
+    rows = {row[0]: row for row in cursor.fetchall()}
+
+    lessons = []
+    for lid in lesson_ids:
+        row = rows.get(lid)
+        if row is None:
+            continue
+        (id_, title, content, confidence, source, source_notes,
+         tag_list, context_list, anti_context_list, created_at, updated_at) = row
+        lessons.append(Lesson(
+            id_, title, content, confidence, source, source_notes,
+            _split_concat(tag_list),
+            _split_concat(context_list),
+            _split_concat(anti_context_list),
+            created_at,
+            updated_at,
+        ))
+    return lessons
+
+
 # --- Embedding Helpers ---
 
 
 # Conservative chars-per-token estimate for truncation (lower = safer)
 CHARS_PER_TOKEN_CONSERVATIVE = 3.5
 
+# Serialized embeddings keyed by (backend, model, content digest), so
+# re-ingesting or re-saving unchanged text skips the embedding model
+EMBEDDING_CACHE_SIZE = 2048
+_embedding_cache: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
 
 def _truncate_for_embedding(text: Optional[str], max_tokens: int = 7500) -> str:
     """Truncate text to fit within embedding token limit.
@@ -468,36 +720,124 @@ def _truncate_for_embedding(text: Optional[str], max_tokens: int = 7500) -> str:
     return truncated + "\n\n[Content truncated for embedding - see chunks for full content]"
 
 
-def _store_embedding(
+def _embedding_text(title: str, content: str) -> str:
+    """Build the text embedded for a titled entity (lesson or resource).
+
+    Every add/update path goes through here so identical entities produce
+    identical text, and therefore hit the embedding cache.
+    """
+    return "\n\n".join((title, content))
+
+
+def _embed_for_storage(text: str, config: Config) -> bytes:
+    """Generate an embedding for text and serialize it for storage.
+
+    Callers should do this before opening their write transaction, so the
+    database is not locked while the embedding model runs.
+
+    Args:
+        text: Text to embed (truncated to fit the embedding model).
+        config: Configuration for embedding model.
+
+    Returns:
+        Serialized float32 embedding.
+    """
+    # Truncate text if needed to fit within embedding model limits
+    # This is primarily for resource-level embeddings of large documents
+    truncated_text = _truncate_for_embedding(text)
+
+    key = _embedding_cache_key(truncated_text, config)
+    embedding_blob = _get_cached_embedding(key)
+    if embedding_blob is None:
+        embedding_blob = serialize_embedding(embed_batch_array([truncated_text], config)[0])
+        _cache_embedding(key, embedding_blob)
+    return embedding_blob
+
+
+def _embed_many_for_storage(
+    texts: list[str],
+    config: Config,
+    batch_size: int = 64,
+) -> list[bytes]:
+    """Generate serialized embeddings for many texts in batched backend calls.
+
+    Cached texts are skipped. The rest are sorted by length before being
+    split into batches of batch_size, so texts of similar length share a
+    batch and little of each forward pass is spent on padding.
+
+    Args:
+        texts: Texts to embed (each truncated to fit the embedding model).
+        config: Configuration for embedding model.
+        batch_size: Maximum number of texts per embedding backend call.
+
+    Returns:
+        Serialized float32 embeddings in the same order as texts.
+    """
+    truncated = [_truncate_for_embedding(text) for text in texts]
+    keys = [_embedding_cache_key(text, config) for text in truncated]
+    embedding_blobs = [_get_cached_embedding(key) for key in keys]
+    missing = sorted(
+        (i for i, blob in enumerate(embedding_blobs) if blob is None),
+        key=lambda i: len(truncated[i]),
+    )
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        embeddings = embed_batch_array([truncated[i] for i in batch], config)
+        for i, embedding in zip(batch, embeddings):
+            embedding_blob = serialize_embedding(embedding)
+            _cache_embedding(keys[i], embedding_blob)
+            embedding_blobs[i] = embedding_blob
+    # Every cache miss was filled above, so nothing is dropped here
+    return [blob for blob in embedding_blobs if blob is not None]
+
+
+def _embedding_cache_key(text: str, config: Config) -> tuple[str, str, str]:
+    """Build the embedding cache key for already-truncated text."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return (config.embedding.backend, config.embedding.model, digest)
+
+
+def _get_cached_embedding(key: tuple[str, str, str]) -> Optional[bytes]:
+    """Return a cached serialized embedding, or None on a miss."""
+    with _embedding_cache_lock:
+        embedding_blob = _embedding_cache.get(key)
+        if embedding_blob is not None:
+            _embedding_cache.move_to_end(key)
+        return embedding_blob
+
+
+def _cache_embedding(key: tuple[str, str, str], embedding_blob: bytes) -> None:
+    """Add a serialized embedding to the cache, evicting the oldest entry."""
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding_blob
+        _embedding_cache.move_to_end(key)
+        if len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+            _embedding_cache.popitem(last=False)
+
+
+def _insert_embedding(
     conn,
     entity_id: str,
     entity_type: str,
-    text: str,
+    embedding_blob: bytes,
     config: Config,
 ) -> None:
-    """Generate and store embedding for an entity.
+    """Store a pre-computed embedding for an entity.
 
     Args:
         conn: Database connection (within transaction).
         entity_id: ID of the entity.
         entity_type: One of 'lesson', 'resource', 'chunk'.
-        text: Text to embed.
-        config: Configuration for embedding model.
+        embedding_blob: Serialized embedding from _embed_for_storage().
+        config: Configuration for embedding storage.
     """
-    # Truncate text if needed to fit within embedding model limits
-    # This is primarily for resource-level embeddings of large documents
-    truncated_text = _truncate_for_embedding(text)
-
-    embedding = embed_text(truncated_text, config)
-    embedding_blob = struct.pack(f"{len(embedding)}f", *embedding)
-
     entity_info = ENTITY_TABLE_MAP.get(entity_type)
     if entity_info is None or 'embeddings' not in entity_info:
         raise ValueError(f"Entity type '{entity_type}' does not support embeddings")
 
     table, id_col = entity_info['embeddings']
     conn.execute(
-        f"INSERT INTO {table} ({id_col}, embedding) VALUES (?, ?)",
+        f"INSERT INTO {table} ({id_col}, embedding) VALUES (?, {vector_param(config)})",
         (entity_id, embedding_blob),
     )
 
@@ -555,57 +895,21 @@ def add_lesson(
     Raises:
         ValueError: If title or content is empty.
     """
-    # Input validation
-    if not title or not title.strip():
-        raise ValueError("Lesson title cannot be empty")
-    if not content or not content.strip():
-        raise ValueError("Lesson content cannot be empty")
-
-    if config is None:
-        config = get_config()
-
-    ensure_initialized(config)
-
-    # Resolve tag aliases
-    if tags:
-        tags = _resolve_tag_aliases(tags, config)
-
-    # Generate ID
-    lesson_id = generate_entity_id("lesson")
-
-    with get_db(config) as conn:
-        # Insert lesson
-        conn.execute(
-            """
-            INSERT INTO lessons (id, title, content, confidence, source, source_notes)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (lesson_id, title, content, confidence, source, source_notes),
-        )
-
-        # Insert tags
-        _save_tags(conn, lesson_id, 'lesson', tags)
-
-        # Insert contexts
-        if contexts:
-            conn.executemany(
-                "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, TRUE)",
-                [(lesson_id, ctx) for ctx in contexts],
-            )
-
-        # Insert anti-contexts
-        if anti_contexts:
-            conn.executemany(
-                "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, FALSE)",
-                [(lesson_id, ctx) for ctx in anti_contexts],
+    return add_lessons_batch(
+        [
+            LessonInput(
+                title=title,
+                content=content,
+                tags=tags,
+                contexts=contexts,
+                anti_contexts=anti_contexts,
+                confidence=confidence,
+                source=source,
+                source_notes=source_notes,
             )
-
-        # Insert embedding
-        _store_embedding(conn, lesson_id, 'lesson', f"{title}\n\n{content}", config)
-
-        conn.commit()
-
-    return lesson_id
+        ],
+        config=config,
+    )[0]
 
 
 @dataclass
@@ -624,19 +928,33 @@ class LessonInput:
 def add_lessons_batch(
     lessons: list[LessonInput],
     config: Optional[Config] = None,
+    batch_size: int = 64,
 ) -> list[str]:
     """Add multiple lessons in a single transaction.
 
     More efficient than calling add_lesson() multiple times when adding
-    many lessons, as it batches database operations and embedding calls.
+    many lessons: embeddings are generated in batched backend calls before
+    the write lock is taken, and each table is filled with a single
+    executemany.
 
     Args:
         lessons: List of LessonInput objects.
         config: Configuration to use.
+        batch_size: Maximum number of texts per embedding backend call.
 
     Returns:
         List of generated lesson IDs in the same order as input.
+
+    Raises:
+        ValueError: If any lesson's title or content is empty.
     """
+    # Input validation
+    for lesson in lessons:
+        if not lesson.title or not lesson.title.strip():
+            raise ValueError("Lesson title cannot be empty")
+        if not lesson.content or not lesson.content.strip():
+            raise ValueError("Lesson content cannot be empty")
+
     if config is None:
         config = get_config()
 
@@ -645,47 +963,49 @@ def add_lessons_batch(
     if not lessons:
         return []
 
-    lesson_ids = []
+    lesson_ids = [generate_entity_id("lesson") for _ in lessons]
 
-    with get_db(config) as conn:
-        for lesson in lessons:
-            # Resolve tag aliases
-            tags = lesson.tags
-            if tags:
-                tags = _resolve_tag_aliases(tags, config)
-
-            # Generate ID
-            lesson_id = generate_entity_id("lesson")
-            lesson_ids.append(lesson_id)
-
-            # Insert lesson
-            conn.execute(
-                """
-                INSERT INTO lessons (id, title, content, confidence, source, source_notes)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (lesson_id, lesson.title, lesson.content, lesson.confidence, lesson.source, lesson.source_notes),
+    lesson_rows = []
+    tag_rows: list[tuple[str, str]] = []
+    context_rows: list[tuple[str, str, bool]] = []
+    for lesson_id, lesson in zip(lesson_ids, lessons):
+        lesson_rows.append(
+            (lesson_id, lesson.title, lesson.content, lesson.confidence, lesson.source, lesson.source_notes)
+        )
+        if lesson.tags:
+            tag_rows.extend(
+                (lesson_id, tag) for tag in _resolve_tag_aliases(lesson.tags, config)
             )
+        context_rows.extend((lesson_id, ctx, True) for ctx in lesson.contexts or [])
+        context_rows.extend((lesson_id, ctx, False) for ctx in lesson.anti_contexts or [])
+
+    # Embed before taking the write lock
+    embedding_blobs = _embed_many_for_storage(
+        [_embedding_text(lesson.title, lesson.content) for lesson in lessons],
+        config,
+        batch_size,
+    )
 
-            # Insert tags
-            _save_tags(conn, lesson_id, 'lesson', tags)
-
-            # Insert contexts
-            if lesson.contexts:
-                conn.executemany(
-                    "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, TRUE)",
-                    [(lesson_id, ctx) for ctx in lesson.contexts],
-                )
-
-            # Insert anti-contexts
-            if lesson.anti_contexts:
-                conn.executemany(
-                    "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, FALSE)",
-                    [(lesson_id, ctx) for ctx in lesson.anti_contexts],
-                )
+    with get_db(config) as conn:
+        begin_write(conn)
 
-            # Insert embedding
-            _store_embedding(conn, lesson_id, 'lesson', f"{lesson.title}\n\n{lesson.content}", config)
+        conn.executemany(
+            """
+            INSERT INTO lessons (id, title, content, confidence, source, source_notes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            lesson_rows,
+        )
+        _multi_insert(conn, "INSERT INTO lesson_tags (lesson_id, tag) VALUES", tag_rows)
+        _multi_insert(
+            conn,
+            "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES",
+            context_rows,
+        )
+        conn.executemany(
+            f"INSERT INTO lesson_embeddings (lesson_id, embedding) VALUES (?, {vector_param(config)})",
+            zip(lesson_ids, embedding_blobs),
+        )
 
         conn.commit()
 
@@ -708,31 +1028,31 @@ def get_lesson(lesson_id: str, config: Optional[Config] = None) -> Optional[Less
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Get lesson
-        cursor = conn.execute(
-            "SELECT * FROM lessons WHERE id = ?",
-            (lesson_id,),
-        )
-        row = cursor.fetchone()
-        if row is None:
-            return None
+        # Get lesson with tags, contexts, and anti_contexts in one round-trip
+        lessons = _fetch_lessons(conn, [lesson_id])
+        return lessons[0] if lessons else None
 
-        # Get tags, contexts, and anti_contexts
-        tags, contexts, anti_contexts = _fetch_lesson_properties(conn, lesson_id)
 
-        return Lesson(
-            id=row["id"],
-            title=row["title"],
-            content=row["content"],
-            confidence=row["confidence"],
-            source=row["source"],
-            source_notes=row["source_notes"],
-            tags=tags,
-            contexts=contexts,
-            anti_contexts=anti_contexts,
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-        )
+def get_lessons(lesson_ids: list[str], config: Optional[Config] = None) -> list[Lesson]:
+    """Get several lessons by ID.
+
+    Fetches lessons with their tags and contexts in one query, however many
+    IDs are requested.
+
+    Args:
+        lesson_ids: The lesson IDs.
+        config: Configuration to use.
+
+    Returns:
+        The lessons found, in the order of lesson_ids (missing IDs are skipped).
+    """
+    if config is None:
+        config = get_config()
+
+    ensure_initialized(config)
+
+    with get_db(config) as conn:
+        return _fetch_lessons(conn, list(dict.fromkeys(lesson_ids)))
 
 
 def update_lesson(
@@ -769,67 +1089,82 @@ def update_lesson(
 
     ensure_initialized(config)
 
-    # Check if lesson exists
-    existing = get_lesson(lesson_id, config)
-    if existing is None:
-        return False
-
     # Resolve tag aliases
     if tags is not None:
         tags = _resolve_tag_aliases(tags, config)
 
+    # Re-embed (before taking the write lock) if title or content changed
+    embedding_blob = None
+    if title is not None or content is not None:
+        with get_db(config) as conn:
+            existing = conn.execute(
+                "SELECT title, content FROM lessons WHERE id = ?",
+                (lesson_id,),
+            ).fetchone()
+        if existing is None:
+            return False
+
+        new_title = title if title is not None else existing["title"]
+        new_content = content if content is not None else existing["content"]
+        if new_title != existing["title"] or new_content != existing["content"]:
+            embedding_blob = _embed_for_storage(_embedding_text(new_title, new_content), config)
+
     with get_db(config) as conn:
-        # Build update query
-        updates = []
-        params = []
-
-        if title is not None:
-            updates.append("title = ?")
-            params.append(title)
-        if content is not None:
-            updates.append("content = ?")
-            params.append(content)
-        if confidence is not None:
-            updates.append("confidence = ?")
-            params.append(confidence)
-        if source is not None:
-            updates.append("source = ?")
-            params.append(source)
-        if source_notes is not None:
-            updates.append("source_notes = ?")
-            params.append(source_notes)
+        begin_write(conn)
 
-        if updates:
-            updates.append("updated_at = CURRENT_TIMESTAMP")
-            query = f"UPDATE lessons SET {', '.join(updates)} WHERE id = ?"
-            params.append(lesson_id)
-            conn.execute(query, params)
+        changes = _column_changes(
+            title=title,
+            content=content,
+            confidence=confidence,
+            source=source,
+            source_notes=source_notes,
+        )
+
+        # The UPDATE doubles as the existence check
+        if changes:
+            query = _update_sql("lessons", tuple(changes))
+            found = conn.execute(query, [*changes.values(), lesson_id]).rowcount > 0
+        else:
+            found = conn.execute(
+                "SELECT 1 FROM lessons WHERE id = ?",
+                (lesson_id,),
+            ).fetchone() is not None
+        if not found:
+            return False
 
         # Update tags if provided
         if tags is not None:
-            _delete_tags(conn, lesson_id, 'lesson')
-            _save_tags(conn, lesson_id, 'lesson', tags)
+            _replace_tags(conn, lesson_id, 'lesson', tags)
 
         # Update contexts if provided
+        # (only the rows that differ from the stored set are written)
         if contexts is not None or anti_contexts is not None:
-            conn.execute("DELETE FROM lesson_contexts WHERE lesson_id = ?", (lesson_id,))
-            if contexts:
-                conn.executemany(
-                    "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, TRUE)",
-                    [(lesson_id, ctx) for ctx in contexts],
-                )
-            if anti_contexts:
+            cursor = conn.execute(
+                "SELECT context, applies FROM lesson_contexts WHERE lesson_id = ?",
+                (lesson_id,),
+            )
+            current = {(r["context"], bool(r["applies"])) for r in cursor.fetchall()}
+            wanted = dict.fromkeys(
+                [(ctx, True) for ctx in contexts or []]
+                + [(ctx, False) for ctx in anti_contexts or []]
+            )
+            removed = [row for row in current if row not in wanted]
+            if removed:
                 conn.executemany(
-                    "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES (?, ?, FALSE)",
-                    [(lesson_id, ctx) for ctx in anti_contexts],
+                    "DELETE FROM lesson_contexts WHERE lesson_id = ? AND context = ? AND applies = ?",
+                    ((lesson_id, ctx, applies) for ctx, applies in removed),
                 )
+            added = [row for row in wanted if row not in current]
+            _multi_insert(
+                conn,
+                "INSERT INTO lesson_contexts (lesson_id, context, applies) VALUES",
+                [(lesson_id, ctx, applies) for ctx, applies in added],
+            )
 
-        # Re-embed if title or content changed
-        if title is not None or content is not None:
-            new_title = title if title is not None else existing.title
-            new_content = content if content is not None else existing.content
+        # Replace embedding if title or content changed
+        if embedding_blob is not None:
             _delete_embedding(conn, lesson_id, 'lesson')
-            _store_embedding(conn, lesson_id, 'lesson', f"{new_title}\n\n{new_content}", config)
+            _insert_embedding(conn, lesson_id, 'lesson', embedding_blob, config)
 
         conn.commit()
 
@@ -852,16 +1187,13 @@ def delete_lesson(lesson_id: str, config: Optional[Config] = None) -> bool:
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Check if exists
-        cursor = conn.execute(
-            "SELECT id FROM lessons WHERE id = ?",
-            (lesson_id,),
-        )
-        if cursor.fetchone() is None:
-            return False
+        begin_write(conn)
 
         # Delete (cascades to tags, contexts, edges via FK)
-        conn.execute("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+        cursor = conn.execute("DELETE FROM lessons WHERE id = ?", (lesson_id,))
+        if cursor.rowcount == 0:
+            return False
+
         # Manually delete embedding (vec0 tables don't support FK cascades)
         conn.execute("DELETE FROM lesson_embeddings WHERE lesson_id = ?", (lesson_id,))
         conn.commit()
@@ -1041,7 +1373,7 @@ def list_rules(
 
     with get_db(config) as conn:
         # Build query
-        query = "SELECT * FROM rules WHERE 1=1"
+        query = "SELECT id FROM rules WHERE 1=1"
         params: list = []
 
         if pattern:
@@ -1074,50 +1406,8 @@ def list_rules(
         query += " ORDER BY created_at DESC LIMIT ?"
         params.append(limit)
 
-        cursor = conn.execute(query, params)
-        rows = cursor.fetchall()
-
-        # Build Rule objects
-        rules = []
-        for row in rows:
-            # Get tags
-            tag_cursor = conn.execute(
-                "SELECT tag FROM rule_tags WHERE rule_id = ?",
-                (row["id"],)
-            )
-            rule_tags = [r["tag"] for r in tag_cursor.fetchall()]
-
-            # Get linked lessons
-            lesson_cursor = conn.execute(
-                "SELECT to_id FROM edges WHERE from_id = ? AND from_type = 'rule' AND to_type = 'lesson'",
-                (row["id"],)
-            )
-            linked_lessons = [r["to_id"] for r in lesson_cursor.fetchall()]
-
-            # Get linked resources
-            resource_cursor = conn.execute(
-                "SELECT to_id FROM edges WHERE from_id = ? AND from_type = 'rule' AND to_type = 'resource'",
-                (row["id"],)
-            )
-            linked_resources = [r["to_id"] for r in resource_cursor.fetchall()]
-
-            rules.append(Rule(
-                id=row["id"],
-                title=row["title"],
-                content=row["content"],
-                rationale=row["rationale"],
-                approved=bool(row["approved"]),
-                approved_at=row["approved_at"],
-                approved_by=row["approved_by"],
-                suggested_by=row["suggested_by"],
-                tags=rule_tags,
-                linked_lessons=linked_lessons,
-                linked_resources=linked_resources,
-                created_at=row["created_at"],
-                updated_at=row["updated_at"],
-            ))
-
-        return rules
+        # Tags and links for every matched rule come back with the rows
+        return _fetch_rules(conn, query, tuple(params))
 
 
 # --- Graph Operations ---
@@ -1128,6 +1418,7 @@ def get_related(
     depth: int = 1,
     relations: Optional[list[str]] = None,
     bidirectional: bool = True,
+    limit: Optional[int] = None,
     config: Optional[Config] = None,
 ) -> list[Lesson]:
     """Get lessons related to the given lesson via graph edges.
@@ -1137,85 +1428,67 @@ def get_related(
         depth: Maximum traversal depth (default 1).
         relations: Optional filter for relation types.
         bidirectional: If True, include edges in both directions (default True).
+        limit: Stop traversing once this many related lessons are found.
         config: Configuration to use.
 
     Returns:
-        List of related lessons.
+        List of related lessons, nearest first (the starting lesson is never
+        included).
     """
     if config is None:
         config = get_config()
 
     ensure_initialized(config)
 
-    with get_db(config) as conn:
-        # Build recursive CTE query (only traverse lesson→lesson edges)
-        relation_filter = ""
-        base_params: list = []
+    # Only traverse lesson→lesson edges. The frontier and relation lists are
+    # bound once each, as CTEs shared by both directions of the UNION.
+    relation_cte = ""
+    relation_filter = ""
+    relation_params: list = []
+    if relations:
+        _, relation_params = in_placeholders(relations)
+        relation_cte = f", wanted_relations(relation) AS (VALUES {_values_rows(relation_params)})"
+        relation_filter = "AND e.relation IN wanted_relations"
 
-        if relations:
-            placeholders = ",".join("?" * len(relations))
-            relation_filter = f"AND e.relation IN ({placeholders})"
-            base_params = list(relations)
-
-        if bidirectional:
-            # Query both outgoing and incoming edges
+    with get_db(config) as conn:
+        # Breadth-first search, one query per level. Each lesson is expanded
+        # at most once, so the frontier never exceeds the unvisited lessons.
+        visited = {lesson_id}
+        related_ids: list[str] = []
+        frontier = [lesson_id]
+
+        for _ in range(depth):
+            _, frontier_params = in_placeholders(frontier)
             query = f"""
-                WITH RECURSIVE related AS (
-                    -- Outgoing edges (from_id = lesson_id)
-                    SELECT to_id AS related_id, 1 as depth
-                    FROM edges e
-                    WHERE from_id = ? AND from_type = 'lesson' AND to_type = 'lesson' {relation_filter}
-
-                    UNION
-
-                    -- Incoming edges (to_id = lesson_id)
-                    SELECT from_id AS related_id, 1 as depth
-                    FROM edges e
-                    WHERE to_id = ? AND from_type = 'lesson' AND to_type = 'lesson' {relation_filter}
-
-                    UNION
-
-                    -- Recursive outgoing
-                    SELECT e.to_id, r.depth + 1
-                    FROM edges e
-                    JOIN related r ON e.from_id = r.related_id
-                    WHERE r.depth < ? AND e.from_type = 'lesson' AND e.to_type = 'lesson' {relation_filter}
-
-                    UNION
-
-                    -- Recursive incoming
-                    SELECT e.from_id, r.depth + 1
-                    FROM edges e
-                    JOIN related r ON e.to_id = r.related_id
-                    WHERE r.depth < ? AND e.from_type = 'lesson' AND e.to_type = 'lesson' {relation_filter}
-                )
-                SELECT DISTINCT related_id FROM related
+                WITH frontier(id) AS (VALUES {_values_rows(frontier_params)}){relation_cte}
+                SELECT to_id AS related_id
+                FROM edges e
+                WHERE from_id IN frontier
+                AND from_type = 'lesson' AND to_type = 'lesson' {relation_filter}
             """
-            params = [lesson_id] + base_params + [lesson_id] + base_params + [depth] + base_params + [depth] + base_params
-        else:
-            # Only outgoing edges (original behavior)
-            query = f"""
-                WITH RECURSIVE related AS (
-                    SELECT to_id AS related_id, 1 as depth
+            if bidirectional:
+                query += f"""
+                    UNION ALL
+                    SELECT from_id AS related_id
                     FROM edges e
-                    WHERE from_id = ? AND from_type = 'lesson' AND to_type = 'lesson' {relation_filter}
-
-                    UNION
-
-                    SELECT e.to_id, r.depth + 1
-                    FROM edges e
-                    JOIN related r ON e.from_id = r.related_id
-                    WHERE r.depth < ? AND e.from_type = 'lesson' AND e.to_type = 'lesson' {relation_filter}
-                )
-                SELECT DISTINCT related_id FROM related
-            """
-            params = [lesson_id] + base_params + [depth] + base_params
-
-        cursor = conn.execute(query, params)
-        related_ids = [row["related_id"] for row in cursor.fetchall()]
-
-    # Fetch full lessons
-    return [get_lesson(rid, config) for rid in related_ids if get_lesson(rid, config)]
+                    WHERE to_id IN frontier
+                    AND from_type = 'lesson' AND to_type = 'lesson' {relation_filter}
+                """
+            params = frontier_params + relation_params
+            frontier = []
+            for row in conn.execute(query, params).fetchall():
+                if row["related_id"] not in visited:
+                    visited.add(row["related_id"])
+                    frontier.append(row["related_id"])
+            if not frontier:
+                break
+            related_ids.extend(frontier)
+            if limit is not None and len(related_ids) >= limit:
+                del related_ids[limit:]
+                break
+
+        # Fetch full lessons
+        return _fetch_lessons(conn, related_ids)
 
 
 def link_lessons(
@@ -1241,17 +1514,14 @@ def link_lessons(
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        try:
-            conn.execute(
-                """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
-                   VALUES (?, 'lesson', ?, 'lesson', ?)""",
-                (from_id, to_id, relation),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Edge already exists
-            return False
+        cursor = conn.execute(
+            """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+               VALUES (?, 'lesson', ?, 'lesson', ?)
+               ON CONFLICT DO NOTHING""",
+            (from_id, to_id, relation),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
 
 
 def unlink_lessons(
@@ -1321,17 +1591,14 @@ def link_lesson_to_resource(
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        try:
-            conn.execute(
-                """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
-                   VALUES (?, 'lesson', ?, 'resource', ?)""",
-                (lesson_id, resource_id, relation),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Link already exists
-            return False
+        cursor = conn.execute(
+            """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+               VALUES (?, 'lesson', ?, 'resource', ?)
+               ON CONFLICT DO NOTHING""",
+            (lesson_id, resource_id, relation),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
 
 
 def unlink_lesson_from_resource(
@@ -1397,17 +1664,14 @@ def link_entities(
         return False
 
     with get_db(config) as conn:
-        try:
-            conn.execute(
-                """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (from_id, from_type, to_id, to_type, relation),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Edge already exists
-            return False
+        cursor = conn.execute(
+            """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT DO NOTHING""",
+            (from_id, from_type, to_id, to_type, relation),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
 
 
 def unlink_entities(
@@ -1559,27 +1823,43 @@ def list_tags(with_counts: bool = False, config: Optional[Config] = None) -> lis
     Returns:
         List of tags.
     """
+    names, counts = list_tag_columns(with_counts=with_counts, config=config)
+    if with_counts:
+        return list(map(Tag, names, counts))
+    return list(map(Tag, names))
+
+
+def list_tag_columns(
+    with_counts: bool = False, config: Optional[Config] = None
+) -> tuple[list[str], list[int]]:
+    """List all lesson tags as parallel name and count lists.
+
+    Same data and ordering as list_tags(), without building a Tag object per
+    row; useful when only the names or counts are needed.
+
+    Args:
+        with_counts: Order by usage count (descending) instead of by name.
+        config: Configuration to use.
+
+    Returns:
+        Tuple of (tag names, lesson counts), index-aligned.
+    """
     if config is None:
         config = get_config()
 
     ensure_initialized(config)
 
+    order = "count DESC, tag" if with_counts else "tag"
     with get_db(config) as conn:
-        if with_counts:
-            cursor = conn.execute(
-                """
-                SELECT tag, COUNT(*) as count
-                FROM lesson_tags
-                GROUP BY tag
-                ORDER BY count DESC, tag
-                """
-            )
-            return [Tag(name=row["tag"], count=row["count"]) for row in cursor.fetchall()]
-        else:
-            cursor = conn.execute(
-                "SELECT DISTINCT tag FROM lesson_tags ORDER BY tag"
-            )
-            return [Tag(name=row["tag"]) for row in cursor.fetchall()]
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            f"SELECT tag, count FROM lesson_tag_counts ORDER BY {order}"
+        ).fetchall()
+    if not rows:
+        return [], []
+    names, counts = zip(*rows)
+    return list(names), list(counts)
 
 
 def list_sources(
@@ -1922,16 +2202,14 @@ def add_source(
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        try:
-            conn.execute(
-                "INSERT INTO source_types (name, description, typical_confidence) VALUES (?, ?, ?)",
-                (name, description, typical_confidence),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Source type already exists
-            return False
+        cursor = conn.execute(
+            """INSERT INTO source_types (name, description, typical_confidence)
+               VALUES (?, ?, ?)
+               ON CONFLICT(name) DO NOTHING""",
+            (name, description, typical_confidence),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
 
 
 def merge_tags(
@@ -1955,6 +2233,8 @@ def merge_tags(
     ensure_initialized(config)
 
     with get_db(config) as conn:
+        begin_write(conn)
+
         # Update all usages of from_tag to to_tag
         cursor = conn.execute(
             """
@@ -1976,13 +2256,80 @@ def merge_tags(
 # --- Resource Operations (v2) ---
 
 
+@lru_cache(maxsize=256)
+def _find_git_dir(directory: str) -> Optional[Path]:
+    """Find the git directory for a directory, walking up to the repo root.
+
+    Memoized per directory, since a document tree is usually imported file
+    by file from the same few directories.
+    """
+    start = Path(directory)
+    for parent in (start, *start.parents):
+        dot_git = parent / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # Worktrees and submodules: .git is a file pointing at the git dir
+            content = dot_git.read_text().strip()
+            if content.startswith("gitdir: "):
+                return (parent / content[len("gitdir: "):]).resolve()
+            return None
+    return None
+
+
+def _read_git_head(git_dir: Path) -> Optional[str]:
+    """Read the commit HEAD points to from a git directory's files.
+
+    Returns:
+        The full commit hash, or None if it can't be resolved from loose or
+        packed refs (e.g. an unborn branch).
+    """
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref: "):
+        return head  # Detached HEAD
+
+    ref = head[len("ref: "):]
+    # Linked worktrees keep shared refs in the main repo's git dir
+    common_dir = git_dir
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = (git_dir / commondir_file.read_text().strip()).resolve()
+
+    for base in (git_dir, common_dir):
+        loose_ref = base / ref
+        if loose_ref.is_file():
+            return loose_ref.read_text().strip()
+
+    packed_refs = common_dir / "packed-refs"
+    if packed_refs.is_file():
+        for line in packed_refs.read_text().splitlines():
+            parts = line.split(" ", 1)
+            if len(parts) == 2 and parts[1] == ref:
+                return parts[0]
+    return None
+
+
 def _get_git_ref(path: str) -> Optional[str]:
-    """Get the current git commit ref for a file path."""
+    """Get the current git commit ref for a file path.
+
+    Reads HEAD straight from the repository's git directory; `git rev-parse`
+    is only run when the refs can't be resolved that way.
+    """
+    directory = Path(path).parent.resolve()
+    try:
+        git_dir = _find_git_dir(str(directory))
+        if git_dir is None:
+            return None
+        commit = _read_git_head(git_dir)
+        if commit:
+            return commit[:12]  # Short hash
+    except OSError:
+        pass
+
     try:
-        # Check if path is in a git repo
         result = subprocess.run(
             ["git", "rev-parse", "HEAD"],
-            cwd=Path(path).parent,
+            cwd=directory,
             capture_output=True,
             text=True,
         )
@@ -1995,58 +2342,182 @@ def _get_git_ref(path: str) -> Optional[str]:
 
 
 def _compute_content_hash(content: str) -> str:
-    """Compute a hash of content for change detection."""
-    import hashlib
+    """Compute a hash of content for change detection.
+
+    Stays SHA-256: stored hashes must not change between releases or
+    installs, and OpenSSL's hardware-accelerated SHA-256 already outpaces
+    blake2b.
+    """
     return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
-def _store_chunks(
-    conn,
-    resource_id: str,
+@dataclass(slots=True)
+class _PreparedResource:
+    """A resource's chunks and embeddings, computed before the write lock.
+
+    embedding_texts and embedding_blobs hold the resource itself first,
+    then one entry per chunk. A None blob means the stored embedding was
+    built from the same text and is kept as is.
+    """
+
+    chunks: list["Chunk"]
+    embedding_texts: list[str]
+    embedding_blobs: list[Optional[bytes]]
+
+
+def _chunk_embedding_text(
+    title: Optional[str],
+    breadcrumb: Optional[str],
+    content: str,
+) -> str:
+    """Build the text embedded for a chunk: breadcrumb + title + content.
+
+    The title is left out when it is already one of the breadcrumb's
+    headers; a whole-segment match avoids dropping e.g. "API" just because
+    the breadcrumb contains "API Reference".
+    """
+    parts = []
+    if breadcrumb:
+        parts.append(breadcrumb)
+    if title and not (breadcrumb and title in breadcrumb.split(" > ")):
+        parts.append(title)
+    parts.append(content)
+    return "\n\n".join(parts)
+
+
+def _stored_embedding_texts(conn, resource_id: str) -> dict[Optional[int], str]:
+    """Rebuild the texts a stored resource's embeddings were generated from.
+
+    Args:
+        conn: Database connection.
+        resource_id: ID of the resource.
+
+    Returns:
+        Embedded text keyed by chunk index, with the resource's own text
+        under None. Empty if the resource does not exist.
+    """
+    row = conn.execute(
+        "SELECT title, content FROM resources WHERE id = ?",
+        (resource_id,),
+    ).fetchone()
+    if row is None:
+        return {}
+
+    texts: dict[Optional[int], str] = {None: _embedding_text(row["title"], row["content"])}
+    cursor = conn.execute(
+        "SELECT chunk_index, title, breadcrumb, content FROM resource_chunks WHERE resource_id = ?",
+        (resource_id,),
+    )
+    for chunk in cursor.fetchall():
+        texts[chunk["chunk_index"]] = _chunk_embedding_text(
+            chunk["title"], chunk["breadcrumb"], chunk["content"]
+        )
+    return texts
+
+
+def _embed_prepared_resource(
+    prepared: _PreparedResource,
+    stored_texts: dict[Optional[int], str],
+    config: Config,
+) -> None:
+    """Fill in missing embeddings whose text differs from the stored one.
+
+    Args:
+        prepared: Resource being stored; its embedding_blobs are updated.
+        stored_texts: Output of _stored_embedding_texts() (empty for a new
+            resource, so everything is embedded).
+        config: Application config.
+    """
+    keys = [None] + [chunk.index for chunk in prepared.chunks]
+    stale = [
+        i for i, key in enumerate(keys)
+        if prepared.embedding_blobs[i] is None
+        and stored_texts.get(key) != prepared.embedding_texts[i]
+    ]
+    embedding_blobs = _embed_many_for_storage(
+        [prepared.embedding_texts[i] for i in stale], config
+    )
+    for i, embedding_blob in zip(stale, embedding_blobs):
+        prepared.embedding_blobs[i] = embedding_blob
+
+
+def _prepare_resource(
+    title: str,
     content: str,
     path: Optional[str],
     chunking_config: Optional["ChunkingConfig"],
     config: Config,
-) -> list[tuple[str, "Chunk"]]:
-    """Chunk content and store chunks with embeddings.
+    stored_texts: Optional[dict[Optional[int], str]] = None,
+) -> _PreparedResource:
+    """Chunk a resource and embed it and its chunks in batched backend calls.
+
+    Runs before the write transaction opens, so the database is not locked
+    while the embedding model works through a large document.
 
     Args:
-        conn: Database connection (within transaction).
-        resource_id: ID of the parent resource.
+        title: Resource title.
         content: Document content to chunk.
         path: Source file path (for context).
         chunking_config: Chunking configuration.
         config: Application config.
+        stored_texts: When re-importing, the output of
+            _stored_embedding_texts(); texts that are unchanged are not
+            embedded again.
 
     Returns:
-        List of (chunk_id, chunk) tuples for link resolution.
+        The chunks and the resource and chunk embeddings.
     """
-    from .chunking import Chunk, ChunkingConfig, chunk_document
-
     # Use default config if none provided
     if chunking_config is None:
         chunking_config = ChunkingConfig()
 
-    # Chunk the document
     result = chunk_document(content, chunking_config, source_path=path)
 
-    # Store each chunk, keeping track of IDs for link resolution
-    stored_chunks: list[tuple[str, Chunk]] = []
+    embedding_texts = [_embedding_text(title, content)] + [
+        _chunk_embedding_text(chunk.title, chunk.breadcrumb, chunk.content)
+        for chunk in result.chunks
+    ]
+    prepared = _PreparedResource(
+        chunks=result.chunks,
+        embedding_texts=embedding_texts,
+        embedding_blobs=[None] * len(embedding_texts),
+    )
+    _embed_prepared_resource(prepared, stored_texts or {}, config)
+    return prepared
 
-    for chunk in result.chunks:
-        chunk_id = generate_chunk_id(resource_id, chunk.index)
-        stored_chunks.append((chunk_id, chunk))
 
-        # Serialize sections to JSON
-        sections_json = json.dumps(chunk.sections) if chunk.sections else None
+def _store_chunks(
+    conn,
+    resource_id: str,
+    prepared: _PreparedResource,
+    config: Config,
+) -> list[tuple[str, "Chunk"]]:
+    """Store a resource's pre-computed chunks and chunk embeddings.
 
-        # Insert chunk
-        conn.execute(
-            """
-            INSERT INTO resource_chunks
-                (id, resource_id, chunk_index, title, content, breadcrumb, start_line, end_line, token_count, sections)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+    Chunks whose embedding was kept (a None blob) are not given a new one;
+    the caller leaves their existing chunk_embeddings row in place.
+
+    Args:
+        conn: Database connection (within transaction).
+        resource_id: ID of the parent resource.
+        prepared: Output of _prepare_resource().
+        config: Application config.
+
+    Returns:
+        List of (chunk_id, chunk) tuples for link resolution.
+    """
+    # Keep track of chunk IDs for link resolution
+    stored_chunks = [
+        (generate_chunk_id(resource_id, chunk.index), chunk) for chunk in prepared.chunks
+    ]
+
+    conn.executemany(
+        """
+        INSERT INTO resource_chunks
+            (id, resource_id, chunk_index, title, content, breadcrumb, start_line, end_line, token_count, sections)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
             (
                 chunk_id,
                 resource_id,
@@ -2057,48 +2528,23 @@ def _store_chunks(
                 chunk.start_line,
                 chunk.end_line,
                 chunk.token_count,
-                sections_json,
-            ),
-        )
-
-        # Generate and store chunk embedding
-        # Use breadcrumb + title + content for better context
-        embed_text_parts = []
-        if chunk.breadcrumb:
-            embed_text_parts.append(chunk.breadcrumb)
-        if chunk.title and chunk.title not in (chunk.breadcrumb or ""):
-            embed_text_parts.append(chunk.title)
-        embed_text_parts.append(chunk.content)
-        embed_input = "\n\n".join(embed_text_parts)
-
-        _store_embedding(conn, chunk_id, 'chunk', embed_input, config)
+                json.dumps(chunk.sections) if chunk.sections else None,
+            )
+            for chunk_id, chunk in stored_chunks
+        ),
+    )
+    conn.executemany(
+        f"INSERT INTO chunk_embeddings (chunk_id, embedding) VALUES (?, {vector_param(config)})",
+        (
+            (chunk_id, blob)
+            for (chunk_id, _), blob in zip(stored_chunks, prepared.embedding_blobs[1:])
+            if blob is not None
+        ),
+    )
 
     return stored_chunks
 
 
-def _find_chunk_id_for_line(
-    stored_chunks: list[tuple[str, "Chunk"]],
-    line_number: int,
-) -> Optional[str]:
-    """Find the chunk ID that contains a given line number.
-
-    Args:
-        stored_chunks: List of (chunk_id, chunk) tuples.
-        line_number: 1-indexed line number.
-
-    Returns:
-        Chunk ID if found, None otherwise.
-    """
-    # Convert to 0-indexed
-    line_idx = line_number - 1
-
-    for chunk_id, chunk in stored_chunks:
-        if chunk.start_line <= line_idx <= chunk.end_line:
-            return chunk_id
-
-    return None
-
-
 def _store_and_resolve_links(
     conn,
     resource_id: str,
@@ -2119,11 +2565,13 @@ def _store_and_resolve_links(
         Number of links stored.
     """
     links = extract_links(content, path)
+    chunk_index = build_chunk_index([chunk for _, chunk in stored_chunks])
     count = 0
 
     for link in links:
         # Find which chunk this link is in
-        from_chunk_id = _find_chunk_id_for_line(stored_chunks, link.line_number)
+        position = chunk_position_for_line(chunk_index, link.line_number)
+        from_chunk_id = stored_chunks[position][0] if position is not None else None
 
         # Attempt resolution
         resolved_resource_id = resolve_link_to_resource(conn, link.absolute_path)
@@ -2150,22 +2598,7 @@ def _store_and_resolve_links(
             to_id = resolved_chunk_id if resolved_chunk_id else resolved_resource_id
             to_type = "chunk" if resolved_chunk_id else "resource"
 
-            # Insert edge
-            conn.execute(
-                """INSERT OR IGNORE INTO edges (from_id, from_type, to_id, to_type, relation)
-                   VALUES (?, ?, ?, ?, 'references')""",
-                (from_id, from_type, to_id, to_type),
-            )
-
-            # Get edge ID for anchor
-            cursor = conn.execute(
-                """SELECT id FROM edges
-                   WHERE from_id = ? AND from_type = ? AND to_id = ? AND to_type = ? AND relation = 'references'""",
-                (from_id, from_type, to_id, to_type),
-            )
-            edge_row = cursor.fetchone()
-            if edge_row:
-                edge_id = edge_row["id"]
+            edge_id = _insert_reference_edge(conn, from_id, from_type, to_id, to_type)
 
         # Store anchor (with or without edge_id for unresolved links)
         conn.execute(
@@ -2178,6 +2611,45 @@ def _store_and_resolve_links(
     return count
 
 
+def _insert_reference_edge(
+    conn,
+    from_id: str,
+    from_type: str,
+    to_id: str,
+    to_type: str,
+) -> int:
+    """Create a 'references' edge if it doesn't exist and return its ID.
+
+    The INSERT returns the new row's ID directly; only when the edge already
+    exists (and the insert is skipped) is it looked up.
+
+    Args:
+        conn: Database connection.
+        from_id: Source entity ID.
+        from_type: Source entity type.
+        to_id: Target entity ID.
+        to_type: Target entity type.
+
+    Returns:
+        The edge ID.
+    """
+    params = (from_id, from_type, to_id, to_type)
+    row = conn.execute(
+        """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+           VALUES (?, ?, ?, ?, 'references')
+           ON CONFLICT DO NOTHING
+           RETURNING id""",
+        params,
+    ).fetchone()
+    if row is None:
+        row = conn.execute(
+            """SELECT id FROM edges
+               WHERE from_id = ? AND from_type = ? AND to_id = ? AND to_type = ? AND relation = 'references'""",
+            params,
+        ).fetchone()
+    return row[0]
+
+
 def _resolve_dangling_links(
     conn,
     new_resource_path: str,
@@ -2219,28 +2691,16 @@ def _resolve_dangling_links(
                 to_id = resolved_chunk_id
                 to_type = "chunk"
 
-        # Create edge
-        conn.execute(
-            """INSERT OR IGNORE INTO edges (from_id, from_type, to_id, to_type, relation)
-               VALUES (?, ?, ?, ?, 'references')""",
-            (anchor["from_id"], anchor["from_type"], to_id, to_type),
+        edge_id = _insert_reference_edge(
+            conn, anchor["from_id"], anchor["from_type"], to_id, to_type
         )
 
-        # Get edge ID
-        edge_cursor = conn.execute(
-            """SELECT id FROM edges
-               WHERE from_id = ? AND from_type = ? AND to_id = ? AND to_type = ? AND relation = 'references'""",
-            (anchor["from_id"], anchor["from_type"], to_id, to_type),
+        # Update anchor with edge_id
+        conn.execute(
+            "UPDATE resource_anchors SET edge_id = ? WHERE id = ?",
+            (edge_id, anchor["id"]),
         )
-        edge_row = edge_cursor.fetchone()
-
-        if edge_row:
-            # Update anchor with edge_id
-            conn.execute(
-                "UPDATE resource_anchors SET edge_id = ? WHERE id = ?",
-                (edge_row["id"], anchor["id"]),
-            )
-            count += 1
+        count += 1
 
     return count
 
@@ -2264,11 +2724,8 @@ def get_resource_by_path(
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        cursor = conn.execute("SELECT id FROM resources WHERE path = ?", (path,))
-        row = cursor.fetchone()
-        if row:
-            return get_resource(row["id"], config)
-    return None
+        resources = _fetch_resources(conn, ["r.path = ?"], [path], config)
+    return resources[0] if resources else None
 
 
 def add_resource(
@@ -2313,8 +2770,7 @@ def add_resource(
 
     # Resolve path to absolute, canonical form (resolve symlinks)
     if path:
-        from pathlib import Path as PathLib
-        path_obj = PathLib(path).resolve()
+        path_obj = Path(path).resolve()
         if not path_obj.exists():
             raise ValueError(f"Resource path does not exist: {path}")
         path = str(path_obj)
@@ -2324,8 +2780,7 @@ def add_resource(
 
     # Read content from path if not provided
     if content is None and path:
-        from pathlib import Path as PathLib
-        content = PathLib(path).read_text()
+        content = Path(path).read_text()
 
     if not content:
         raise ValueError("Content is required")
@@ -2358,8 +2813,11 @@ def add_resource(
     resource_id = generate_entity_id("resource")
     content_hash = _compute_content_hash(content)
     source_ref = _get_git_ref(path) if path else None
+    prepared = _prepare_resource(title, content, path, chunking_config, config)
 
     with get_db(config) as conn:
+        begin_write(conn)
+
         # Insert resource
         conn.execute(
             """
@@ -2372,17 +2830,18 @@ def add_resource(
         # Insert versions
         conn.executemany(
             "INSERT INTO resource_versions (resource_id, version) VALUES (?, ?)",
-            [(resource_id, v) for v in versions],
+            ((resource_id, v) for v in versions),
         )
 
         # Insert tags
         _save_tags(conn, resource_id, 'resource', tags)
 
-        # Insert embedding
-        _store_embedding(conn, resource_id, 'resource', f"{title}\n\n{content}", config)
+        # Insert embedding (a new resource has no stored text, so it was embedded)
+        if prepared.embedding_blobs[0] is not None:
+            _insert_embedding(conn, resource_id, 'resource', prepared.embedding_blobs[0], config)
 
-        # Chunk and store chunks for ALL resources (docs and scripts)
-        stored_chunks = _store_chunks(conn, resource_id, content, path, chunking_config, config)
+        # Store chunks for ALL resources (docs and scripts)
+        stored_chunks = _store_chunks(conn, resource_id, prepared, config)
 
         # Extract and resolve links (for docs with path)
         if type == 'doc' and path:
@@ -2435,16 +2894,35 @@ def _reimport_resource(
     content_hash = _compute_content_hash(content)
     source_ref = _get_git_ref(path) if path else None
 
+    # Chunk IDs are derived from chunk indexes, so an unchanged section keeps
+    # its ID across re-imports and its stored embedding can be reused.
+    with get_db(config) as conn:
+        stored_texts = _stored_embedding_texts(conn, existing_id)
+    prepared = _prepare_resource(
+        title, content, path, chunking_config, config, stored_texts=stored_texts
+    )
+
     with get_db(config) as conn:
+        begin_write(conn)
+
+        # Another writer may have re-imported the resource in the meantime;
+        # embed anything whose stored text no longer matches.
+        _embed_prepared_resource(prepared, _stored_embedding_texts(conn, existing_id), config)
+        kept_chunk_ids = {
+            generate_chunk_id(existing_id, chunk.index)
+            for chunk, blob in zip(prepared.chunks, prepared.embedding_blobs[1:])
+            if blob is None
+        }
+
         # Delete old chunks (cascades to chunk_embeddings via FK - but vec0 doesn't support FK)
         # First get chunk IDs to delete embeddings
-        cursor = conn.execute(
-            "SELECT id FROM resource_chunks WHERE resource_id = ?",
-            (existing_id,),
+        old_chunk_ids = fetch_column(
+            conn, "SELECT id FROM resource_chunks WHERE resource_id = ?", (existing_id,)
+        )
+        conn.executemany(
+            "DELETE FROM chunk_embeddings WHERE chunk_id = ?",
+            ((chunk_id,) for chunk_id in old_chunk_ids if chunk_id not in kept_chunk_ids),
         )
-        chunk_ids = [row["id"] for row in cursor.fetchall()]
-        for chunk_id in chunk_ids:
-            conn.execute("DELETE FROM chunk_embeddings WHERE chunk_id = ?", (chunk_id,))
 
         conn.execute("DELETE FROM resource_chunks WHERE resource_id = ?", (existing_id,))
 
@@ -2456,6 +2934,7 @@ def _reimport_resource(
             """
             UPDATE resources
             SET type = ?, title = ?, content = ?, content_hash = ?, source_ref = ?,
+                file_mtime_ns = NULL, file_size = NULL,
                 indexed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
             """,
@@ -2466,19 +2945,19 @@ def _reimport_resource(
         conn.execute("DELETE FROM resource_versions WHERE resource_id = ?", (existing_id,))
         conn.executemany(
             "INSERT INTO resource_versions (resource_id, version) VALUES (?, ?)",
-            [(existing_id, v) for v in versions],
+            ((existing_id, v) for v in versions),
         )
 
         # Update tags
-        _delete_tags(conn, existing_id, 'resource')
-        _save_tags(conn, existing_id, 'resource', tags)
+        _replace_tags(conn, existing_id, 'resource', tags)
 
         # Update embedding
-        _delete_embedding(conn, existing_id, 'resource')
-        _store_embedding(conn, existing_id, 'resource', f"{title}\n\n{content}", config)
+        if prepared.embedding_blobs[0] is not None:
+            _delete_embedding(conn, existing_id, 'resource')
+            _insert_embedding(conn, existing_id, 'resource', prepared.embedding_blobs[0], config)
 
-        # Re-chunk and store (for ALL resources - docs and scripts)
-        stored_chunks = _store_chunks(conn, existing_id, content, path, chunking_config, config)
+        # Store the new chunks (for ALL resources - docs and scripts)
+        stored_chunks = _store_chunks(conn, existing_id, prepared, config)
 
         # Re-extract and resolve links
         if type == 'doc' and path:
@@ -2530,96 +3009,207 @@ def get_resource(resource_id: str, config: Optional[Config] = None) -> Optional[
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Get resource
-        cursor = conn.execute(
-            "SELECT * FROM resources WHERE id = ?",
-            (resource_id,),
-        )
-        row = cursor.fetchone()
-        if row is None:
-            return None
+        resources = _fetch_resources(conn, ["r.id = ?"], [resource_id], config)
+    return resources[0] if resources else None
 
-        # Get versions
-        cursor = conn.execute(
-            "SELECT version FROM resource_versions WHERE resource_id = ?",
-            (resource_id,),
-        )
-        versions = [r["version"] for r in cursor.fetchall()]
 
-        # Get tags
-        cursor = conn.execute(
-            "SELECT tag FROM resource_tags WHERE resource_id = ?",
-            (resource_id,),
-        )
-        tags = [r["tag"] for r in cursor.fetchall()]
+def get_resources(
+    resource_ids: list[str], config: Optional[Config] = None
+) -> list[Resource]:
+    """Get several resources by ID.
 
-        content = row["content"]
+    Fetches resources with their versions and tags in one query, however
+    many IDs are requested.
 
-        # For scripts, check if file has changed
-        if row["type"] == "script" and row["path"]:
-            from pathlib import Path as PathLib
-            path = PathLib(row["path"])
-            if path.exists():
-                current_content = path.read_text()
-                current_hash = _compute_content_hash(current_content)
-                if current_hash != row["content_hash"]:
-                    # Content has changed, update cache
-                    content = current_content
-                    _refresh_resource_content(conn, resource_id, content, config)
-
-        return Resource(
-            id=row["id"],
-            type=row["type"],
-            title=row["title"],
-            path=row["path"],
-            content=content,
-            content_hash=row["content_hash"],
-            source_ref=row["source_ref"],
-            versions=versions,
-            tags=tags,
-            indexed_at=row["indexed_at"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-        )
+    Args:
+        resource_ids: The resource IDs.
+        config: Configuration to use.
 
+    Returns:
+        The resources found, in the order of resource_ids (missing IDs are
+        skipped).
+    """
+    if config is None:
+        config = get_config()
 
-def _refresh_resource_content(
-    conn, resource_id: str, content: str, config: Config
-) -> None:
-    """Refresh a resource's cached content and embedding."""
-    content_hash = _compute_content_hash(content)
+    ensure_initialized(config)
 
-    # Get title for embedding
-    cursor = conn.execute(
-        "SELECT title FROM resources WHERE id = ?",
-        (resource_id,),
-    )
-    row = cursor.fetchone()
-    title = row["title"] if row else ""
+    resource_ids = list(dict.fromkeys(resource_ids))
+    if not resource_ids:
+        return []
 
-    # Update content and hash
-    conn.execute(
-        """
-        UPDATE resources
-        SET content = ?, content_hash = ?, indexed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
-        WHERE id = ?
+    placeholders, params = in_placeholders(resource_ids)
+    with get_db(config) as conn:
+        resources = {
+            resource.id: resource
+            for resource in _fetch_resources(conn, [f"r.id IN ({placeholders})"], params, config)
+        }
+    return [resources[rid] for rid in resource_ids if rid in resources]
+
+
+def _fetch_resources(
+    conn,
+    conditions: list[str],
+    params: list,
+    config: Config,
+) -> list[Resource]:
+    """Fetch resources with their versions and tags in a single query.
+
+    Script resources whose file changed on disk are refreshed on the way out.
+
+    Args:
+        conn: Database connection.
+        conditions: SQL conditions on the resources table (aliased ``r``),
+            combined with AND.
+        params: Parameters for the conditions.
+        config: Application config.
+
+    Returns:
+        Matching resources, ordered by title.
+    """
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    cursor = conn.execute(
+        f"""
+        SELECT r.*,
+            (SELECT group_concat(version, char(31)) FROM resource_versions
+             WHERE resource_id = r.id) AS version_list,
+            (SELECT group_concat(tag, char(31)) FROM resource_tags
+             WHERE resource_id = r.id) AS tag_list
+        FROM resources r
+        {where}
+        ORDER BY r.title
         """,
-        (content, content_hash, resource_id),
+        params,
     )
 
-    # Re-generate embedding
-    embedding = embed_text(f"{title}\n\n{content}", config)
-    embedding_blob = struct.pack(f"{len(embedding)}f", *embedding)
+    rows = cursor.fetchall()
 
-    conn.execute(
-        "DELETE FROM resource_embeddings WHERE resource_id = ?",
-        (resource_id,),
+    # Re-read scripts that changed on disk; all changed contents are then
+    # re-embedded together in one batched call
+    contents = {}
+    refreshed = []
+    touched = []
+    for row in rows:
+        changed = _read_changed_script(row)
+        if changed is None:
+            continue
+        current_content, file_stat = changed
+        contents[row["id"]] = current_content
+        if current_content != row["content"]:
+            refreshed.append((row["id"], row["title"], current_content, file_stat))
+        else:
+            touched.append((row["id"], file_stat))
+    if refreshed or touched:
+        _refresh_resource_contents(conn, refreshed, config, touched=touched)
+
+    return [
+        Resource(
+            id=row["id"],
+            type=row["type"],
+            title=row["title"],
+            path=row["path"],
+            content=contents.get(row["id"], row["content"]),
+            content_hash=row["content_hash"],
+            source_ref=row["source_ref"],
+            versions=_split_concat(row["version_list"]),
+            tags=_split_concat(row["tag_list"]),
+            indexed_at=row["indexed_at"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+        for row in rows
+    ]
+
+
+def _read_changed_script(row) -> Optional[tuple[str, os.stat_result]]:
+    """Re-read a script resource's file if it may have changed on disk.
+
+    An unchanged mtime and size mean the file was not touched since it was
+    last read, so the read is skipped entirely.
+
+    Args:
+        row: Resource row (needs type, path, file_mtime_ns and file_size).
+
+    Returns:
+        Tuple of (file content, stat taken before reading), or None if the
+        resource is not a script, its file is missing, or it is untouched.
+        The content may still equal the cached content (file touched only).
+    """
+    if row["type"] != "script" or not row["path"]:
+        return None
+
+    try:
+        file_stat = os.stat(row["path"])
+    except OSError:
+        return None
+    if (file_stat.st_mtime_ns, file_stat.st_size) == (row["file_mtime_ns"], row["file_size"]):
+        return None
+
+    return Path(row["path"]).read_text(), file_stat
+
+
+def _refresh_resource_contents(
+    conn,
+    refreshed: Sequence[tuple[str, str, str, Optional[os.stat_result]]],
+    config: Config,
+    touched: Optional[Sequence[tuple[str, os.stat_result]]] = None,
+) -> None:
+    """Refresh resources' cached content and embeddings.
+
+    All embeddings are generated in one batched call before the write
+    transaction opens, so a read that notices changed scripts does not hold
+    the database's write lock while the embedding model runs.
+
+    Args:
+        conn: Database connection.
+        refreshed: (resource_id, title, content, file_stat) for each resource
+            whose content changed. file_stat, when given, must be taken
+            before content was read; it is stored so later reads can skip
+            the file while it stays unchanged.
+        config: Application config.
+        touched: (resource_id, file_stat) for files that were touched but
+            whose content is unchanged; only their stat is recorded.
+    """
+    # Re-generate embeddings
+    embedding_blobs = _embed_many_for_storage(
+        [_embedding_text(title, content) for _, title, content, _ in refreshed],
+        config,
     )
-    conn.execute(
-        "INSERT INTO resource_embeddings (resource_id, embedding) VALUES (?, ?)",
-        (resource_id, embedding_blob),
+
+    begin_write(conn)
+
+    conn.executemany(
+        "UPDATE resources SET file_mtime_ns = ?, file_size = ? WHERE id = ?",
+        (
+            (file_stat.st_mtime_ns, file_stat.st_size, resource_id)
+            for resource_id, file_stat in touched or ()
+        ),
     )
 
+    for (resource_id, _, content, file_stat), embedding_blob in zip(refreshed, embedding_blobs):
+        # Update content and hash
+        cursor = conn.execute(
+            """
+            UPDATE resources
+            SET content = ?, content_hash = ?, file_mtime_ns = ?, file_size = ?,
+                indexed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (
+                content,
+                _compute_content_hash(content),
+                file_stat.st_mtime_ns if file_stat is not None else None,
+                file_stat.st_size if file_stat is not None else None,
+                resource_id,
+            ),
+        )
+        if cursor.rowcount == 0:
+            # Deleted in the meantime
+            continue
+
+        _delete_embedding(conn, resource_id, 'resource')
+        _insert_embedding(conn, resource_id, 'resource', embedding_blob, config)
+
     conn.commit()
 
 
@@ -2639,16 +3229,14 @@ def delete_resource(resource_id: str, config: Optional[Config] = None) -> bool:
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Check if exists
-        cursor = conn.execute(
-            "SELECT id FROM resources WHERE id = ?",
-            (resource_id,),
-        )
-        if cursor.fetchone() is None:
+        begin_write(conn)
+
+        # Delete (cascades to versions, tags via FK); the row count doubles
+        # as the existence check
+        cursor = conn.execute("DELETE FROM resources WHERE id = ?", (resource_id,))
+        if cursor.rowcount == 0:
             return False
 
-        # Delete (cascades to versions, tags via FK)
-        conn.execute("DELETE FROM resources WHERE id = ?", (resource_id,))
         # Manually delete embedding (vec0 tables don't support FK cascades)
         conn.execute("DELETE FROM resource_embeddings WHERE resource_id = ?", (resource_id,))
         conn.commit()
@@ -2673,24 +3261,133 @@ def refresh_resource(resource_id: str, config: Optional[Config] = None) -> bool:
 
     with get_db(config) as conn:
         cursor = conn.execute(
-            "SELECT path FROM resources WHERE id = ?",
+            "SELECT title, path, content FROM resources WHERE id = ?",
             (resource_id,),
         )
         row = cursor.fetchone()
         if row is None or not row["path"]:
             return False
-
-        from pathlib import Path as PathLib
-        path = PathLib(row["path"])
+        path = Path(row["path"])
         if not path.exists():
             return False
 
+        # Stat before reading, so a write in between is caught on next read
+        file_stat = path.stat()
         content = path.read_text()
-        _refresh_resource_content(conn, resource_id, content, config)
+        if content == row["content"]:
+            # Unchanged: skip re-embedding, only record the new stat
+            _refresh_resource_contents(conn, [], config, touched=[(resource_id, file_stat)])
+        else:
+            _refresh_resource_contents(
+                conn, [(resource_id, row["title"], content, file_stat)], config
+            )
 
     return True
 
 
+# Resources re-embedded per reindex_resources() call by the admin CLI
+REINDEX_BATCH_SIZE = 32
+
+
+def reindex_resources(
+    resource_ids: Optional[list[str]] = None,
+    config: Optional[Config] = None,
+) -> int:
+    """Re-generate the embeddings of resources and their chunks.
+
+    Every resource and chunk vector is regenerated with the configured
+    model, whether or not its text changed (e.g. after switching embedding
+    models). Resources with a source path are re-read first, and changed
+    content replaces the stored content. Their chunks are not rebuilt from
+    the new content; re-import the resource (add_resource with the same
+    path) for that.
+
+    Embeddings are generated in batches before anything is written, then
+    the content updates and both sets of vectors are committed together.
+
+    Args:
+        resource_ids: Resources to reindex (default: all of them).
+        config: Configuration to use.
+
+    Returns:
+        Number of resources reindexed.
+    """
+    if config is None:
+        config = get_config()
+
+    ensure_initialized(config)
+
+    if resource_ids is not None and not resource_ids:
+        return 0
+
+    resource_filter, chunk_filter = "", ""
+    params: list[Any] = []
+    if resource_ids is not None:
+        placeholders, params = in_placeholders(resource_ids)
+        resource_filter = f"WHERE id IN ({placeholders})"
+        chunk_filter = f"WHERE resource_id IN ({placeholders})"
+
+    with get_db(config) as conn:
+        rows = conn.execute(
+            f"SELECT id, title, path, content FROM resources {resource_filter}",
+            params,
+        ).fetchall()
+        chunk_rows = conn.execute(
+            f"SELECT id, title, breadcrumb, content FROM resource_chunks {chunk_filter}",
+            params,
+        ).fetchall()
+
+    changed = []
+    texts = []
+    for row in rows:
+        content = row["content"]
+        path = Path(row["path"]) if row["path"] else None
+        if path is not None and path.exists():
+            # Stat before reading, so a write in between is caught on next read
+            file_stat = path.stat()
+            current_content = path.read_text()
+            if current_content != content:
+                content = current_content
+                changed.append((
+                    content,
+                    _compute_content_hash(content),
+                    file_stat.st_mtime_ns,
+                    file_stat.st_size,
+                    row["id"],
+                ))
+        texts.append(_embedding_text(row["title"], content or ""))
+    texts.extend(
+        _chunk_embedding_text(chunk["title"], chunk["breadcrumb"], chunk["content"])
+        for chunk in chunk_rows
+    )
+
+    embedding_blobs = _embed_many_for_storage(texts, config)
+
+    with transaction(config) as conn:
+        begin_write(conn)
+        conn.executemany(
+            """
+            UPDATE resources
+            SET content = ?, content_hash = ?, file_mtime_ns = ?, file_size = ?,
+                indexed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            changed,
+        )
+        bulk_insert_embeddings(
+            "resource_embeddings",
+            zip((row["id"] for row in rows), embedding_blobs[:len(rows)]),
+            config,
+        )
+        bulk_insert_embeddings(
+            "chunk_embeddings",
+            zip((chunk["id"] for chunk in chunk_rows), embedding_blobs[len(rows):]),
+            config,
+        )
+
+    return len(rows)
+
+
 def update_resource(
     resource_id: str,
     tags: Optional[list[str]] = None,
@@ -2713,20 +3410,24 @@ def update_resource(
 
     ensure_initialized(config)
 
-    # Check if resource exists
-    resource = get_resource(resource_id, config)
-    if resource is None:
-        return False
-
     # Resolve tag aliases
     if tags is not None:
         tags = _resolve_tag_aliases(tags, config)
 
     with get_db(config) as conn:
+        begin_write(conn)
+
+        # Update timestamp (doubles as the existence check)
+        cursor = conn.execute(
+            "UPDATE resources SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (resource_id,)
+        )
+        if cursor.rowcount == 0:
+            return False
+
         # Update tags if provided
         if tags is not None:
-            _delete_tags(conn, resource_id, 'resource')
-            _save_tags(conn, resource_id, 'resource', tags)
+            _replace_tags(conn, resource_id, 'resource', tags)
 
         # Update versions if provided
         if versions is not None:
@@ -2734,20 +3435,78 @@ def update_resource(
             if versions:
                 conn.executemany(
                     "INSERT INTO resource_versions (resource_id, version) VALUES (?, ?)",
-                    [(resource_id, v) for v in versions],
+                    ((resource_id, v) for v in versions),
                 )
 
-        # Update timestamp
-        conn.execute(
-            "UPDATE resources SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (resource_id,)
-        )
-
         conn.commit()
 
     return True
 
 
+def _fetch_chunks(
+    conn,
+    resource_id: str,
+    chunk_index: Optional[int] = None,
+    include_parent: bool = True,
+) -> list[ResourceChunk]:
+    """Fetch a resource's chunks, with parent metadata, in a single query.
+
+    The parent's versions and tags are group_concat subqueries on the bound
+    resource ID rather than on each chunk row, so SQLite evaluates them once
+    per statement instead of once per chunk.
+
+    Args:
+        conn: Database connection.
+        resource_id: The parent resource ID.
+        chunk_index: Only fetch the chunk at this index.
+        include_parent: Include parent resource metadata (title, versions, tags).
+
+    Returns:
+        List of chunks ordered by chunk_index; empty if the resource is missing.
+    """
+    if include_parent:
+        parent_columns = """r.title AS resource_title,
+            (SELECT group_concat(version, char(31)) FROM resource_versions
+             WHERE resource_id = ?1) AS version_list,
+            (SELECT group_concat(tag, char(31)) FROM resource_tags
+             WHERE resource_id = ?1) AS tag_list"""
+    else:
+        parent_columns = "NULL AS resource_title, NULL AS version_list, NULL AS tag_list"
+
+    query = f"""
+        SELECT c.*, {parent_columns}
+        FROM resource_chunks c
+        JOIN resources r ON r.id = c.resource_id
+        WHERE c.resource_id = ?1
+    """
+    params: tuple = (resource_id,)
+    if chunk_index is not None:
+        query += " AND c.chunk_index = ?2"
+        params += (chunk_index,)
+    query += " ORDER BY c.chunk_index"
+
+    return [
+        ResourceChunk(
+            id=row["id"],
+            resource_id=row["resource_id"],
+            chunk_index=row["chunk_index"],
+            title=row["title"],
+            content=row["content"],
+            breadcrumb=row["breadcrumb"],
+            start_line=row["start_line"],
+            end_line=row["end_line"],
+            token_count=row["token_count"],
+            summary=row["summary"],
+            summary_generated_at=row["summary_generated_at"],
+            sections=json.loads(row["sections"]) if row["sections"] else [],
+            resource_title=row["resource_title"],
+            resource_versions=_split_concat(row["version_list"]),
+            resource_tags=_split_concat(row["tag_list"]),
+        )
+        for row in conn.execute(query, params).fetchall()
+    ]
+
+
 def get_chunk(
     chunk_id: str,
     include_parent: bool = True,
@@ -2775,65 +3534,11 @@ def get_chunk(
         return None
 
     with get_db(config) as conn:
-        # Get chunk by resource_id and chunk_index
-        cursor = conn.execute(
-            "SELECT * FROM resource_chunks WHERE resource_id = ? AND chunk_index = ?",
-            (parsed.resource_id, parsed.chunk_index),
+        chunks = _fetch_chunks(
+            conn, parsed.resource_id, parsed.chunk_index, include_parent=include_parent
         )
-        row = cursor.fetchone()
-        if row is None:
-            return None
 
-        resource_title = None
-        resource_versions = []
-        resource_tags = []
-
-        if include_parent:
-            # Get parent resource info
-            cursor = conn.execute(
-                "SELECT title FROM resources WHERE id = ?",
-                (row["resource_id"],),
-            )
-            parent = cursor.fetchone()
-            if parent:
-                resource_title = parent["title"]
-
-            # Get versions
-            cursor = conn.execute(
-                "SELECT version FROM resource_versions WHERE resource_id = ?",
-                (row["resource_id"],),
-            )
-            resource_versions = [r["version"] for r in cursor.fetchall()]
-
-            # Get tags
-            cursor = conn.execute(
-                "SELECT tag FROM resource_tags WHERE resource_id = ?",
-                (row["resource_id"],),
-            )
-            resource_tags = [r["tag"] for r in cursor.fetchall()]
-
-        # Parse sections from JSON
-        sections = []
-        if row["sections"]:
-            sections = json.loads(row["sections"])
-
-        return ResourceChunk(
-            id=row["id"],
-            resource_id=row["resource_id"],
-            chunk_index=row["chunk_index"],
-            title=row["title"],
-            content=row["content"],
-            breadcrumb=row["breadcrumb"],
-            start_line=row["start_line"],
-            end_line=row["end_line"],
-            token_count=row["token_count"],
-            summary=row["summary"],
-            summary_generated_at=row["summary_generated_at"],
-            sections=sections,
-            resource_title=resource_title,
-            resource_versions=resource_versions,
-            resource_tags=resource_tags,
-        )
+    return chunks[0] if chunks else None
 
 
 def list_chunks(
@@ -2855,65 +3560,7 @@ def list_chunks(
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Get parent resource info first
-        cursor = conn.execute(
-            "SELECT title FROM resources WHERE id = ?",
-            (resource_id,),
-        )
-        parent = cursor.fetchone()
-        if parent is None:
-            return []
-
-        resource_title = parent["title"]
-
-        # Get versions
-        cursor = conn.execute(
-            "SELECT version FROM resource_versions WHERE resource_id = ?",
-            (resource_id,),
-        )
-        resource_versions = [r["version"] for r in cursor.fetchall()]
-
-        # Get tags
-        cursor = conn.execute(
-            "SELECT tag FROM resource_tags WHERE resource_id = ?",
-            (resource_id,),
-        )
-        resource_tags = [r["tag"] for r in cursor.fetchall()]
-
-        # Get all chunks
-        cursor = conn.execute(
-            "SELECT * FROM resource_chunks WHERE resource_id = ? ORDER BY chunk_index",
-            (resource_id,),
-        )
-
-        chunks = []
-        for row in cursor.fetchall():
-            # Parse sections from JSON
-            sections = []
-            if row["sections"]:
-                sections = json.loads(row["sections"])
-
-            chunks.append(
-                ResourceChunk(
-                    id=row["id"],
-                    resource_id=row["resource_id"],
-                    chunk_index=row["chunk_index"],
-                    title=row["title"],
-                    content=row["content"],
-                    breadcrumb=row["breadcrumb"],
-                    start_line=row["start_line"],
-                    end_line=row["end_line"],
-                    token_count=row["token_count"],
-                    summary=row["summary"],
-                    summary_generated_at=row["summary_generated_at"],
-                    sections=sections,
-                    resource_title=resource_title,
-                    resource_versions=resource_versions,
-                    resource_tags=resource_tags,
-                )
-            )
-
-        return chunks
+        return _fetch_chunks(conn, resource_id)
 
 
 def list_resources(
@@ -2944,43 +3591,35 @@ def list_resources(
     if tags:
         tags = _resolve_tag_aliases(tags, config)
 
-    with get_db(config) as conn:
-        # Build query with filters
-        query = "SELECT DISTINCT r.id FROM resources r"
-        joins = []
-        conditions = []
-        params = []
-
-        if version:
-            joins.append("JOIN resource_versions rv ON r.id = rv.resource_id")
-            conditions.append("rv.version = ?")
-            params.append(version)
+    conditions = []
+    params: list = []
 
-        if tags:
-            joins.append("JOIN resource_tags rt ON r.id = rt.resource_id")
-            placeholders = ",".join("?" * len(tags))
-            conditions.append(f"rt.tag IN ({placeholders})")
-            params.extend(tags)
-
-        if pattern:
-            conditions.append("r.title LIKE ?")
-            params.append(f"%{pattern}%")
+    if version:
+        conditions.append(
+            "r.id IN (SELECT resource_id FROM resource_versions WHERE version = ?)"
+        )
+        params.append(version)
 
-        if resource_type:
-            conditions.append("r.type = ?")
-            params.append(resource_type)
+    if tags:
+        placeholders, tag_params = in_placeholders(tags)
+        conditions.append(
+            f"r.id IN (SELECT resource_id FROM resource_tags WHERE tag IN ({placeholders}))"
+        )
+        params.extend(tag_params)
 
-        if joins:
-            query += " " + " ".join(joins)
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        query += " ORDER BY r.title"
+    if pattern:
+        # The trigram index answers LIKE directly (patterns of 3+ characters)
+        conditions.append(
+            "r.id IN (SELECT resource_id FROM resources_title_fts WHERE title LIKE ?)"
+        )
+        params.append(f"%{pattern}%")
 
-        cursor = conn.execute(query, params)
-        resource_ids = [row["id"] for row in cursor.fetchall()]
+    if resource_type:
+        conditions.append("r.type = ?")
+        params.append(resource_type)
 
-    # Fetch full resources
-    return [get_resource(rid, config) for rid in resource_ids if get_resource(rid, config)]
+    with get_db(config) as conn:
+        return _fetch_resources(conn, conditions, params, config)
 
 
 # --- Rule Operations (v2) ---
@@ -3033,6 +3672,8 @@ def suggest_rule(
     rule_id = generate_entity_id("rule")
 
     with get_db(config) as conn:
+        begin_write(conn)
+
         # Insert rule (approved=False by default)
         conn.execute(
             """
@@ -3045,19 +3686,15 @@ def suggest_rule(
         # Insert tags
         _save_tags(conn, rule_id, 'rule', tags)
 
-        # Insert links to lessons (via edges table)
-        if linked_lessons:
-            conn.executemany(
-                "INSERT INTO edges (from_id, from_type, to_id, to_type, relation) VALUES (?, 'rule', ?, 'lesson', 'related_to')",
-                [(rule_id, lid) for lid in linked_lessons],
-            )
-
-        # Insert links to resources (via edges table)
-        if linked_resources:
-            conn.executemany(
-                "INSERT INTO edges (from_id, from_type, to_id, to_type, relation) VALUES (?, 'rule', ?, 'resource', 'related_to')",
-                [(rule_id, rid) for rid in linked_resources],
-            )
+        # Insert links to lessons and resources (via edges table)
+        _multi_insert(
+            conn,
+            """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+               VALUES""",
+            [(rule_id, 'rule', lid, 'lesson', 'related_to') for lid in linked_lessons or ()]
+            + [(rule_id, 'rule', rid, 'resource', 'related_to') for rid in linked_resources or ()],
+            "ON CONFLICT DO NOTHING",
+        )
 
         conn.commit()
 
@@ -3090,40 +3727,29 @@ def update_rule(
 
     ensure_initialized(config)
 
-    # Check if rule exists
-    rule = get_rule(rule_id, config)
-    if rule is None:
-        return False
-
     # Resolve tag aliases
     if tags is not None:
         tags = _resolve_tag_aliases(tags, config)
 
     with get_db(config) as conn:
-        # Build update query dynamically
-        updates = []
-        params = []
-
-        if title is not None:
-            updates.append("title = ?")
-            params.append(title)
-        if content is not None:
-            updates.append("content = ?")
-            params.append(content)
-        if rationale is not None:
-            updates.append("rationale = ?")
-            params.append(rationale)
-
-        if updates:
-            updates.append("updated_at = CURRENT_TIMESTAMP")
-            query = f"UPDATE rules SET {', '.join(updates)} WHERE id = ?"
-            params.append(rule_id)
-            conn.execute(query, params)
+        begin_write(conn)
+
+        changes = _column_changes(title=title, content=content, rationale=rationale)
+
+        if changes:
+            query = _update_sql("rules", tuple(changes))
+            found = conn.execute(query, [*changes.values(), rule_id]).rowcount > 0
+        else:
+            found = conn.execute(
+                "SELECT 1 FROM rules WHERE id = ?",
+                (rule_id,),
+            ).fetchone() is not None
+        if not found:
+            return False
 
         # Update tags if provided
         if tags is not None:
-            _delete_tags(conn, rule_id, 'rule')
-            _save_tags(conn, rule_id, 'rule', tags)
+            _replace_tags(conn, rule_id, 'rule', tags)
 
         conn.commit()
 
@@ -3146,51 +3772,8 @@ def get_rule(rule_id: str, config: Optional[Config] = None) -> Optional[Rule]:
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        # Get rule
-        cursor = conn.execute(
-            "SELECT * FROM rules WHERE id = ?",
-            (rule_id,),
-        )
-        row = cursor.fetchone()
-        if row is None:
-            return None
-
-        # Get tags
-        cursor = conn.execute(
-            "SELECT tag FROM rule_tags WHERE rule_id = ?",
-            (rule_id,),
-        )
-        tags = [r["tag"] for r in cursor.fetchall()]
-
-        # Get linked lessons (from edges table)
-        cursor = conn.execute(
-            "SELECT to_id FROM edges WHERE from_id = ? AND from_type = 'rule' AND to_type = 'lesson'",
-            (rule_id,),
-        )
-        linked_lessons = [r["to_id"] for r in cursor.fetchall()]
-
-        # Get linked resources (from edges table)
-        cursor = conn.execute(
-            "SELECT to_id FROM edges WHERE from_id = ? AND from_type = 'rule' AND to_type = 'resource'",
-            (rule_id,),
-        )
-        linked_resources = [r["to_id"] for r in cursor.fetchall()]
-
-        return Rule(
-            id=row["id"],
-            title=row["title"],
-            content=row["content"],
-            rationale=row["rationale"],
-            approved=bool(row["approved"]),
-            approved_at=row["approved_at"],
-            approved_by=row["approved_by"],
-            suggested_by=row["suggested_by"],
-            tags=tags,
-            linked_lessons=linked_lessons,
-            linked_resources=linked_resources,
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-        )
+        rules = _fetch_rules(conn, "SELECT ? AS id", (rule_id,))
+    return rules[0] if rules else None
 
 
 def approve_rule(
@@ -3265,12 +3848,59 @@ def list_pending_rules(config: Optional[Config] = None) -> list[Rule]:
     ensure_initialized(config)
 
     with get_db(config) as conn:
-        cursor = conn.execute(
-            "SELECT id FROM rules WHERE approved = 0 ORDER BY created_at DESC"
-        )
-        rule_ids = [row["id"] for row in cursor.fetchall()]
+        return _fetch_rules(conn, "SELECT id FROM rules WHERE approved = 0")
+
+
+def _fetch_rules(conn, rule_ids_sql: str, params: tuple = ()) -> list[Rule]:
+    """Fetch rules with their tags and linked lessons/resources.
 
-    return [get_rule(rid, config) for rid in rule_ids if get_rule(rid, config)]
+    The rule set is defined by ``rule_ids_sql`` (a query selecting an ``id``
+    column) and reused as a CTE; tags and links come back as group_concat
+    columns, so the whole set is fetched in a single query.
+
+    Args:
+        conn: Database connection.
+        rule_ids_sql: SQL selecting the IDs of the rules to fetch.
+        params: Parameters for ``rule_ids_sql``.
+
+    Returns:
+        List of rules, most recently created first.
+    """
+    cursor = conn.execute(
+        f"""
+        WITH matched AS ({rule_ids_sql})
+        SELECT r.*,
+            (SELECT group_concat(tag, char(31)) FROM rule_tags
+             WHERE rule_id = r.id) AS tag_list,
+            (SELECT group_concat(to_id, char(31)) FROM edges
+             WHERE from_id = r.id AND from_type = 'rule' AND to_type = 'lesson') AS lesson_list,
+            (SELECT group_concat(to_id, char(31)) FROM edges
+             WHERE from_id = r.id AND from_type = 'rule' AND to_type = 'resource') AS resource_list
+        FROM rules r
+        JOIN matched m ON m.id = r.id
+        ORDER BY r.created_at DESC
+        """,
+        params,
+    )
+
+    return [
+        Rule(
+            id=row["id"],
+            title=row["title"],
+            content=row["content"],
+            rationale=row["rationale"],
+            approved=bool(row["approved"]),
+            approved_at=row["approved_at"],
+            approved_by=row["approved_by"],
+            suggested_by=row["suggested_by"],
+            tags=_split_concat(row["tag_list"]),
+            linked_lessons=_split_concat(row["lesson_list"]),
+            linked_resources=_split_concat(row["resource_list"]),
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+        for row in cursor.fetchall()
+    ]
 
 
 def link_to_rule(
@@ -3299,16 +3929,14 @@ def link_to_rule(
         raise ValueError(f"Invalid target type: {target_type}")
 
     with get_db(config) as conn:
-        try:
-            conn.execute(
-                "INSERT INTO edges (from_id, from_type, to_id, to_type, relation) VALUES (?, 'rule', ?, ?, 'related_to')",
-                (rule_id, target_id, target_type),
-            )
-            conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            # Link already exists
-            return False
+        cursor = conn.execute(
+            """INSERT INTO edges (from_id, from_type, to_id, to_type, relation)
+               VALUES (?, 'rule', ?, ?, 'related_to')
+               ON CONFLICT DO NOTHING""",
+            (rule_id, target_id, target_type),
+        )
+        conn.commit()
+        return cursor.rowcount == 1
 
 
 def unlink_from_rule(
@@ -3427,11 +4055,9 @@ def get_resource_links(
 
     with get_db(config) as conn:
         # Get chunk IDs for this resource
-        chunk_cursor = conn.execute(
-            "SELECT id FROM resource_chunks WHERE resource_id = ?",
-            (resource_id,),
+        chunk_ids = fetch_column(
+            conn, "SELECT id FROM resource_chunks WHERE resource_id = ?", (resource_id,)
         )
-        chunk_ids = [row["id"] for row in chunk_cursor.fetchall()]
 
         # Query edges from this resource or its chunks
         if chunk_ids:
@@ -3499,11 +4125,9 @@ def get_related_resources(
 
     with get_db(config) as conn:
         # Get chunk IDs for this resource (for incoming links to chunks)
-        chunk_cursor = conn.execute(
-            "SELECT id FROM resource_chunks WHERE resource_id = ?",
-            (resource_id,),
+        chunk_ids = fetch_column(
+            conn, "SELECT id FROM resource_chunks WHERE resource_id = ?", (resource_id,)
         )
-        chunk_ids = [row["id"] for row in chunk_cursor.fetchall()]
 
         # Incoming links (to this resource or its chunks)
         if chunk_ids:
@@ -3589,49 +4213,51 @@ def update_resource_paths(
 
     counts = {"resources": 0, "anchors": 0}
 
+    # Rewrite matching paths in SQL (one statement per table rather than one
+    # UPDATE per row). substr() is 1-indexed, so skip len(from_prefix) chars.
+    like_pattern = f"{from_prefix}%"
+    suffix_start = len(from_prefix) + 1
+
     with get_db(config) as conn:
-        # Find resources with paths matching the prefix
-        cursor = conn.execute(
-            "SELECT id, path FROM resources WHERE path LIKE ?",
-            (f"{from_prefix}%",),
-        )
-        resources_to_update = []
-        for row in cursor.fetchall():
-            old_path = row["path"]
-            new_path = to_prefix + old_path[len(from_prefix):]
-            resources_to_update.append((row["id"], old_path, new_path))
+        if dry_run:
+            cursor = conn.execute(
+                "SELECT COUNT(*) AS count FROM resources WHERE path LIKE ?",
+                (like_pattern,),
+            )
+            counts["resources"] = cursor.fetchone()["count"]
 
-        counts["resources"] = len(resources_to_update)
+            cursor = conn.execute(
+                "SELECT COUNT(*) AS count FROM resource_anchors WHERE to_path LIKE ?",
+                (like_pattern,),
+            )
+            counts["anchors"] = cursor.fetchone()["count"]
+            return counts
 
-        # Find anchors with to_path matching the prefix
+        begin_write(conn)
+
+        # Update resource paths
         cursor = conn.execute(
-            "SELECT id, to_path FROM resource_anchors WHERE to_path LIKE ?",
-            (f"{from_prefix}%",),
+            """
+            UPDATE resources
+            SET path = ? || substr(path, ?), updated_at = CURRENT_TIMESTAMP
+            WHERE path LIKE ?
+            """,
+            (to_prefix, suffix_start, like_pattern),
         )
-        anchors_to_update = []
-        for row in cursor.fetchall():
-            old_path = row["to_path"]
-            new_path = to_prefix + old_path[len(from_prefix):]
-            anchors_to_update.append((row["id"], new_path))
-
-        counts["anchors"] = len(anchors_to_update)
-
-        if not dry_run:
-            # Update resource paths
-            for resource_id, old_path, new_path in resources_to_update:
-                conn.execute(
-                    "UPDATE resources SET path = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (new_path, resource_id),
-                )
+        counts["resources"] = cursor.rowcount
 
-            # Update anchor paths
-            for anchor_id, new_path in anchors_to_update:
-                conn.execute(
-                    "UPDATE resource_anchors SET to_path = ? WHERE id = ?",
-                    (new_path, anchor_id),
-                )
+        # Update anchor paths
+        cursor = conn.execute(
+            """
+            UPDATE resource_anchors
+            SET to_path = ? || substr(to_path, ?)
+            WHERE to_path LIKE ?
+            """,
+            (to_prefix, suffix_start, like_pattern),
+        )
+        counts["anchors"] = cursor.rowcount
 
-            conn.commit()
+        conn.commit()
 
     return counts
 
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import atexit
+import threading
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Generator, Optional
+from typing import Any, Callable, Generator, Iterable, Optional, Sequence
 
 # Try to use pysqlite3 which has extension loading enabled,
 # fall back to standard sqlite3
@@ -23,17 +26,37 @@ from .schema import (
     SCHEMA_VERSION,
     SEED_CONFIDENCE_LEVELS,
     SEED_SOURCE_TYPES,
+    VECTOR_ELEMENT_TYPES,
     VECTOR_TABLE_SQL,
 )
 
+# int8 embeddings use sqlite-vec's 'unit' quantization, which maps [-1, 1]
+# onto [-127, 127]; KNN distances come back scaled by the same factor
+INT8_UNIT_SCALE = 127
+
+# Prepared statements kept per connection (sqlite3's default is 128). Since
+# connections are reused per thread, the working set of the CRUD paths plus
+# the power-of-two multi-row INSERT variants can stay prepared.
+STATEMENT_CACHE_SIZE = 512
+
+# Bytes of the database file to read through a memory map (256 MiB)
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Page cache per connection in KiB (negative cache_size means KiB, not
+# pages); 64 MiB keeps the vector tables' hot pages resident
+PAGE_CACHE_KIB = 64 * 1024
+
 
 def _get_connection(db_path: Path) -> sqlite3.Connection:
     """Create a database connection with sqlite-vec extension loaded.
 
     Configures the connection with:
     - Row factory for dict-like access to query results
+    - A larger prepared-statement cache (STATEMENT_CACHE_SIZE)
     - sqlite-vec extension for vector similarity search
     - WAL mode for better read concurrency
+    - synchronous=NORMAL, temp_store=MEMORY and memory-mapped reads
+    - A larger page cache (PAGE_CACHE_KIB)
     - Foreign key constraint enforcement
 
     Args:
@@ -42,31 +65,223 @@ def _get_connection(db_path: Path) -> sqlite3.Connection:
     Returns:
         Configured SQLite connection.
     """
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     conn.enable_load_extension(True)
     sqlite_vec.load(conn)
     conn.enable_load_extension(False)
     # Enable WAL mode for better concurrency
     conn.execute("PRAGMA journal_mode=WAL")
+    # Under WAL, NORMAL only syncs at checkpoints rather than on every
+    # commit; a power loss can drop the last commits but not corrupt the db
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # Keep sorter/temp b-trees (ORDER BY, GROUP BY, group_concat) off disk
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_KIB}")
     # Enable foreign keys
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+class _TransactionConnection:
+    """Connection proxy handed out by get_db() inside a transaction() block.
+
+    Commits and closes are deferred to the enclosing transaction, so helpers
+    that commit after each write join the surrounding batch instead.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+
+    def commit(self) -> None:
+        """No-op; the enclosing transaction() commits on exit."""
+
+    def close(self) -> None:
+        """No-op; the enclosing transaction() closes on exit."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+# Active transaction per thread: (db_path, proxy) or None
+_transaction_state = threading.local()
+
+# Reusable connection per thread: cached = (db_path, connection) or None,
+# in_use = True while a get_db() block holds it
+_connection_state = threading.local()
+
+
+def _cached_connection(db_path: Path) -> sqlite3.Connection:
+    """Return this thread's connection to db_path, opening it if needed.
+
+    Only one connection is kept per thread; switching databases closes the
+    previous one.
+    """
+    cached = getattr(_connection_state, "cached", None)
+    if cached is not None:
+        if cached[0] == db_path:
+            return cached[1]
+        cached[1].close()
+    conn = _get_connection(db_path)
+    _connection_state.cached = (db_path, conn)
+    return conn
+
+
+def _close_cached_connection() -> None:
+    """Close and forget this thread's cached connection, if any."""
+    cached = getattr(_connection_state, "cached", None)
+    _connection_state.cached = None
+    if cached is not None:
+        cached[1].close()
+
+
+atexit.register(_close_cached_connection)
+
+
 @contextmanager
 def get_db(config: Optional[Config] = None) -> Generator[sqlite3.Connection, None, None]:
-    """Get a database connection as a context manager."""
+    """Get a database connection as a context manager.
+
+    The thread's connection is reused across calls, so the extension load
+    and PRAGMAs are paid once and SQLite's statement cache stays warm. On
+    exit, anything not committed is rolled back, just as closing a fresh
+    connection would. A nested get_db() block gets its own connection, since
+    the outer block may have a transaction open.
+
+    Inside a transaction() block for the same database, the transaction's
+    connection is reused and commits are deferred until the block exits.
+    """
     if config is None:
         config = get_config()
 
-    conn = _get_connection(config.db_path)
+    active = _active_transaction(config)
+    if active is not None:
+        yield active
+        return
+
+    if getattr(_connection_state, "in_use", False):
+        conn = _get_connection(config.db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    conn = _cached_connection(config.db_path)
+    _connection_state.in_use = True
     try:
         yield conn
+    except BaseException:
+        # Don't keep a connection that may be in a bad state
+        _close_cached_connection()
+        raise
+    finally:
+        _connection_state.in_use = False
+        cached = getattr(_connection_state, "cached", None)
+        if cached is not None and cached[1].in_transaction:
+            cached[1].rollback()
+
+
+def in_placeholders(values: Sequence[Any]) -> tuple[str, list[Any]]:
+    """Build the placeholders and parameters for an SQL ``IN (...)`` list.
+
+    The list is padded with NULLs up to the next power of two, so queries
+    over similarly sized lists share one SQL string and hit the connection's
+    statement cache instead of being re-parsed and re-planned. NULL never
+    matches in ``IN``, so padding doesn't change results (don't use this
+    for ``NOT IN``).
+
+    Args:
+        values: Values to match against (must be non-empty).
+
+    Returns:
+        Tuple of (comma-separated placeholders, padded parameter list).
+    """
+    params = list(values)
+    size = 1 << (len(params) - 1).bit_length()
+    params.extend([None] * (size - len(params)))
+    return ",".join("?" * size), params
+
+
+def fetch_column(conn: sqlite3.Connection, sql: str, params: Sequence[Any] = ()) -> list[Any]:
+    """Run a query and return the values of its first column.
+
+    Reads through a cursor with no row factory, so no sqlite3.Row is built
+    (and no column looked up by name) per result row.
+
+    Args:
+        conn: Database connection.
+        sql: Query whose first column is wanted.
+        params: Query parameters.
+
+    Returns:
+        First-column values, in result order.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return [row[0] for row in cursor.execute(sql, params)]
+
+
+def _active_transaction(config: Config) -> Optional[_TransactionConnection]:
+    """Return this thread's open transaction connection for config's database."""
+    active = getattr(_transaction_state, "active", None)
+    if active is not None and active[0] == config.db_path:
+        return active[1]
+    return None
+
+
+@contextmanager
+def transaction(config: Optional[Config] = None) -> Generator[sqlite3.Connection, None, None]:
+    """Group several write operations into a single commit.
+
+    Core API calls made inside the block share one connection and are
+    committed together when the block exits (or rolled back on error),
+    so a bulk operation pays for one fsync instead of one per call.
+
+    Example:
+        with transaction(config):
+            for rule_id in rule_ids:
+                core.approve_rule(rule_id, config=config)
+    """
+    if config is None:
+        config = get_config()
+
+    if getattr(_transaction_state, "active", None) is not None:
+        # Nested block: the outermost transaction owns the commit
+        with get_db(config) as conn:
+            yield conn
+        return
+
+    # Initialize up front: init_db() runs executescript(), which would commit
+    # mid-transaction, so it is skipped while the block is open.
+    init_db(config)
+
+    conn = _get_connection(config.db_path)
+    _transaction_state.active = (config.db_path, _TransactionConnection(conn))
+    try:
+        yield _transaction_state.active[1]
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
     finally:
+        _transaction_state.active = None
         conn.close()
 
 
+def begin_write(conn: sqlite3.Connection) -> None:
+    """Open a write transaction with BEGIN IMMEDIATE.
+
+    Taking the write lock up front means a multi-statement write never
+    has to upgrade a read lock partway through, which can fail with
+    SQLITE_BUSY under concurrent writers. Does nothing if a transaction is
+    already open (e.g. inside transaction()).
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
 def init_db(config: Optional[Config] = None, force: bool = False) -> None:
     """Initialize the database with schema and seed data.
 
@@ -77,35 +292,37 @@ def init_db(config: Optional[Config] = None, force: bool = False) -> None:
     if config is None:
         config = get_config()
 
+    if not force and _active_transaction(config) is not None:
+        # transaction() initialized the database before opening
+        return
+
     # Ensure directory exists
     config.db_path.parent.mkdir(parents=True, exist_ok=True)
 
     with get_db(config) as conn:
-        # Check if already initialized
-        cursor = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='meta'"
-        )
-        is_new = cursor.fetchone() is None
+        # Neither the schema script nor migrations create the vector tables,
+        # so this set stays accurate for the vector table checks below
+        existing = _existing_tables(conn)
 
-        # Create schema
-        conn.executescript(SCHEMA_SQL)
+        # Check if already initialized
+        is_new = "meta" not in existing
 
         if is_new:
+            # Create schema
+            conn.executescript(SCHEMA_SQL)
+
             # Set schema version
-            conn.execute(
-                "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
-                (str(SCHEMA_VERSION),),
-            )
+            _set_schema_version(conn)
 
-            # Seed confidence levels
-            conn.executemany(
-                "INSERT OR IGNORE INTO confidence_levels (name, ordinal) VALUES (?, ?)",
+            # Seed confidence levels and source types
+            _insert_seed_rows(
+                conn,
+                "INSERT OR IGNORE INTO confidence_levels (name, ordinal) VALUES",
                 SEED_CONFIDENCE_LEVELS,
             )
-
-            # Seed source types
-            conn.executemany(
-                "INSERT OR IGNORE INTO source_types (name, description, typical_confidence) VALUES (?, ?, ?)",
+            _insert_seed_rows(
+                conn,
+                "INSERT OR IGNORE INTO source_types (name, description, typical_confidence) VALUES",
                 SEED_SOURCE_TYPES,
             )
         else:
@@ -113,466 +330,239 @@ def init_db(config: Optional[Config] = None, force: bool = False) -> None:
             _run_migrations(conn, config)
 
         # Create or verify vector tables
-        _ensure_vector_table(conn, config, force)
-        _ensure_resource_vector_tables(conn, config, force)
+        _ensure_vector_tables(conn, config, existing, force)
 
         conn.commit()
 
 
-def _ensure_vector_table(
-    conn: sqlite3.Connection, config: Config, force: bool = False
-) -> None:
-    """Ensure the vector table exists with correct dimensions."""
-    dimensions = config.embedding.dimensions
+def _insert_seed_rows(conn: sqlite3.Connection, sql_prefix: str, rows: Sequence[tuple]) -> None:
+    """Insert seed rows with a single multi-row VALUES statement.
 
-    # Check if vector table exists
-    cursor = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='lesson_embeddings'"
+    Args:
+        conn: Database connection.
+        sql_prefix: Statement up to and including ``VALUES``.
+        rows: Parameter tuples, all of the same length.
+    """
+    row_sql = "(" + ",".join("?" * len(rows[0])) + ")"
+    conn.execute(
+        f"{sql_prefix} {','.join([row_sql] * len(rows))}",
+        [value for row in rows for value in row],
     )
-    exists = cursor.fetchone() is not None
 
-    if exists and not force:
-        # Verify dimensions match (stored in meta)
-        cursor = conn.execute(
-            "SELECT value FROM meta WHERE key = 'embedding_dimensions'"
-        )
-        row = cursor.fetchone()
-        if row is None:
-            raise ValueError(
-                "Vector table exists but dimensions not in meta - database may be "
-                "corrupted. Use init_db(force=True) to recreate."
-            )
-        stored_dims = int(row[0])
-        if stored_dims != dimensions:
-            raise ValueError(
-                f"Embedding dimensions mismatch: config has {dimensions}, "
-                f"database has {stored_dims}. Use force=True to recreate "
-                "the vector table (will require re-embedding all lessons)."
-            )
-        return
 
-    if exists and force:
-        # Drop and recreate
-        conn.execute("DROP TABLE IF EXISTS lesson_embeddings")
+def _existing_tables(conn: sqlite3.Connection) -> set[str]:
+    """Names of all tables in the database, read in one query."""
+    return set(fetch_column(conn, "SELECT name FROM sqlite_master WHERE type = 'table'"))
 
-    # Create vector table
-    conn.execute(VECTOR_TABLE_SQL.format(dimensions=dimensions))
 
-    # Store dimensions in meta
-    conn.execute(
-        "INSERT OR REPLACE INTO meta (key, value) VALUES ('embedding_dimensions', ?)",
-        (str(dimensions),),
-    )
+# Vector tables with their ID column and CREATE template
+_VECTOR_TABLES = (
+    ("lesson_embeddings", "lesson_id", VECTOR_TABLE_SQL),
+    ("resource_embeddings", "resource_id", RESOURCE_VECTOR_TABLE_SQL),
+    ("chunk_embeddings", "chunk_id", CHUNK_VECTOR_TABLE_SQL),
+)
 
 
-def _ensure_resource_vector_tables(
-    conn: sqlite3.Connection, config: Config, force: bool = False
+@lru_cache(maxsize=16)
+def _vector_table_ddl(table_sql: str, storage: str, dimensions: int) -> str:
+    """CREATE statement for a vector table with the given storage and dimensions."""
+    return table_sql.format(element_type=VECTOR_ELEMENT_TYPES[storage], dimensions=dimensions)
+
+
+def _ensure_vector_tables(
+    conn: sqlite3.Connection, config: Config, existing: set[str], force: bool = False
 ) -> None:
-    """Ensure the resource and chunk vector tables exist."""
+    """Ensure the vector tables exist with correct dimensions and storage.
+
+    If the lesson vector table exists, the dimensions and storage recorded
+    in meta must match the config. Missing tables are created (all of them
+    with force=True, after dropping the old ones).
+
+    Args:
+        conn: Database connection.
+        config: Configuration whose embedding settings to use.
+        existing: Names of the tables already in the database.
+        force: Recreate the vector tables even if the settings differ.
+
+    Raises:
+        ValueError: If the config has no dimensions, or the stored settings
+            don't match it.
+    """
     dimensions = config.embedding.dimensions
+    storage = config.embedding.storage
+    if dimensions is None:
+        # EmbeddingConfig fills in the model's default, so only a config
+        # whose dimensions were cleared after construction gets here
+        raise ValueError("Embedding dimensions are not set in the config.")
+
+    if "lesson_embeddings" in existing and not force:
+        _check_vector_settings(conn, dimensions, storage)
+    else:
+        # Store dimensions and storage in meta
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [("embedding_dimensions", str(dimensions)), ("embedding_storage", storage)],
+        )
 
-    # Check if resource vector table exists
-    cursor = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='resource_embeddings'"
-    )
-    resource_exists = cursor.fetchone() is not None
+    for table, _, table_sql in _VECTOR_TABLES:
+        if force:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        elif table in existing:
+            continue
+        conn.execute(_vector_table_ddl(table_sql, storage, dimensions))
+
+
+def _check_vector_settings(conn: sqlite3.Connection, dimensions: int, storage: str) -> None:
+    """Check the embedding settings recorded in meta against the config."""
+    stored = dict(conn.execute(
+        """
+        SELECT key, value FROM meta
+        WHERE key IN ('embedding_dimensions', 'embedding_storage')
+        """
+    ).fetchall())
+
+    if "embedding_dimensions" not in stored:
+        raise ValueError(
+            "Vector table exists but dimensions not in meta - database may be "
+            "corrupted. Use init_db(force=True) to recreate."
+        )
+    stored_dims = int(stored["embedding_dimensions"])
+    if stored_dims != dimensions:
+        raise ValueError(
+            f"Embedding dimensions mismatch: config has {dimensions}, "
+            f"database has {stored_dims}. Use force=True to recreate "
+            "the vector table (will require re-embedding all lessons)."
+        )
+    # Databases created before storage was configurable are float32
+    stored_storage = stored.get("embedding_storage", "float32")
+    if stored_storage != storage:
+        raise ValueError(
+            f"Embedding storage mismatch: config has {storage}, "
+            f"database has {stored_storage}. Use force=True to recreate "
+            "the vector tables (will require re-embedding all content)."
+        )
 
-    # Check if chunk vector table exists
-    cursor = conn.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='chunk_embeddings'"
-    )
-    chunk_exists = cursor.fetchone() is not None
 
-    if force:
-        conn.execute("DROP TABLE IF EXISTS resource_embeddings")
-        conn.execute("DROP TABLE IF EXISTS chunk_embeddings")
-        resource_exists = False
-        chunk_exists = False
+def quantize_embeddings(config: Optional[Config] = None) -> int:
+    """Convert a float32 database's stored embeddings to int8 in place.
 
-    if not resource_exists:
-        conn.execute(RESOURCE_VECTOR_TABLE_SQL.format(dimensions=dimensions))
+    Rebuilds each vector table with int8 columns and quantizes the existing
+    vectors in SQL, so nothing is re-embedded. Afterwards, set
+    ``embedding.storage: int8`` in the config to open the database.
 
-    if not chunk_exists:
-        conn.execute(CHUNK_VECTOR_TABLE_SQL.format(dimensions=dimensions))
+    Args:
+        config: Configuration whose database to convert.
 
+    Returns:
+        Number of vectors converted.
 
-def _run_migrations(conn: sqlite3.Connection, config: Config) -> None:
-    """Run database migrations for existing databases."""
-    # Get current schema version
-    cursor = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'")
-    row = cursor.fetchone()
-    current_version = int(row[0]) if row else 1
-
-    if current_version < 2:
-        # v2 adds resources and rules tables (handled by SCHEMA_SQL with IF NOT EXISTS)
-        current_version = 2
-
-    if current_version < 3:
-        # v3 adds new columns to resource_chunks for chunking metadata
-        # Check if columns already exist (idempotent migration)
-        cursor = conn.execute("PRAGMA table_info(resource_chunks)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        if "breadcrumb" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN breadcrumb TEXT")
-        if "start_line" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN start_line INTEGER")
-        if "end_line" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN end_line INTEGER")
-        if "token_count" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN token_count INTEGER")
-
-        current_version = 3
-
-    if current_version < 4:
-        # v4 adds summary columns to resource_chunks for LLM-generated summaries
-        cursor = conn.execute("PRAGMA table_info(resource_chunks)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        if "summary" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN summary TEXT")
-        if "summary_generated_at" not in existing_cols:
-            conn.execute(
-                "ALTER TABLE resource_chunks ADD COLUMN summary_generated_at TIMESTAMP"
-            )
+    Raises:
+        ValueError: If the database already stores int8 embeddings.
+    """
+    if config is None:
+        config = get_config()
+
+    with get_db(config) as conn:
+        row = conn.execute(
+            "SELECT value FROM meta WHERE key = 'embedding_storage'"
+        ).fetchone()
+        if row is not None and row[0] == "int8":
+            raise ValueError("Embeddings are already stored as int8")
+        dimensions = int(conn.execute(
+            "SELECT value FROM meta WHERE key = 'embedding_dimensions'"
+        ).fetchone()[0])
 
-        current_version = 4
-
-    if current_version < 5:
-        # v5 adds sections column to resource_chunks and resource_links table
-        cursor = conn.execute("PRAGMA table_info(resource_chunks)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        if "sections" not in existing_cols:
-            conn.execute("ALTER TABLE resource_chunks ADD COLUMN sections TEXT")
-
-        # Create resource_links table if not exists
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS resource_links (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_resource_id TEXT NOT NULL REFERENCES resources(id) ON DELETE CASCADE,
-                from_chunk_id TEXT REFERENCES resource_chunks(id) ON DELETE CASCADE,
-                to_path TEXT NOT NULL,
-                to_fragment TEXT,
-                link_text TEXT,
-                resolved_resource_id TEXT REFERENCES resources(id) ON DELETE SET NULL,
-                resolved_chunk_id TEXT REFERENCES resource_chunks(id) ON DELETE SET NULL
+        begin_write(conn)
+        converted = 0
+        for table, id_col, table_sql in _VECTOR_TABLES:
+            conn.execute(
+                f"CREATE TEMP TABLE embedding_copy AS SELECT {id_col} AS id, embedding FROM {table}"
             )
-        """)
+            conn.execute(f"DROP TABLE {table}")
+            conn.execute(_vector_table_ddl(table_sql, "int8", dimensions))
+            converted += conn.execute(
+                f"""
+                INSERT INTO {table} ({id_col}, embedding)
+                SELECT id, vec_quantize_int8(embedding, 'unit') FROM temp.embedding_copy
+                """
+            ).rowcount
+            conn.execute("DROP TABLE temp.embedding_copy")
 
-        # Create indexes
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_resource_links_to_path ON resource_links(to_path)"
-        )
         conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_resource_links_from_resource ON resource_links(from_resource_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_resource_links_resolved ON resource_links(resolved_resource_id)"
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('embedding_storage', 'int8')"
         )
+        conn.commit()
 
-        current_version = 5
-
-    if current_version < 6:
-        # v6 adds lesson_links table for lesson-to-resource linking
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS lesson_links (
-                lesson_id TEXT NOT NULL REFERENCES lessons(id) ON DELETE CASCADE,
-                resource_id TEXT NOT NULL REFERENCES resources(id) ON DELETE CASCADE,
-                relation TEXT NOT NULL DEFAULT 'related_to',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (lesson_id, resource_id)
-            )
-        """)
+    return converted
 
-        # Create indexes
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_lesson_links_lesson ON lesson_links(lesson_id)"
-        )
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_lesson_links_resource ON lesson_links(resource_id)"
-        )
 
-        current_version = 6
-
-    if current_version < 7:
-        # v7 adds search_feedback table for quality monitoring
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS search_feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task TEXT NOT NULL,
-                queries TEXT NOT NULL,
-                invocation_count INTEGER NOT NULL,
-                suggestion TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+def vector_param(config: Config) -> str:
+    """SQL expression for binding a serialized float32 embedding to a vec0 column.
 
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_search_feedback_created ON search_feedback(created_at)"
-        )
+    Embeddings are always serialized as float32; int8 storage quantizes them
+    in SQL, both when inserting and when querying.
 
-        current_version = 7
+    Args:
+        config: Configuration whose embedding storage to match.
 
-    if current_version < 8:
-        # v8 adds version column to search_feedback table
-        cursor = conn.execute("PRAGMA table_info(search_feedback)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
+    Returns:
+        "?" for float32 storage, or a vec_quantize_int8() call around it.
+    """
+    if config.embedding.storage == "int8":
+        return "vec_quantize_int8(?, 'unit')"
+    return "?"
 
-        if "version" not in existing_cols:
-            conn.execute("ALTER TABLE search_feedback ADD COLUMN version TEXT")
 
-        current_version = 8
+def vector_distance(alias: str, config: Config) -> str:
+    """SQL select expression for a KNN distance in float32 units.
 
-    if current_version < 9:
-        # v9: Unify link tables into edges, rename resource_links to resource_anchors
+    Args:
+        alias: Alias of the vec0 table in the query.
+        config: Configuration whose embedding storage to match.
 
-        # 1. Create new edges table structure
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS edges_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_id TEXT NOT NULL,
-                from_type TEXT NOT NULL CHECK (from_type IN ('lesson', 'resource', 'chunk')),
-                to_id TEXT NOT NULL,
-                to_type TEXT NOT NULL CHECK (to_type IN ('lesson', 'resource', 'chunk')),
-                relation TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(from_id, from_type, to_id, to_type, relation)
-            )
-        """)
-
-        # 2. Migrate existing edges (lesson→lesson)
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='edges'")
-        if cursor.fetchone():
-            conn.execute("""
-                INSERT INTO edges_new (from_id, from_type, to_id, to_type, relation, created_at)
-                SELECT from_id, 'lesson', to_id, 'lesson', relation, created_at
-                FROM edges
-            """)
-
-        # 3. Migrate lesson_links (lesson→resource)
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='lesson_links'")
-        if cursor.fetchone():
-            conn.execute("""
-                INSERT INTO edges_new (from_id, from_type, to_id, to_type, relation, created_at)
-                SELECT lesson_id, 'lesson', resource_id, 'resource', relation, created_at
-                FROM lesson_links
-            """)
-            conn.execute("DROP TABLE lesson_links")
-
-        # 4. Create resource_anchors table (FK to edges_new, will be valid after rename)
-        # Note: We create this with no FK, then drop/recreate after rename to avoid
-        # SQLite's FK reference issues when renaming tables
-        # Include from_id/from_type for dangling link support (edge_id nullable)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS resource_anchors_temp (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_id TEXT NOT NULL,
-                from_type TEXT NOT NULL,
-                edge_id INTEGER,
-                to_path TEXT NOT NULL,
-                to_fragment TEXT,
-                link_text TEXT
-            )
-        """)
-
-        # 5. Migrate resource_links to edges + resource_anchors
-        # Migrate ALL links (both resolved and unresolved)
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resource_links'")
-        if cursor.fetchone():
-            # Get ALL resource_links (resolved and unresolved)
-            cursor = conn.execute("""
-                SELECT id, from_resource_id, from_chunk_id, to_path, to_fragment, link_text,
-                       resolved_resource_id, resolved_chunk_id
-                FROM resource_links
-            """)
-
-            for link_row in cursor.fetchall():
-                # Determine from_type and from_id
-                if link_row["from_chunk_id"]:
-                    from_id = link_row["from_chunk_id"]
-                    from_type = "chunk"
-                else:
-                    from_id = link_row["from_resource_id"]
-                    from_type = "resource"
-
-                edge_id = None
-
-                # Only create edge if link is resolved
-                if link_row["resolved_resource_id"]:
-                    # Determine to_type and to_id
-                    if link_row["resolved_chunk_id"]:
-                        to_id = link_row["resolved_chunk_id"]
-                        to_type = "chunk"
-                    else:
-                        to_id = link_row["resolved_resource_id"]
-                        to_type = "resource"
-
-                    # Insert edge
-                    conn.execute("""
-                        INSERT OR IGNORE INTO edges_new (from_id, from_type, to_id, to_type, relation)
-                        VALUES (?, ?, ?, ?, 'references')
-                    """, (from_id, from_type, to_id, to_type))
-
-                    # Get the edge ID
-                    edge_cursor = conn.execute("""
-                        SELECT id FROM edges_new
-                        WHERE from_id = ? AND from_type = ? AND to_id = ? AND to_type = ? AND relation = 'references'
-                    """, (from_id, from_type, to_id, to_type))
-                    edge_row = edge_cursor.fetchone()
-                    if edge_row:
-                        edge_id = edge_row["id"]
-
-                # Insert anchor (with or without edge_id)
-                conn.execute("""
-                    INSERT INTO resource_anchors_temp (from_id, from_type, edge_id, to_path, to_fragment, link_text)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (from_id, from_type, edge_id, link_row["to_path"], link_row["to_fragment"], link_row["link_text"]))
-
-            conn.execute("DROP TABLE resource_links")
-
-        # 6. Replace old edges table
-        conn.execute("DROP TABLE IF EXISTS edges")
-        conn.execute("ALTER TABLE edges_new RENAME TO edges")
-
-        # 7. Create final resource_anchors table with proper FK to edges
-        # edge_id is nullable to support dangling links (unresolved targets)
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS resource_anchors (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                from_id TEXT NOT NULL,
-                from_type TEXT NOT NULL CHECK (from_type IN ('resource', 'chunk')),
-                edge_id INTEGER REFERENCES edges(id) ON DELETE SET NULL,
-                to_path TEXT NOT NULL,
-                to_fragment TEXT,
-                link_text TEXT
-            )
-        """)
-
-        # 8. Migrate data from temp table
-        conn.execute("""
-            INSERT INTO resource_anchors (id, from_id, from_type, edge_id, to_path, to_fragment, link_text)
-            SELECT id, from_id, from_type, edge_id, to_path, to_fragment, link_text FROM resource_anchors_temp
-        """)
-        conn.execute("DROP TABLE IF EXISTS resource_anchors_temp")
-
-        # 9. Create indexes
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_from ON edges(from_id, from_type)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_to ON edges(to_id, to_type)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_edges_relation ON edges(relation)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_edge ON resource_anchors(edge_id)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_path ON resource_anchors(to_path)")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_from ON resource_anchors(from_id, from_type)")
-
-        current_version = 9
-
-    if current_version < 10:
-        # v10: Add from_id/from_type columns to resource_anchors for dangling link support
-        # Make edge_id nullable
-
-        # Check if columns already exist (fresh v9+ installs will have them)
-        cursor = conn.execute("PRAGMA table_info(resource_anchors)")
-        existing_cols = {row[1] for row in cursor.fetchall()}
-
-        if "from_id" not in existing_cols:
-            # Need to recreate table since SQLite doesn't support changing NOT NULL constraint
-            conn.execute("""
-                CREATE TABLE resource_anchors_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    from_id TEXT NOT NULL,
-                    from_type TEXT NOT NULL CHECK (from_type IN ('resource', 'chunk')),
-                    edge_id INTEGER REFERENCES edges(id) ON DELETE SET NULL,
-                    to_path TEXT NOT NULL,
-                    to_fragment TEXT,
-                    link_text TEXT
-                )
-            """)
-
-            # Migrate data, deriving from_id/from_type from the edge
-            conn.execute("""
-                INSERT INTO resource_anchors_new (id, from_id, from_type, edge_id, to_path, to_fragment, link_text)
-                SELECT ra.id, e.from_id, e.from_type, ra.edge_id, ra.to_path, ra.to_fragment, ra.link_text
-                FROM resource_anchors ra
-                JOIN edges e ON ra.edge_id = e.id
-            """)
-
-            conn.execute("DROP TABLE resource_anchors")
-            conn.execute("ALTER TABLE resource_anchors_new RENAME TO resource_anchors")
-
-            # Recreate indexes
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_edge ON resource_anchors(edge_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_path ON resource_anchors(to_path)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_resource_anchors_from ON resource_anchors(from_id, from_type)")
-
-        current_version = 10
-
-    if current_version < 11:
-        # v11: Change chunk IDs from ULIDs to <resource_id>.<chunk_index> format
-
-        # 1. Get all existing chunks
-        cursor = conn.execute(
-            "SELECT id, resource_id, chunk_index FROM resource_chunks"
-        )
-        chunks = cursor.fetchall()
-
-        # 2. Build mapping of old ID to new ID
-        id_mapping = {}
-        for chunk in chunks:
-            old_id = chunk["id"]
-            new_id = f"{chunk['resource_id']}.{chunk['chunk_index']}"
-            # Only add to mapping if ID format is changing
-            if old_id != new_id:
-                id_mapping[old_id] = new_id
-
-        # 3. Update chunk IDs in resource_chunks
-        for old_id, new_id in id_mapping.items():
-            conn.execute(
-                "UPDATE resource_chunks SET id = ? WHERE id = ?",
-                (new_id, old_id),
-            )
+    Returns:
+        Expression selecting the distance column as ``distance``.
+    """
+    if config.embedding.storage == "int8":
+        return f"{alias}.distance / {INT8_UNIT_SCALE}.0 AS distance"
+    return f"{alias}.distance"
 
-        # 4. Update chunk_embeddings foreign keys (vec0 doesn't support UPDATE on pk)
-        # Need to delete and re-insert
-        for old_id, new_id in id_mapping.items():
-            # Get the embedding first
-            cursor = conn.execute(
-                "SELECT embedding FROM chunk_embeddings WHERE chunk_id = ?",
-                (old_id,),
-            )
-            row = cursor.fetchone()
-            if row:
-                embedding = row["embedding"]
-                conn.execute(
-                    "DELETE FROM chunk_embeddings WHERE chunk_id = ?",
-                    (old_id,),
-                )
-                conn.execute(
-                    "INSERT INTO chunk_embeddings (chunk_id, embedding) VALUES (?, ?)",
-                    (new_id, embedding),
-                )
-
-        # 5. Update edges table (to_id where to_type='chunk', from_id where from_type='chunk')
-        for old_id, new_id in id_mapping.items():
-            conn.execute(
-                "UPDATE edges SET to_id = ? WHERE to_id = ? AND to_type = 'chunk'",
-                (new_id, old_id),
-            )
-            conn.execute(
-                "UPDATE edges SET from_id = ? WHERE from_id = ? AND from_type = 'chunk'",
-                (new_id, old_id),
-            )
 
-        # 6. Update resource_anchors (from_id where from_type='chunk')
-        for old_id, new_id in id_mapping.items():
-            conn.execute(
-                "UPDATE resource_anchors SET from_id = ? WHERE from_id = ? AND from_type = 'chunk'",
-                (new_id, old_id),
-            )
+def _add_columns(conn: sqlite3.Connection, table: str, columns: list[str]) -> None:
+    """Add columns to a table, skipping any that already exist.
 
-        current_version = 11
+    Each ALTER TABLE is simply attempted; a "duplicate column" error means
+    an earlier, interrupted migration already added it. This saves reading
+    the table's columns first.
+
+    Args:
+        conn: Database connection.
+        table: Table to alter.
+        columns: Column definitions, e.g. ``"file_size INTEGER"``.
+    """
+    for column in columns:
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e):
+                raise
+
+
+def _run_migrations(conn: sqlite3.Connection, config: Config) -> None:
+    """Run database migrations for existing databases."""
+    current_version = _stored_schema_version(conn) or 1
+
+    if current_version >= SCHEMA_VERSION:
+        # Up to date (or written by a newer release): nothing to create,
+        # and the stored version must not be lowered. Databases stamped
+        # before user_version was kept get it recorded once.
+        if conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            conn.execute(f"PRAGMA user_version = {current_version}")
+        return
 
     if current_version < 12:
-        # v12: Type-prefixed IDs - requires clean slate
+        # v12: Type-prefixed IDs - requires clean slate. Older databases
+        # can't be migrated, so fail before doing any other migration work
         raise RuntimeError(
             "I'm sorry Dave, I can't do that.\n\n"
             "Schema v12 introduces type-prefixed IDs which require a fresh database.\n"
@@ -583,7 +573,59 @@ def _run_migrations(conn: sqlite3.Connection, config: Config) -> None:
             "This is a one-time migration during rapid development."
         )
 
-    # Update schema version
+    # Create tables, indexes and triggers added since (all IF NOT EXISTS)
+    conn.executescript(SCHEMA_SQL)
+
+    if current_version < 13:
+        # v13: Backfill lesson_tag_counts (table and triggers created by SCHEMA_SQL)
+        conn.execute("DELETE FROM lesson_tag_counts")
+        conn.execute(
+            """
+            INSERT INTO lesson_tag_counts (tag, count)
+            SELECT tag, COUNT(*) FROM lesson_tags GROUP BY tag
+            """
+        )
+        current_version = 13
+
+    if current_version < 14:
+        # v14 records the source file's mtime/size so unchanged scripts are not re-read
+        _add_columns(conn, "resources", ["file_mtime_ns INTEGER", "file_size INTEGER"])
+
+        current_version = 14
+
+    if current_version < 15:
+        # v15: Backfill resources_title_fts (table and triggers created by SCHEMA_SQL)
+        conn.execute("DELETE FROM resources_title_fts")
+        conn.execute(
+            "INSERT INTO resources_title_fts (title, resource_id) SELECT title, id FROM resources"
+        )
+        current_version = 15
+
+    if current_version < 16:
+        # v16: idx_resource_chunks_order (created by SCHEMA_SQL) covers
+        # resource_id lookups, so the single-column index is redundant
+        conn.execute("DROP INDEX IF EXISTS idx_resource_chunks_resource")
+        current_version = 16
+
+    _set_schema_version(conn)
+
+
+def _stored_schema_version(conn: sqlite3.Connection) -> Optional[int]:
+    """Read the schema version, from the header's user_version if set.
+
+    user_version is read straight from the database header; databases
+    stamped before it was kept fall back to the meta row.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version:
+        return version
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    return int(row[0]) if row else None
+
+
+def _set_schema_version(conn: sqlite3.Connection) -> None:
+    """Record SCHEMA_VERSION in both user_version and the meta row."""
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.execute(
         "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
         (str(SCHEMA_VERSION),),
@@ -599,25 +641,36 @@ def get_schema_version(config: Optional[Config] = None) -> Optional[int]:
         return None
 
     with get_db(config) as conn:
-        cursor = conn.execute(
-            "SELECT value FROM meta WHERE key = 'schema_version'"
-        )
-        row = cursor.fetchone()
-        return int(row[0]) if row else None
+        return _stored_schema_version(conn)
 
 
 def execute_query(
     query: str,
     params: tuple = (),
     config: Optional[Config] = None,
-) -> list[sqlite3.Row]:
-    """Execute a query and return all results."""
+    *,
+    row_factory: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = sqlite3.Row,
+) -> list[Any]:
+    """Execute a query and return all results.
+
+    Args:
+        query: SQL query.
+        params: Query parameters.
+        config: Configuration to use.
+        row_factory: Row factory for the results. Pass None to get plain
+            tuples, which skips building a sqlite3.Row per result row when
+            columns are only read by position.
+
+    Returns:
+        All result rows.
+    """
     if config is None:
         config = get_config()
 
     with get_db(config) as conn:
-        cursor = conn.execute(query, params)
-        return cursor.fetchall()
+        cursor = conn.cursor()
+        cursor.row_factory = row_factory
+        return cursor.execute(query, params).fetchall()
 
 
 def execute_write(
@@ -640,10 +693,111 @@ def execute_many(
     params_list: list[tuple],
     config: Optional[Config] = None,
 ) -> None:
-    """Execute a query multiple times with different parameters."""
+    """Execute a query multiple times with different parameters.
+
+    All executions share one BEGIN IMMEDIATE transaction and one commit.
+    For several different statements, use execute_write_batch().
+    """
     if config is None:
         config = get_config()
 
     with get_db(config) as conn:
+        begin_write(conn)
         conn.executemany(query, params_list)
         conn.commit()
+
+
+def execute_write_batch(
+    queries: Sequence[tuple[str, tuple]],
+    config: Optional[Config] = None,
+) -> int:
+    """Execute several write queries in one transaction.
+
+    Prefer this over calling execute_write() in a loop: the statements share
+    one BEGIN IMMEDIATE/COMMIT (and one WAL sync) instead of one each, and
+    either all of them are applied or none are.
+
+    Args:
+        queries: (query, params) pairs, executed in order.
+        config: Configuration to use.
+
+    Returns:
+        Total rows affected.
+    """
+    if config is None:
+        config = get_config()
+
+    with get_db(config) as conn:
+        begin_write(conn)
+        affected = 0
+        for query, params in queries:
+            affected += max(conn.execute(query, params).rowcount, 0)
+        conn.commit()
+        return affected
+
+
+def bulk_insert_embeddings(
+    table: str,
+    rows: Iterable[tuple[str, bytes]],
+    config: Optional[Config] = None,
+    *,
+    relax_sync: bool = False,
+) -> int:
+    """Replace many embeddings in one write, for rebuilds such as re-embedding.
+
+    Existing embeddings for the given IDs are replaced, all in one BEGIN
+    IMMEDIATE transaction (or the caller's, inside transaction()).
+
+    With relax_sync=True the write runs with synchronous=OFF, so its commit
+    skips the fsync. If the OS crashes or power is lost before the data
+    reaches disk, the database file can be corrupted, WAL mode included,
+    not merely lose the rebuild. Only use it for throwaway or freshly
+    backed-up databases. The previous sync level is restored afterwards.
+    Inside an open transaction the sync level cannot change, and relax_sync
+    is ignored.
+
+    Args:
+        table: Vector table name (one of lesson_embeddings,
+            resource_embeddings, chunk_embeddings).
+        rows: (entity_id, serialized float32 embedding) pairs.
+        config: Configuration to use.
+        relax_sync: Write with synchronous=OFF (see above).
+
+    Returns:
+        Number of embeddings written.
+
+    Raises:
+        ValueError: If table is not a vector table.
+    """
+    if config is None:
+        config = get_config()
+
+    id_cols = {name: id_col for name, id_col, _ in _VECTOR_TABLES}
+    if table not in id_cols:
+        raise ValueError(f"Not a vector table: {table}")
+    id_col = id_cols[table]
+    rows = list(rows)
+
+    with get_db(config) as conn:
+        saved_sync = None
+        if relax_sync and _active_transaction(config) is None and not conn.in_transaction:
+            saved_sync = conn.execute("PRAGMA synchronous").fetchone()[0]
+            conn.execute("PRAGMA synchronous=OFF")
+        try:
+            begin_write(conn)
+            conn.executemany(
+                f"DELETE FROM {table} WHERE {id_col} = ?", ((rid,) for rid, _ in rows)
+            )
+            conn.executemany(
+                f"INSERT INTO {table} ({id_col}, embedding) VALUES (?, {vector_param(config)})",
+                rows,
+            )
+            conn.commit()
+        finally:
+            if saved_sync is not None:
+                # The sync level can't change inside a transaction
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute(f"PRAGMA synchronous={int(saved_sync)}")
+
+    return len(rows)
@@ -5,7 +5,9 @@ from __future__ import annotations
 import os
 import threading
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 from .config import Config, EmbeddingConfig, get_config
 
@@ -23,6 +25,14 @@ class EmbeddingBackend(ABC):
         """Generate embeddings for multiple texts."""
         pass
 
+    def embed_batch_array(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts as a float32 matrix.
+
+        Backends that produce arrays natively should override this to skip
+        the round trip through Python lists.
+        """
+        return np.asarray(self.embed_batch(texts), dtype=np.float32)
+
     @property
     @abstractmethod
     def dimensions(self) -> int:
@@ -58,6 +68,11 @@ class SentenceTransformersBackend(EmbeddingBackend):
         embeddings = self.model.encode(texts, convert_to_numpy=True)
         return [e.tolist() for e in embeddings]
 
+    def embed_batch_array(self, texts: list[str]) -> np.ndarray:
+        """Generate embeddings for multiple texts as a float32 matrix."""
+        embeddings = self.model.encode(texts, convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
     @property
     def dimensions(self) -> int:
         """Return the embedding dimensions."""
@@ -168,30 +183,97 @@ def get_embedder(config: Optional[Config] = None) -> EmbeddingBackend:
 # Global embedder instance (lazy loaded) with thread safety
 _embedder: Optional[EmbeddingBackend] = None
 _embedder_lock = threading.Lock()
+# (backend, settings key) that _embedder was built for
+_embedder_source: Optional[tuple[EmbeddingBackend, tuple]] = None
 
 
-def embed_text(text: str, config: Optional[Config] = None) -> list[float]:
-    """Generate an embedding for the given text using the configured backend."""
-    global _embedder
+def _embedding_key(config: Config) -> tuple:
+    """Settings that determine which backend instance embeds for a config."""
+    embedding_config = config.embedding
+    return (embedding_config.backend, embedding_config.model, embedding_config.api_key)
+
+
+def _get_cached_embedder(config: Optional[Config]) -> EmbeddingBackend:
+    """Return the global embedder, rebuilding it only if the settings changed.
+
+    Building a backend is expensive (sentence-transformers reloads its model
+    on first use), so an explicitly passed config only triggers a rebuild
+    when its backend, model, or API key differ from the current embedder's.
+    """
+    global _embedder, _embedder_source
     with _embedder_lock:
-        if _embedder is None or config is not None:
-            # Reinitialize if config is explicitly provided
+        if config is None:
+            if _embedder is None:
+                _embedder = get_embedder(config)
+            return _embedder
+
+        key = _embedding_key(config)
+        if (
+            _embedder is None
+            or _embedder_source is None
+            or _embedder_source[0] is not _embedder
+            or _embedder_source[1] != key
+        ):
             _embedder = get_embedder(config)
-        embedder = _embedder
-    return embedder.embed(text)
+            _embedder_source = (_embedder, key)
+        return _embedder
+
+
+def embed_text(text: str, config: Optional[Config] = None) -> list[float]:
+    """Generate an embedding for the given text using the configured backend."""
+    embedder = _get_cached_embedder(config)
+    return _normalize([embedder.embed(text)])[0]
 
 
 def embed_batch(texts: list[str], config: Optional[Config] = None) -> list[list[float]]:
     """Generate embeddings for multiple texts using the configured backend."""
-    global _embedder
-    with _embedder_lock:
-        if _embedder is None:
-            _embedder = get_embedder(config)
-        embedder = _embedder
-    return embedder.embed_batch(texts)
+    embedder = _get_cached_embedder(config)
+    return _normalize(embedder.embed_batch(texts))
+
+
+def embed_batch_array(texts: list[str], config: Optional[Config] = None) -> np.ndarray:
+    """Generate embeddings for multiple texts as a float32 matrix.
+
+    Same vectors as embed_batch(), one row per text. Serializing rows of the
+    matrix for storage is a memcpy, with no per-float Python objects along
+    the way.
+    """
+    embedder = _get_cached_embedder(config)
+    return _normalize_array(embedder.embed_batch_array(texts))
+
+
+def _normalize(embeddings: Sequence[Sequence[float]]) -> list[list[float]]:
+    """L2-normalize embeddings so vector distance ranks like cosine distance.
+
+    Stored and query vectors are always unit length, whatever the backend,
+    which is also what int8 storage's [-1, 1] quantization assumes.
+    """
+    if len(embeddings) == 0:
+        return []
+    return _normalize_array(np.asarray(embeddings, dtype=np.float32)).tolist()
+
+
+def _normalize_array(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a float32 embedding matrix (see _normalize)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
 
 
 def reload_embedder(config: Optional[Config] = None) -> None:
     """Reload the embedder with new configuration."""
-    global _embedder
-    _embedder = get_embedder(config)
+    global _embedder, _embedder_source
+    if config is None:
+        config = get_config()
+    with _embedder_lock:
+        _embedder = get_embedder(config)
+        _embedder_source = (_embedder, _embedding_key(config))
+
+
+def serialize_embedding(embedding: Sequence[float]) -> bytes:
+    """Serialize an embedding to the float32 BLOB format used by sqlite-vec.
+
+    Converts in one contiguous copy rather than boxing every float through
+    struct.pack(), and is zero-copy when given a float32 ndarray.
+    """
+    return np.ascontiguousarray(embedding, dtype=np.float32).tobytes()
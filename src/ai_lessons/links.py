@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import json
 import re
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import NamedTuple, Optional
+from typing import NamedTuple, Optional, Sequence
 
 # Try to use pysqlite3 which has extension loading enabled,
 # fall back to standard sqlite3
@@ -16,6 +17,19 @@ except ImportError:
 
 from .chunking import Chunk
 
+# Markdown links, in one pass: either [text](path) / [text](path#fragment),
+# excluding URLs (http://, https://, mailto:), or same-file fragment links
+# [text](#section). Link text can't span lines, so the whole document is
+# scanned at once with the same matches as per line.
+_LINK_PATTERN = re.compile(
+    r"\[(?P<text>[^\]\n]+)\]\("
+    r"(?:(?P<frag_only>#[^)\s]+)"
+    r"|(?!https?://|mailto:)(?P<path>[^)#\s]+)(?P<frag>#[^)\s]+)?)"
+    r"\)"
+)
+
+_NEWLINE = re.compile(r"\n")
+
 
 class ExtractedLink(NamedTuple):
     """A link extracted from markdown content."""
@@ -37,82 +51,156 @@ def extract_links(content: str, source_path: str) -> list[ExtractedLink]:
     Returns:
         List of extracted links with resolved paths.
     """
-    # Pattern: [text](path) or [text](path#fragment)
-    # Excludes URLs (http://, https://, mailto:, #-only)
-    pattern = r"\[([^\]]+)\]\((?!https?://|mailto:|#)([^)#\s]+)(#[^)\s]+)?\)"
-
     source_dir = Path(source_path).parent
+    line_starts = _line_starts(content)
+    # resolve() stats the filesystem; documents often repeat a link target
+    resolved_paths: dict[str, str] = {}
     links = []
 
-    for line_num, line in enumerate(content.split("\n"), 1):
-        for match in re.finditer(pattern, line):
-            link_text = match.group(1)
-            path = match.group(2)
-            fragment_with_hash = match.group(3)
-
-            # Resolve relative path to absolute
-            if path.startswith("/"):
-                absolute_path = path
-            else:
-                absolute_path = str((source_dir / path).resolve())
-
-            # Extract fragment without #
-            fragment = None
-            if fragment_with_hash:
-                fragment = fragment_with_hash[1:]  # Remove leading #
+    for match in _LINK_PATTERN.finditer(content):
+        link_text = match.group("text")
+        line_number = bisect_right(line_starts, match.start())
 
+        fragment_only = match.group("frag_only")
+        if fragment_only:
+            # Same-file fragment link: [text](#section)
             links.append(
                 ExtractedLink(
                     link_text=link_text,
-                    path=path,
-                    fragment=fragment,
-                    absolute_path=absolute_path,
-                    line_number=line_num,
+                    path="",  # Same file
+                    fragment=fragment_only[1:],  # Remove #
+                    absolute_path=source_path,  # Same file
+                    line_number=line_number,
                 )
             )
+            continue
 
-    # Also extract same-file fragment links: [text](#section)
-    fragment_pattern = r"\[([^\]]+)\]\((#[^)\s]+)\)"
-    for line_num, line in enumerate(content.split("\n"), 1):
-        for match in re.finditer(fragment_pattern, line):
-            link_text = match.group(1)
-            fragment = match.group(2)[1:]  # Remove #
+        path = match.group("path")
+        fragment_with_hash = match.group("frag")
 
-            links.append(
-                ExtractedLink(
-                    link_text=link_text,
-                    path="",  # Same file
-                    fragment=fragment,
-                    absolute_path=source_path,  # Same file
-                    line_number=line_num,
-                )
+        # Resolve relative path to absolute
+        if path.startswith("/"):
+            absolute_path = path
+        else:
+            absolute_path = resolved_paths.get(path)
+            if absolute_path is None:
+                absolute_path = str((source_dir / path).resolve())
+                resolved_paths[path] = absolute_path
+
+        # Extract fragment without #
+        fragment = None
+        if fragment_with_hash:
+            fragment = fragment_with_hash[1:]  # Remove leading #
+
+        links.append(
+            ExtractedLink(
+                link_text=link_text,
+                path=path,
+                fragment=fragment,
+                absolute_path=absolute_path,
+                line_number=line_number,
             )
+        )
 
     return links
 
 
-def find_chunk_for_line(chunks: list[Chunk], line_number: int) -> Optional[str]:
-    """Find which chunk contains a given line number.
+def _line_starts(content: str) -> list[int]:
+    """Offsets at which each line of content starts.
+
+    ``bisect_right(line_starts, offset)`` is then the 1-indexed line number
+    of the character at offset.
+    """
+    return [0] + [match.end() for match in _NEWLINE.finditer(content)]
+
+
+class ChunkIndex(NamedTuple):
+    """Chunks ordered by start line, for binary-searching a line's chunk."""
+
+    starts: list[int]  # 0-indexed start_line of each chunk, ascending
+    max_ends: list[int]  # Largest end_line among the chunks up to each one
+    positions: list[int]  # Position of each chunk in the list it was built from
+
+
+def build_chunk_index(chunks: Sequence[Chunk]) -> ChunkIndex:
+    """Build a line lookup index over a document's chunks.
+
+    Build it once per document and reuse it for every link in that document.
+    Chunk ranges may overlap (fixed-size chunks that end on a sentence
+    boundary share a line with the next chunk); lookups then return the
+    earliest chunk containing the line, as a front-to-back scan over chunks
+    in document order would.
 
     Args:
-        chunks: List of chunks with start_line and end_line.
+        chunks: Chunks with start_line and end_line.
+
+    Returns:
+        Index for use with chunk_position_for_line().
+    """
+    starts: list[int] = []
+    max_ends: list[int] = []
+    positions: list[int] = []
+
+    # Stable sort, so chunks sharing a start line keep their list order
+    for position in sorted(range(len(chunks)), key=lambda i: chunks[i].start_line):
+        chunk = chunks[position]
+        starts.append(chunk.start_line)
+        max_ends.append(max(chunk.end_line, max_ends[-1]) if max_ends else chunk.end_line)
+        positions.append(position)
+
+    return ChunkIndex(starts=starts, max_ends=max_ends, positions=positions)
+
+
+def chunk_position_for_line(index: ChunkIndex, line_number: int) -> Optional[int]:
+    """Find the position of the earliest chunk containing a given line number.
+
+    Args:
+        index: Index from build_chunk_index().
         line_number: 1-indexed line number.
 
     Returns:
-        Chunk ID if found, None otherwise.
+        Position of the chunk in the list the index was built from, or None.
     """
     # Convert to 0-indexed for comparison with chunk.start_line/end_line
     line_idx = line_number - 1
 
-    for chunk in chunks:
-        if chunk.start_line <= line_idx <= chunk.end_line:
-            # Chunks don't have an ID until stored - return index as string
-            # The caller will map this to actual chunk IDs
-            return str(chunk.index)
+    # Chunks [0, candidates) start at or before the line; the first of them
+    # whose running max end reaches the line is the first that contains it
+    candidates = bisect_right(index.starts, line_idx)
+    i = bisect_left(index.max_ends, line_idx, 0, candidates)
+    if i < candidates:
+        return index.positions[i]
 
     return None
 
 
+def find_chunk_for_line(
+    chunks: list[Chunk],
+    line_number: int,
+    index: Optional[ChunkIndex] = None,
+) -> Optional[str]:
+    """Find which chunk contains a given line number.
+
+    Args:
+        chunks: List of chunks with start_line and end_line.
+        line_number: 1-indexed line number.
+        index: Index from build_chunk_index(chunks); built on the fly if omitted.
+
+    Returns:
+        Chunk ID if found, None otherwise.
+    """
+    if index is None:
+        index = build_chunk_index(chunks)
+
+    position = chunk_position_for_line(index, line_number)
+    if position is None:
+        return None
+
+    # Chunks don't have an ID until stored - return index as string
+    # The caller will map this to actual chunk IDs
+    return str(chunks[position].index)
+
+
 def resolve_link_to_resource(conn: sqlite3.Connection, to_path: str) -> Optional[str]:
     """Find a resource matching the given path.
 
@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import subprocess
+from pathlib import Path
 from typing import Any, Optional
 
 from mcp.server import Server
@@ -716,15 +717,15 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
                 return [TextContent(type="text", text="Link already exists or lessons not found.")]
 
         elif name == "tags":
-            tags = core.list_tags(with_counts=arguments.get("with_counts", False))
+            names, counts = core.list_tag_columns(with_counts=arguments.get("with_counts", False))
 
-            if not tags:
+            if not names:
                 return [TextContent(type="text", text="No tags found.")]
 
             if arguments.get("with_counts"):
-                lines = [f"{t.name} ({t.count})" for t in tags]
+                lines = [f"{name} ({count})" for name, count in zip(names, counts)]
             else:
-                lines = [t.name for t in tags]
+                lines = names
 
             return [TextContent(type="text", text="\n".join(lines))]
 
@@ -743,7 +744,6 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
         # --- Resource handlers ---
 
         elif name == "add_resource":
-            from pathlib import Path
             path = arguments["path"]
             if not Path(path).exists():
                 return [TextContent(type="text", text=f"Error: Path does not exist: {path}")]
@@ -865,7 +865,6 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
             if not resource.path:
                 return [TextContent(type="text", text="Error: Script has no path")]
 
-            from pathlib import Path
             if not Path(resource.path).exists():
                 return [TextContent(type="text", text=f"Error: Script file not found: {resource.path}")]
 
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-SCHEMA_VERSION = 12
+SCHEMA_VERSION = 16
 
 # Schema creation SQL
 SCHEMA_SQL = """
@@ -43,6 +43,33 @@ CREATE TABLE IF NOT EXISTS lesson_tags (
     PRIMARY KEY (lesson_id, tag)
 );
 
+-- v13: Lessons per tag, kept current by the triggers below so listing tags
+-- reads one row per distinct tag instead of scanning every lesson_tags row
+CREATE TABLE IF NOT EXISTS lesson_tag_counts (
+    tag TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS lesson_tags_count_insert AFTER INSERT ON lesson_tags
+BEGIN
+    INSERT INTO lesson_tag_counts (tag, count) VALUES (NEW.tag, 1)
+    ON CONFLICT(tag) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS lesson_tags_count_delete AFTER DELETE ON lesson_tags
+BEGIN
+    UPDATE lesson_tag_counts SET count = count - 1 WHERE tag = OLD.tag;
+    DELETE FROM lesson_tag_counts WHERE tag = OLD.tag AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS lesson_tags_count_update AFTER UPDATE OF tag ON lesson_tags
+BEGIN
+    UPDATE lesson_tag_counts SET count = count - 1 WHERE tag = OLD.tag;
+    DELETE FROM lesson_tag_counts WHERE tag = OLD.tag AND count <= 0;
+    INSERT INTO lesson_tag_counts (tag, count) VALUES (NEW.tag, 1)
+    ON CONFLICT(tag) DO UPDATE SET count = count + 1;
+END;
+
 -- Contexts (when does this lesson apply/not apply?)
 CREATE TABLE IF NOT EXISTS lesson_contexts (
     lesson_id TEXT NOT NULL REFERENCES lessons(id) ON DELETE CASCADE,
@@ -92,6 +119,8 @@ CREATE TABLE IF NOT EXISTS resources (
     path TEXT,                              -- Filesystem path (required for scripts, optional for docs)
     content BLOB,                           -- Stored for docs, cached for scripts
     content_hash TEXT,                      -- For change detection
+    file_mtime_ns INTEGER,                  -- v14: st_mtime_ns when content was last read from path
+    file_size INTEGER,                      -- v14: st_size when content was last read from path
     source_ref TEXT,                        -- Git commit ref (auto-captured)
     indexed_at TIMESTAMP,                   -- When content was last indexed
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -200,7 +229,34 @@ CREATE INDEX IF NOT EXISTS idx_resources_type ON resources(type);
 CREATE INDEX IF NOT EXISTS idx_resources_indexed ON resources(indexed_at);
 CREATE INDEX IF NOT EXISTS idx_resource_versions_version ON resource_versions(version);
 CREATE INDEX IF NOT EXISTS idx_resource_tags_tag ON resource_tags(tag);
-CREATE INDEX IF NOT EXISTS idx_resource_chunks_resource ON resource_chunks(resource_id);
+-- v16: Path lookups (re-import, link resolution) and in-order chunk listing
+CREATE INDEX IF NOT EXISTS idx_resources_path ON resources(path);
+CREATE INDEX IF NOT EXISTS idx_resource_chunks_order ON resource_chunks(resource_id, chunk_index);
+
+-- v15: Trigram index over resource titles, so the case-insensitive substring
+-- filter (title LIKE '%pattern%') is an index lookup instead of a table scan.
+-- Keyed by resource ID rather than rowid, which VACUUM may renumber.
+CREATE VIRTUAL TABLE IF NOT EXISTS resources_title_fts USING fts5(
+    title,
+    resource_id UNINDEXED,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS resources_title_fts_insert AFTER INSERT ON resources
+BEGIN
+    INSERT INTO resources_title_fts (title, resource_id) VALUES (NEW.title, NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS resources_title_fts_delete AFTER DELETE ON resources
+BEGIN
+    DELETE FROM resources_title_fts WHERE resource_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS resources_title_fts_update AFTER UPDATE OF title ON resources
+WHEN NEW.title IS NOT OLD.title
+BEGIN
+    UPDATE resources_title_fts SET title = NEW.title WHERE resource_id = OLD.id;
+END;
 
 -- v2: Indexes for rules
 CREATE INDEX IF NOT EXISTS idx_rules_approved ON rules(approved);
@@ -227,11 +283,17 @@ SEED_SOURCE_TYPES = [
 ]
 
 # Vector table creation (separate because it uses sqlite-vec extension)
-# The dimension is configurable based on embedding model
+# The dimension is configurable based on embedding model, and the element
+# type on the configured embedding storage
+VECTOR_ELEMENT_TYPES = {
+    "float32": "FLOAT",
+    "int8": "INT8",
+}
+
 VECTOR_TABLE_SQL = """
 CREATE VIRTUAL TABLE IF NOT EXISTS lesson_embeddings USING vec0(
     lesson_id TEXT PRIMARY KEY,
-    embedding FLOAT[{dimensions}]
+    embedding {element_type}[{dimensions}]
 );
 """
 
@@ -239,14 +301,14 @@ CREATE VIRTUAL TABLE IF NOT EXISTS lesson_embeddings USING vec0(
 RESOURCE_VECTOR_TABLE_SQL = """
 CREATE VIRTUAL TABLE IF NOT EXISTS resource_embeddings USING vec0(
     resource_id TEXT PRIMARY KEY,
-    embedding FLOAT[{dimensions}]
+    embedding {element_type}[{dimensions}]
 );
 """
 
 CHUNK_VECTOR_TABLE_SQL = """
 CREATE VIRTUAL TABLE IF NOT EXISTS chunk_embeddings USING vec0(
     chunk_id TEXT PRIMARY KEY,
-    embedding FLOAT[{dimensions}]
+    embedding {element_type}[{dimensions}]
 );
 """
 
@@ -9,8 +9,8 @@ from dataclasses import dataclass
 from typing import Optional
 
 from .config import Config, get_config
-from .db import get_db
-from .embeddings import embed_text
+from .db import fetch_column, get_db, in_placeholders, vector_distance, vector_param
+from .embeddings import embed_text, serialize_embedding
 
 
 from dataclasses import field
@@ -162,11 +162,7 @@ def _fetch_lesson_properties(
         Tuple of (tags, contexts, anti_contexts).
     """
     # Get tags
-    cursor = conn.execute(
-        "SELECT tag FROM lesson_tags WHERE lesson_id = ?",
-        (lesson_id,),
-    )
-    tags = [r["tag"] for r in cursor.fetchall()]
+    tags = fetch_column(conn, "SELECT tag FROM lesson_tags WHERE lesson_id = ?", (lesson_id,))
 
     # Get contexts
     cursor = conn.execute(
@@ -206,24 +202,24 @@ def _build_lesson_filter_clauses(
     params: list = []
 
     if tag_filter:
-        placeholders = ",".join("?" * len(tag_filter))
+        placeholders, in_params = in_placeholders(tag_filter)
         clauses.append(f"""
             l.id IN (
                 SELECT lesson_id FROM lesson_tags
                 WHERE tag IN ({placeholders})
             )
         """)
-        params.extend(tag_filter)
+        params.extend(in_params)
 
     if context_filter:
-        placeholders = ",".join("?" * len(context_filter))
+        placeholders, in_params = in_placeholders(context_filter)
         clauses.append(f"""
             l.id IN (
                 SELECT lesson_id FROM lesson_contexts
                 WHERE context IN ({placeholders}) AND applies = TRUE
             )
         """)
-        params.extend(context_filter)
+        params.extend(in_params)
 
     if confidence_min:
         clauses.append("""
@@ -260,28 +256,28 @@ def _build_resource_filter_clauses(
     params: list = []
 
     if tag_filter:
-        placeholders = ",".join("?" * len(tag_filter))
+        placeholders, in_params = in_placeholders(tag_filter)
         clauses.append(f"""
             r.id IN (
                 SELECT resource_id FROM resource_tags
                 WHERE tag IN ({placeholders})
             )
         """)
-        params.extend(tag_filter)
+        params.extend(in_params)
 
     if resource_type:
         clauses.append("r.type = ?")
         params.append(resource_type)
 
     if versions:
-        placeholders = ",".join("?" * len(versions))
+        placeholders, in_params = in_placeholders(versions)
         clauses.append(f"""
             r.id IN (
                 SELECT resource_id FROM resource_versions
                 WHERE version IN ({placeholders})
             )
         """)
-        params.extend(versions)
+        params.extend(in_params)
 
     return clauses, params
 
@@ -299,17 +295,12 @@ def _fetch_resource_metadata(
     Returns:
         Tuple of (versions_set, tags_list).
     """
-    cursor = conn.execute(
-        "SELECT version FROM resource_versions WHERE resource_id = ?",
-        (resource_id,),
-    )
-    versions = {r["version"] for r in cursor.fetchall()}
-
-    cursor = conn.execute(
-        "SELECT tag FROM resource_tags WHERE resource_id = ?",
-        (resource_id,),
+    versions = set(fetch_column(
+        conn, "SELECT version FROM resource_versions WHERE resource_id = ?", (resource_id,)
+    ))
+    tags = fetch_column(
+        conn, "SELECT tag FROM resource_tags WHERE resource_id = ?", (resource_id,)
     )
-    tags = [r["tag"] for r in cursor.fetchall()]
 
     return versions, tags
 
@@ -456,6 +447,7 @@ def vector_search(
             context_filter,
             confidence_min,
             source_filter,
+            config,
         )
 
         return [_row_to_result(conn, row, row["distance"], query) for row in results]
@@ -555,19 +547,18 @@ def _execute_vector_search(
     context_filter: Optional[list[str]],
     confidence_min: Optional[str],
     source_filter: Optional[str],
+    config: Config,
 ) -> list[sqlite3.Row]:
     """Execute a vector search with optional filters."""
-    import struct
-
     # Serialize embedding for sqlite-vec
-    embedding_blob = struct.pack(f"{len(query_embedding)}f", *query_embedding)
+    embedding_blob = serialize_embedding(query_embedding)
 
     # Build base query
-    query = """
-        SELECT l.*, le.distance
+    query = f"""
+        SELECT l.*, {vector_distance("le", config)}
         FROM lessons l
         JOIN lesson_embeddings le ON l.id = le.lesson_id
-        WHERE le.embedding MATCH ?
+        WHERE le.embedding MATCH {vector_param(config)}
         AND k = ?
     """
     params: list = [embedding_blob, limit * 2]  # Fetch extra for filtering
@@ -747,10 +738,8 @@ def search_resources(
     if config is None:
         config = get_config()
 
-    import struct
-
     query_embedding = embed_text(query, config)
-    embedding_blob = struct.pack(f"{len(query_embedding)}f", *query_embedding)
+    embedding_blob = serialize_embedding(query_embedding)
     query_versions = set(versions) if versions else set()
 
     with get_db(config) as conn:
@@ -758,11 +747,11 @@ def search_resources(
         best_by_resource: dict[str, SearchResult] = {}
 
         # --- Search whole resource embeddings ---
-        sql = """
-            SELECT r.*, re.distance
+        sql = f"""
+            SELECT r.*, {vector_distance("re", config)}
             FROM resources r
             JOIN resource_embeddings re ON r.id = re.resource_id
-            WHERE re.embedding MATCH ?
+            WHERE re.embedding MATCH {vector_param(config)}
             AND k = ?
         """
         params: list = [embedding_blob, limit * 3]
@@ -772,14 +761,14 @@ def search_resources(
             params.append(resource_type)
 
         if tag_filter:
-            placeholders = ",".join("?" * len(tag_filter))
+            placeholders, in_params = in_placeholders(tag_filter)
             sql += f"""
                 AND r.id IN (
                     SELECT resource_id FROM resource_tags
                     WHERE tag IN ({placeholders})
                 )
             """
-            params.extend(tag_filter)
+            params.extend(in_params)
 
         sql += " ORDER BY re.distance LIMIT ?"
         params.append(limit * 3)
@@ -794,13 +783,14 @@ def search_resources(
 
         # --- Search chunk embeddings ---
         if include_chunks:
-            chunk_sql = """
-                SELECT c.*, ce.distance, r.id as resource_id, r.title as resource_title,
-                       r.type as resource_type, r.path as resource_path
+            chunk_sql = f"""
+                SELECT c.*, {vector_distance("ce", config)}, r.id as resource_id,
+                       r.title as resource_title, r.type as resource_type,
+                       r.path as resource_path
                 FROM resource_chunks c
                 JOIN chunk_embeddings ce ON c.id = ce.chunk_id
                 JOIN resources r ON c.resource_id = r.id
-                WHERE ce.embedding MATCH ?
+                WHERE ce.embedding MATCH {vector_param(config)}
                 AND k = ?
             """
             chunk_params: list = [embedding_blob, limit * 5]
@@ -810,14 +800,14 @@ def search_resources(
                 chunk_params.append(resource_type)
 
             if tag_filter:
-                placeholders = ",".join("?" * len(tag_filter))
+                placeholders, in_params = in_placeholders(tag_filter)
                 chunk_sql += f"""
                     AND r.id IN (
                         SELECT resource_id FROM resource_tags
                         WHERE tag IN ({placeholders})
                     )
                 """
-                chunk_params.extend(tag_filter)
+                chunk_params.extend(in_params)
 
             chunk_sql += " ORDER BY ce.distance LIMIT ?"
             chunk_params.append(limit * 5)
@@ -973,10 +963,8 @@ def search_resources_grouped(
     if config is None:
         config = get_config()
 
-    import struct
-
     query_embedding = embed_text(query, config)
-    embedding_blob = struct.pack(f"{len(query_embedding)}f", *query_embedding)
+    embedding_blob = serialize_embedding(query_embedding)
     query_versions = set(versions) if versions else set()
 
     with get_db(config) as conn:
@@ -987,13 +975,14 @@ def search_resources_grouped(
         resource_level_matches: dict[str, ResourceResult] = {}
 
         # --- Search chunk embeddings first (primary) ---
-        chunk_sql = """
-            SELECT c.*, ce.distance, r.id as resource_id, r.title as resource_title,
-                   r.type as resource_type, r.path as resource_path
+        chunk_sql = f"""
+            SELECT c.*, {vector_distance("ce", config)}, r.id as resource_id,
+                   r.title as resource_title, r.type as resource_type,
+                   r.path as resource_path
             FROM resource_chunks c
             JOIN chunk_embeddings ce ON c.id = ce.chunk_id
             JOIN resources r ON c.resource_id = r.id
-            WHERE ce.embedding MATCH ?
+            WHERE ce.embedding MATCH {vector_param(config)}
             AND k = ?
         """
         chunk_params: list = [embedding_blob, limit * 10]
@@ -1003,14 +992,14 @@ def search_resources_grouped(
             chunk_params.append(resource_type)
 
         if tag_filter:
-            placeholders = ",".join("?" * len(tag_filter))
+            placeholders, in_params = in_placeholders(tag_filter)
             chunk_sql += f"""
                 AND r.id IN (
                     SELECT resource_id FROM resource_tags
                     WHERE tag IN ({placeholders})
                 )
             """
-            chunk_params.extend(tag_filter)
+            chunk_params.extend(in_params)
 
         chunk_sql += " ORDER BY ce.distance LIMIT ?"
         chunk_params.append(limit * 10)
@@ -1026,11 +1015,11 @@ def search_resources_grouped(
                 resources_with_chunks.add(result.resource_id)
 
         # --- Search resource embeddings for resources without chunk matches ---
-        resource_sql = """
-            SELECT r.*, re.distance
+        resource_sql = f"""
+            SELECT r.*, {vector_distance("re", config)}
             FROM resources r
             JOIN resource_embeddings re ON r.id = re.resource_id
-            WHERE re.embedding MATCH ?
+            WHERE re.embedding MATCH {vector_param(config)}
             AND k = ?
         """
         resource_params: list = [embedding_blob, limit * 3]
@@ -1040,14 +1029,14 @@ def search_resources_grouped(
             resource_params.append(resource_type)
 
         if tag_filter:
-            placeholders = ",".join("?" * len(tag_filter))
+            placeholders, in_params = in_placeholders(tag_filter)
             resource_sql += f"""
                 AND r.id IN (
                     SELECT resource_id FROM resource_tags
                     WHERE tag IN ({placeholders})
                 )
             """
-            resource_params.extend(tag_filter)
+            resource_params.extend(in_params)
 
         resource_sql += " ORDER BY re.distance LIMIT ?"
         resource_params.append(limit * 3)
@@ -1245,14 +1234,13 @@ def search_rules(
 
     with get_db(config) as conn:
         # Get approved rules that have tag overlap
-        placeholders = ",".join("?" * len(relevant_tags))
+        placeholders, params = in_placeholders(sorted(relevant_tags))
         sql = f"""
             SELECT DISTINCT r.* FROM rules r
             JOIN rule_tags rt ON r.id = rt.rule_id
             WHERE r.approved = 1
             AND rt.tag IN ({placeholders})
         """
-        params = list(relevant_tags)
 
         cursor = conn.execute(sql, params)
         rows = cursor.fetchall()
@@ -1267,11 +1255,9 @@ def search_rules(
                 score = min(1.0, score)  # Cap at 1.0 for consistent result scoring
 
             # Get tags
-            cursor = conn.execute(
-                "SELECT tag FROM rule_tags WHERE rule_id = ?",
-                (row["id"],)
+            tags = fetch_column(
+                conn, "SELECT tag FROM rule_tags WHERE rule_id = ?", (row["id"],)
             )
-            tags = [r["tag"] for r in cursor.fetchall()]
 
             results.append(RuleResult(
                 id=row["id"],
@@ -1326,12 +1312,12 @@ def _apply_link_boosting(
         for result in results:
             if result.result_type == "lesson":
                 # Check for linked resources (lesson→resource edges)
-                cursor = conn.execute(
+                linked_resource_ids = fetch_column(
+                    conn,
                     """SELECT to_id FROM edges
                        WHERE from_id = ? AND from_type = 'lesson' AND to_type = 'resource'""",
-                    (result.id,)
+                    (result.id,),
                 )
-                linked_resource_ids = [row["to_id"] for row in cursor.fetchall()]
 
                 # Find best score from linked resources (only if above threshold)
                 best_linked_score = 0.0
@@ -15,8 +15,10 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from ai_lessons import core
 from ai_lessons.config import Config, EmbeddingConfig, SearchConfig
 from ai_lessons.db import init_db
+from ai_lessons.embeddings import EmbeddingBackend
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -27,7 +29,7 @@ if TYPE_CHECKING:
 # -----------------------------------------------------------------------------
 
 
-class MockEmbedder:
+class MockEmbedder(EmbeddingBackend):
     """Mock embedder that returns deterministic vectors without loading models.
 
     This dramatically speeds up tests by avoiding SentenceTransformers model loading.
@@ -84,9 +86,12 @@ def patched_embedder() -> Generator[MockEmbedder, None, None]:
     """
     mock = MockEmbedder()
 
+    # Don't let mock vectors leak into (or out of) the content-hash cache
+    core._embedding_cache.clear()
     with patch("ai_lessons.embeddings.get_embedder", return_value=mock), \
          patch("ai_lessons.embeddings._embedder", mock):
         yield mock
+    core._embedding_cache.clear()
 
 
 # -----------------------------------------------------------------------------
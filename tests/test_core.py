@@ -46,11 +46,70 @@ class TestCRUD:
         assert "test" in lesson.tags
         assert lesson.confidence == "high"
 
+    def test_get_lessons(self, fast_config):
+        """Test getting several lessons at once, in request order."""
+        first = core.add_lesson("First", "One.", tags=["a"], config=fast_config)
+        second = core.add_lesson("Second", "Two.", contexts=["ctx"], config=fast_config)
+
+        lessons = core.get_lessons([second, "missing", first, second], config=fast_config)
+
+        assert [lesson.id for lesson in lessons] == [second, first]
+        assert lessons[0].contexts == ["ctx"]
+        assert lessons[1].tags == ["a"]
+
+    def test_get_lesson_contexts(self, fast_config):
+        """Test contexts and anti-contexts round-trip through get_lesson."""
+        lesson_id = core.add_lesson(
+            title="Context Test",
+            content="Content for context test.",
+            contexts=["linux", "bash scripts"],
+            anti_contexts=["windows"],
+            config=fast_config,
+        )
+
+        lesson = core.get_lesson(lesson_id, config=fast_config)
+
+        assert set(lesson.contexts) == {"linux", "bash scripts"}
+        assert lesson.anti_contexts == ["windows"]
+        assert lesson.tags == []
+
+    def test_resolve_tag_aliases(self, fast_config):
+        """Test aliases resolve and duplicates collapse in first-seen order."""
+        fast_config.tag_aliases = {"js": "javascript"}
+
+        resolved = core._resolve_tag_aliases(
+            [" Python", "js", "javascript", "python", "bash"], fast_config
+        )
+
+        assert resolved == ["python", "javascript", "bash"]
+
+    def test_loaded_tag_aliases_are_normalized(self, fast_config, temp_dir):
+        """Test alias keys and targets are normalized on load and construction."""
+        from ai_lessons.config import Config
+
+        config_path = temp_dir / "config.yaml"
+        config_path.write_text("tag_aliases:\n  JS: JavaScript\n  ' Py ': python\n")
+
+        config = Config.load(config_path)
+
+        assert config.tag_aliases == {"js": "javascript", "py": "python"}
+        assert core._resolve_tag_aliases(["js", "PY"], config) == ["javascript", "python"]
+
+        built = Config(tag_aliases={" TS ": "TypeScript"})
+        assert built.tag_aliases == {"ts": "typescript"}
+
     def test_get_nonexistent_lesson(self, fast_config):
         """Test getting a lesson that doesn't exist."""
         lesson = core.get_lesson("nonexistent-id", config=fast_config)
         assert lesson is None
 
+    def test_update_delete_nonexistent_lesson(self, fast_config):
+        """Test updating or deleting a missing lesson reports not found."""
+        assert core.update_lesson("nonexistent-id", title="X", config=fast_config) is False
+        assert core.update_lesson("nonexistent-id", confidence="high", config=fast_config) is False
+        assert core.update_lesson("nonexistent-id", tags=["x"], config=fast_config) is False
+        assert core.delete_lesson("nonexistent-id", config=fast_config) is False
+
     def test_update_lesson(self, fast_config):
         """Test updating a lesson."""
         lesson_id = core.add_lesson(
@@ -74,6 +133,127 @@ class TestCRUD:
         assert "updated" in lesson.tags
         assert "original" not in lesson.tags
 
+    def test_update_lesson_tags_and_contexts(self, fast_config):
+        """Test overlapping tag/context updates keep, add, and drop the right rows."""
+        lesson_id = core.add_lesson(
+            title="Diff Test",
+            content="Content for diff test.",
+            tags=["keep", "drop"],
+            contexts=["linux", "ci"],
+            anti_contexts=["windows"],
+            config=fast_config,
+        )
+
+        core.update_lesson(
+            lesson_id=lesson_id,
+            tags=["keep", "new"],
+            contexts=["linux", "macos"],
+            anti_contexts=["windows"],
+            config=fast_config,
+        )
+
+        lesson = core.get_lesson(lesson_id, config=fast_config)
+        assert set(lesson.tags) == {"keep", "new"}
+        assert set(lesson.contexts) == {"linux", "macos"}
+        assert lesson.anti_contexts == ["windows"]
+
+        core.update_lesson(lesson_id=lesson_id, tags=[], contexts=["linux"], config=fast_config)
+
+        lesson = core.get_lesson(lesson_id, config=fast_config)
+        assert lesson.tags == []
+        assert lesson.contexts == ["linux"]
+        assert lesson.anti_contexts == []
+
+    def test_unchanged_text_is_not_reembedded(self, fast_config, patched_embedder):
+        """Test no-op updates and repeated content reuse the cached embedding."""
+        lesson_id = core.add_lesson(
+            title="Cache Test",
+            content="Content for cache test.",
+            config=fast_config,
+        )
+        assert patched_embedder.call_count == 1
+
+        core.update_lesson(lesson_id, title="Cache Test", config=fast_config)
+        core.add_lesson(
+            title="Cache Test",
+            content="Content for cache test.",
+            config=fast_config,
+        )
+        assert patched_embedder.call_count == 1
+
+        core.update_lesson(lesson_id, content="New content.", config=fast_config)
+        assert patched_embedder.call_count == 2
+
+    def test_add_lessons_batch(self, fast_config):
+        """Test adding several lessons in one batch."""
+        lesson_ids = core.add_lessons_batch(
+            [
+                core.LessonInput(
+                    title="Batch One",
+                    content="First batch lesson.",
+                    tags=["batch", "one"],
+                    contexts=["ci"],
+                    anti_contexts=["local"],
+                ),
+                core.LessonInput(title="Batch Two", content="Second batch lesson."),
+            ],
+            config=fast_config,
+        )
+
+        assert len(lesson_ids) == 2
+        first = core.get_lesson(lesson_ids[0], config=fast_config)
+        assert first.title == "Batch One"
+        assert set(first.tags) == {"batch", "one"}
+        assert first.contexts == ["ci"]
+        assert first.anti_contexts == ["local"]
+        assert core.get_lesson(lesson_ids[1], config=fast_config).title == "Batch Two"
+
+        results = core.recall("Second batch lesson", strategy="semantic", config=fast_config)
+        assert lesson_ids[1] in [r.id for r in results]
+
+    def test_generated_ids_sort_in_creation_order(self):
+        """Test IDs are valid prefixed ULIDs that sort in creation order."""
+        ids = [core.generate_entity_id("lesson") for _ in range(1000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == len(ids)
+        for lesson_id in ids[:10]:
+            assert lesson_id.startswith("LSN")
+            assert len(lesson_id) == 29
+            assert set(lesson_id[3:]) <= set("0123456789ABCDEFGHJKMNPQRSTVWXYZ")
+
+    def test_add_lessons_batch_embeds_in_slices(self, fast_config, patched_embedder):
+        """Test batch_size bounds the texts sent per embedding call."""
+        from unittest.mock import patch
+
+        lessons = [core.LessonInput(title=f"Slice {i}", content=f"Body {i}.") for i in range(5)]
+
+        with patch.object(patched_embedder, "embed_batch", wraps=patched_embedder.embed_batch) as spy:
+            core.add_lessons_batch(lessons, config=fast_config, batch_size=2)
+
+        assert [len(call.args[0]) for call in spy.call_args_list] == [2, 2, 1]
+
+    def test_add_lessons_batch_rejects_empty(self, fast_config):
+        """Test one invalid lesson rejects the whole batch."""
+        with pytest.raises(ValueError):
+            core.add_lessons_batch(
+                [core.LessonInput(title="Fine", content="Fine."), core.LessonInput(title="", content="x")],
+                config=fast_config,
+            )
+
+        assert core.list_lessons(config=fast_config) == []
+
+    def test_tags_saved_for_short_and_long_lists(self, fast_config):
+        """Test tag lists on both sides of the multi-row insert cutoff."""
+        few = [f"tag-{i}" for i in range(7)]
+        many = [f"tag-{i}" for i in range(core.MULTI_INSERT_MAX_ROWS + 3)]
+
+        few_id = core.add_lesson("Few", "Content.", tags=few, config=fast_config)
+        many_id = core.add_lesson("Many", "Content.", tags=many, config=fast_config)
+
+        assert sorted(core.get_lesson(few_id, config=fast_config).tags) == sorted(few)
+        assert sorted(core.get_lesson(many_id, config=fast_config).tags) == sorted(many)
+
     def test_delete_lesson(self, fast_config):
         """Test deleting a lesson."""
         lesson_id = core.add_lesson(
@@ -89,6 +269,46 @@ class TestCRUD:
         assert lesson is None
 
 
+class TestInitialization:
+    """Test database initialization is done once per database."""
+
+    def test_init_runs_once_per_database_file(self, fast_config):
+        """Test init_db is skipped after the first call until the file is replaced."""
+        from unittest.mock import patch
+
+        from ai_lessons import db
+
+        with patch.object(core, "init_db", wraps=core.init_db) as spy:
+            core.ensure_initialized(fast_config)
+            core.list_tags(config=fast_config)
+            core.list_sources(config=fast_config)
+            assert spy.call_count == 1
+
+            db._close_cached_connection()
+            fast_config.db_path.unlink()
+            core.ensure_initialized(fast_config)
+            assert spy.call_count == 2
+            assert core.list_sources(config=fast_config)
+
+    def test_outdated_file_in_place_is_migrated(self, fast_config):
+        """Test a file whose schema falls behind keeps its identity but is re-initialized."""
+        from unittest.mock import patch
+
+        from ai_lessons.db import get_db, get_schema_version
+        from ai_lessons.schema import SCHEMA_VERSION
+
+        core.ensure_initialized(fast_config)
+        # As if an older backup had been copied over the database
+        with get_db(fast_config) as conn:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+
+        with patch.object(core, "init_db", wraps=core.init_db) as spy:
+            core.ensure_initialized(fast_config)
+            core.ensure_initialized(fast_config)
+            assert spy.call_count == 1
+        assert get_schema_version(fast_config) == SCHEMA_VERSION
+
+
 class TestSearch:
     """Test search functionality."""
 
@@ -199,6 +419,14 @@ class TestReferenceTables:
         assert levels[0].name == "very-low"
         assert levels[4].name == "very-high"
 
+    def test_add_source_duplicate(self, fast_config):
+        """Test adding a source type twice reports the duplicate."""
+        assert core.add_source("pairing", "Learned while pairing", config=fast_config) is True
+        assert core.add_source("pairing", config=fast_config) is False
+
+        sources = [s for s in core.list_sources(config=fast_config) if s.name == "pairing"]
+        assert sources[0].description == "Learned while pairing"
+
     def test_list_tags(self, fast_config):
         """Test listing tags."""
         core.add_lesson(
@@ -215,6 +443,29 @@ class TestReferenceTables:
         assert "alpha" in tag_names
         assert "beta" in tag_names
 
+    def test_list_tags_counts_track_writes(self, fast_config):
+        """Tag counts follow adds, tag updates, and deletes."""
+        first = core.add_lesson("One", "Content.", tags=["alpha", "beta"], config=fast_config)
+        second = core.add_lesson("Two", "Content.", tags=["alpha"], config=fast_config)
+
+        counts = {t.name: t.count for t in core.list_tags(with_counts=True, config=fast_config)}
+        assert counts == {"alpha": 2, "beta": 1}
+
+        core.update_lesson(second, tags=["gamma"], config=fast_config)
+        core.delete_lesson(first, config=fast_config)
+
+        counts = {t.name: t.count for t in core.list_tags(with_counts=True, config=fast_config)}
+        assert counts == {"gamma": 1}
+        assert [t.name for t in core.list_tags(config=fast_config)] == ["gamma"]
+
+    def test_list_tag_columns(self, fast_config):
+        """Test columnar tag listing matches list_tags ordering."""
+        core.add_lesson("One", "Content.", tags=["beta", "alpha"], config=fast_config)
+        core.add_lesson("Two", "Content.", tags=["beta"], config=fast_config)
+
+        assert core.list_tag_columns(with_counts=True, config=fast_config) == (["beta", "alpha"], [2, 1])
+        assert core.list_tag_columns(config=fast_config)[0] == ["alpha", "beta"]
+
 
 # --- v2 Tests ---
 
@@ -236,6 +487,24 @@ class TestResources:
         assert resource_id is not None
         assert len(resource_id) > 0
 
+    def test_update_resource(self, fast_config):
+        """Test updating resource metadata, and a missing resource."""
+        resource_id = core.add_resource(
+            type="doc",
+            title="Updatable Doc",
+            content="Some content.",
+            versions=["v2"],
+            tags=["old"],
+            config=fast_config,
+        )
+
+        assert core.update_resource(resource_id, tags=["new"], versions=["v3"], config=fast_config)
+        resource = core.get_resource(resource_id, config=fast_config)
+        assert resource.tags == ["new"]
+        assert resource.versions == ["v3"]
+
+        assert core.update_resource("nonexistent", tags=["x"], config=fast_config) is False
+
     def test_add_doc_without_version_defaults_to_unversioned(self, fast_config):
         """Test that docs without versions default to 'unversioned'."""
         resource_id = core.add_resource(
@@ -326,6 +595,54 @@ class TestResources:
 
         resource = core.get_resource(resource_id, config=fast_config)
         assert resource is None
+        assert core.delete_resource(resource_id, config=fast_config) is False
+
+    def test_refresh_resource_skips_unchanged_content(self, fast_config, patched_embedder, temp_dir):
+        """Test refreshing re-embeds only when the file's content changed."""
+        path = temp_dir / "refresh.sh"
+        path.write_text("echo one\n")
+        resource_id = core.add_resource(
+            type="script", title="Refresh", path=str(path), config=fast_config
+        )
+        calls = patched_embedder.call_count
+
+        assert core.refresh_resource(resource_id, config=fast_config) is True
+        assert patched_embedder.call_count == calls
+
+        path.write_text("echo two\n")
+        assert core.refresh_resource(resource_id, config=fast_config) is True
+        assert patched_embedder.call_count == calls + 1
+        assert core.get_resource(resource_id, config=fast_config).content == "echo two\n"
+
+        assert core.refresh_resource("nonexistent-id", config=fast_config) is False
+
+    def test_reindex_resources(self, fast_config, patched_embedder, temp_dir):
+        """Test reindexing re-embeds resources and chunks and picks up file changes."""
+        from ai_lessons.db import get_db
+
+        path = temp_dir / "reindex.md"
+        path.write_text("# Reindex\n\nOld content.\n")
+        file_id = core.add_resource(type="doc", title="File", path=str(path), config=fast_config)
+        core.add_resource(type="doc", title="Inline", content="Inline content.", config=fast_config)
+        path.write_text("# Reindex\n\nNew content.\n")
+        core._embedding_cache.clear()
+        calls = patched_embedder.call_count
+
+        assert core.reindex_resources(config=fast_config) == 2
+
+        # One text per resource and per chunk
+        with get_db(fast_config) as conn:
+            chunk_count = conn.execute("SELECT COUNT(*) FROM resource_chunks").fetchone()[0]
+            counts = [
+                conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("resource_embeddings", "chunk_embeddings")
+            ]
+        assert patched_embedder.call_count == calls + 2 + chunk_count
+        assert counts == [2, chunk_count]
+        assert "New content." in core.get_resource(file_id, config=fast_config).content
+
+        assert core.reindex_resources([file_id], config=fast_config) == 1
+        assert core.reindex_resources([], config=fast_config) == 0
 
     def test_multi_version_resource(self, fast_config):
         """Test resource with multiple versions."""
@@ -340,6 +657,214 @@ class TestResources:
         resource = core.get_resource(resource_id, config=fast_config)
         assert set(resource.versions) == {"v2", "v3", "v4"}
 
+    def test_update_resource_paths(self, fast_config, temp_dir):
+        """Test rewriting resource and anchor paths after files move."""
+        old_dir = temp_dir / "old"
+        old_dir.mkdir()
+        (old_dir / "target.md").write_text("# Target\n\nTarget content.")
+        (old_dir / "source.md").write_text("# Source\n\nSee [target](target.md).")
+
+        target_id = core.add_resource(
+            type="doc", title="Target", path=str(old_dir / "target.md"), config=fast_config
+        )
+        core.add_resource(
+            type="doc", title="Source", path=str(old_dir / "source.md"), config=fast_config
+        )
+
+        new_prefix = str(temp_dir / "new")
+        counts = core.update_resource_paths(
+            str(old_dir), new_prefix, dry_run=True, config=fast_config
+        )
+        assert counts == {"resources": 2, "anchors": 1}
+        assert core.get_resource(target_id, config=fast_config).path == str(old_dir / "target.md")
+
+        counts = core.update_resource_paths(str(old_dir), new_prefix, config=fast_config)
+        assert counts == {"resources": 2, "anchors": 1}
+        assert core.get_resource(target_id, config=fast_config).path == f"{new_prefix}/target.md"
+
+        links = core.get_resource_links(
+            core.get_resource_by_path(f"{new_prefix}/source.md", config=fast_config).id,
+            config=fast_config,
+        )
+        assert [link.to_path for link in links] == [f"{new_prefix}/target.md"]
+
+    def test_git_ref_matches_rev_parse(self, temp_dir):
+        """Test reading HEAD from the git dir agrees with git, loose or packed."""
+        import shutil
+        import subprocess
+
+        if shutil.which("git") is None:
+            pytest.skip("git not installed")
+
+        def git(*args):
+            return subprocess.run(
+                ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                cwd=temp_dir, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+
+        git("init", "-q")
+        (temp_dir / "docs").mkdir()
+        doc = temp_dir / "docs" / "doc.md"
+        doc.write_text("# Doc\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "init")
+        head = git("rev-parse", "HEAD")
+
+        assert core._get_git_ref(str(doc)) == head[:12]
+        git("pack-refs", "--all")
+        assert core._get_git_ref(str(doc)) == head[:12]
+
+
+    def test_get_resources(self, fast_config):
+        """Test bulk resource lookup keeps request order and skips missing IDs."""
+        first = core.add_resource(
+            type="doc", title="First", content="One.", tags=["api"], config=fast_config,
+        )
+        second = core.add_resource(
+            type="doc", title="Second", content="Two.", versions=["v3"], config=fast_config,
+        )
+
+        resources = core.get_resources([second, "missing", first, second], config=fast_config)
+        assert [r.id for r in resources] == [second, first]
+        assert resources[0].versions == ["v3"]
+        assert resources[1].tags == ["api"]
+        assert core.get_resources([], config=fast_config) == []
+
+    def test_list_resources_filters(self, fast_config):
+        """Test list_resources filters and returns versions and tags."""
+        core.add_resource(
+            type="doc", title="Beta Guide", content="Beta.",
+            versions=["v2", "v3"], tags=["api"], config=fast_config,
+        )
+        core.add_resource(
+            type="doc", title="Alpha Guide", content="Alpha.",
+            versions=["v3"], tags=["api", "auth"], config=fast_config,
+        )
+        core.add_resource(
+            type="doc", title="Gamma Notes", content="Gamma.",
+            versions=["v2"], config=fast_config,
+        )
+
+        resources = core.list_resources(config=fast_config)
+        assert [r.title for r in resources] == ["Alpha Guide", "Beta Guide", "Gamma Notes"]
+        assert sorted(resources[1].versions) == ["v2", "v3"]
+        assert resources[1].tags == ["api"]
+        assert resources[2].tags == []
+
+        assert [r.title for r in core.list_resources(tags=["api", "auth"], config=fast_config)] == [
+            "Alpha Guide", "Beta Guide",
+        ]
+        assert [r.title for r in core.list_resources(version="v2", config=fast_config)] == [
+            "Beta Guide", "Gamma Notes",
+        ]
+        assert [
+            r.title for r in core.list_resources(pattern="guide", version="v2", config=fast_config)
+        ] == ["Beta Guide"]
+
+    def test_list_resources_pattern_tracks_titles(self, fast_config, temp_dir):
+        """Test the title pattern matches substrings and follows renames and deletes."""
+        doc = temp_dir / "guide.md"
+        doc.write_text("# Guide\n")
+        resource_id = core.add_resource(
+            type="doc", title="Deployment Guide", path=str(doc), config=fast_config,
+        )
+        other_id = core.add_resource(
+            type="doc", title="Runbook", content="Steps.", config=fast_config,
+        )
+
+        assert [r.id for r in core.list_resources(pattern="PLOYM", config=fast_config)] == [resource_id]
+        assert [r.id for r in core.list_resources(pattern="un", config=fast_config)] == [other_id]
+
+        core.add_resource(type="doc", title="Release Handbook", path=str(doc), config=fast_config)
+        assert core.list_resources(pattern="deploy", config=fast_config) == []
+        assert [r.id for r in core.list_resources(pattern="handbook", config=fast_config)] == [resource_id]
+
+        core.delete_resource(resource_id, config=fast_config)
+        assert core.list_resources(pattern="handbook", config=fast_config) == []
+
+    def test_get_resource_refreshes_changed_script(self, fast_config, temp_dir):
+        """Test script resources pick up edits to the file on read."""
+        script = temp_dir / "deploy.sh"
+        script.write_text("#!/bin/sh\necho one\n")
+        resource_id = core.add_resource(
+            type="script", title="Deploy", path=str(script), config=fast_config,
+        )
+        original_hash = core.get_resource(resource_id, config=fast_config).content_hash
+
+        script.write_text("#!/bin/sh\necho two\n")
+        assert core.get_resource(resource_id, config=fast_config).content == "#!/bin/sh\necho two\n"
+
+        resource = core.get_resource(resource_id, config=fast_config)
+        assert resource.content == "#!/bin/sh\necho two\n"
+        assert resource.content_hash != original_hash
+
+    def test_script_refresh_embeds_outside_write_lock(self, fast_config, temp_dir):
+        """Test refreshing a changed script doesn't lock the database while embedding."""
+        from unittest.mock import patch
+
+        from ai_lessons.db import begin_write, get_db
+
+        script = temp_dir / "lock.sh"
+        script.write_text("#!/bin/sh\necho one\n")
+        resource_id = core.add_resource(
+            type="script", title="Lock", path=str(script), config=fast_config,
+        )
+        script.write_text("#!/bin/sh\necho two\n")
+
+        embed_batch_array = core.embed_batch_array
+
+        def embed_and_write(texts, config):
+            with get_db(config) as other:
+                begin_write(other)
+                other.rollback()
+            return embed_batch_array(texts, config)
+
+        with patch.object(core, "embed_batch_array", side_effect=embed_and_write) as spy:
+            assert core.get_resource(resource_id, config=fast_config).content == "#!/bin/sh\necho two\n"
+        assert spy.call_count == 1
+
+    def test_list_resources_refreshes_scripts_in_one_batch(self, fast_config, temp_dir):
+        """Test changed scripts found by one listing are re-embedded together."""
+        from unittest.mock import patch
+
+        scripts = [temp_dir / f"s{i}.sh" for i in range(3)]
+        for script in scripts:
+            script.write_text(f"echo {script.name}\n")
+            core.add_resource(
+                type="script", title=script.name, path=str(script), config=fast_config,
+            )
+        for script in scripts[:2]:
+            script.write_text(f"echo changed {script.name}\n")
+
+        with patch.object(core, "embed_batch_array", wraps=core.embed_batch_array) as spy:
+            resources = core.list_resources(resource_type="script", config=fast_config)
+        assert [len(call.args[0]) for call in spy.call_args_list] == [2]
+        assert [r.content for r in resources] == [
+            "echo changed s0.sh\n", "echo changed s1.sh\n", "echo s2.sh\n",
+        ]
+
+    def test_get_resource_skips_read_of_unchanged_script(self, fast_config, temp_dir):
+        """Test an unchanged mtime and size skip re-reading the script."""
+        import os
+        from pathlib import Path
+        from unittest.mock import patch
+
+        script = temp_dir / "build.sh"
+        script.write_text("#!/bin/sh\nmake\n")
+        resource_id = core.add_resource(
+            type="script", title="Build", path=str(script), config=fast_config,
+        )
+        core.get_resource(resource_id, config=fast_config)  # records the stat
+
+        with patch.object(Path, "read_text", wraps=script.read_text) as spy:
+            assert core.get_resource(resource_id, config=fast_config).content == "#!/bin/sh\nmake\n"
+        assert spy.call_count == 0
+
+        script.write_text("#!/bin/sh\nmake all\n")
+        st = script.stat()
+        os.utime(script, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert core.get_resource(resource_id, config=fast_config).content == "#!/bin/sh\nmake all\n"
+
 
 class TestRules:
     """Test rule operations (v2)."""
@@ -358,6 +883,51 @@ class TestRules:
         assert rule_id is not None
         assert len(rule_id) > 0
 
+    def test_update_rule(self, fast_config):
+        """Test updating a rule, and a missing rule."""
+        rule_id = core.suggest_rule("Old title", "Content.", "Why.", tags=["a"], config=fast_config)
+
+        assert core.update_rule(rule_id, title="New title", config=fast_config)
+        assert core.update_rule(rule_id, tags=["b"], config=fast_config)
+        rule = core.get_rule(rule_id, config=fast_config)
+        assert rule.title == "New title"
+        assert rule.tags == ["b"]
+
+        assert core.update_rule("nonexistent", title="x", config=fast_config) is False
+        assert core.update_rule("nonexistent", tags=["x"], config=fast_config) is False
+
+    def test_suggest_rule_duplicate_links(self, fast_config):
+        """Test repeated linked lesson IDs create a single edge."""
+        lesson_id = core.add_lesson("Linked", "Content.", config=fast_config)
+
+        rule_id = core.suggest_rule(
+            "Rule", "Content.", "Why.",
+            linked_lessons=[lesson_id, lesson_id],
+            config=fast_config,
+        )
+
+        assert core.get_rule(rule_id, config=fast_config).linked_lessons == [lesson_id]
+
+    def test_list_rules(self, fast_config):
+        """Test listing rules with filters, tags, and linked lessons."""
+        lesson_id = core.add_lesson("Linked", "Content.", config=fast_config)
+        pending_id = core.suggest_rule(
+            "Pending rule", "Content.", "Why.",
+            tags=["api"], linked_lessons=[lesson_id], config=fast_config,
+        )
+        approved_id = core.suggest_rule("Approved rule", "Content.", "Why.", config=fast_config)
+        core.approve_rule(approved_id, config=fast_config)
+
+        assert [r.id for r in core.list_rules(config=fast_config)] == [approved_id]
+
+        rules = core.list_rules(pattern="pending", pending=True, approved=False, config=fast_config)
+        assert [r.id for r in rules] == [pending_id]
+        assert rules[0].tags == ["api"]
+        assert rules[0].linked_lessons == [lesson_id]
+
+        rules = core.list_rules(tags=["api"], pending=True, config=fast_config)
+        assert [r.id for r in rules] == [pending_id]
+
     def test_suggest_rule_requires_rationale(self, fast_config):
         """Test that rules require rationale."""
         with pytest.raises(ValueError, match="Rationale is required"):
@@ -474,6 +1044,43 @@ class TestRules:
         assert rule2_id in pending_ids
         assert rule3_id not in pending_ids
 
+    def test_list_pending_rules_includes_tags_and_links(self, fast_config):
+        """Test pending rules carry their tags and linked entities."""
+        lesson_id = core.add_lesson(
+            title="Linked Lesson",
+            content="Lesson linked from a pending rule.",
+            config=fast_config,
+        )
+        resource_id = core.add_resource(
+            type="doc",
+            title="Linked Doc",
+            content="Doc linked from a pending rule.",
+            config=fast_config,
+        )
+        rule_id = core.suggest_rule(
+            title="Pending Linked Rule",
+            content="Content.",
+            rationale="Rationale.",
+            tags=["alpha", "beta"],
+            linked_lessons=[lesson_id],
+            linked_resources=[resource_id],
+            config=fast_config,
+        )
+        core.suggest_rule(
+            title="Pending Bare Rule",
+            content="Content.",
+            rationale="Rationale.",
+            config=fast_config,
+        )
+
+        pending = {r.id: r for r in core.list_pending_rules(config=fast_config)}
+
+        assert len(pending) == 2
+        rule = pending[rule_id]
+        assert set(rule.tags) == {"alpha", "beta"}
+        assert rule.linked_lessons == [lesson_id]
+        assert rule.linked_resources == [resource_id]
+
     def test_rule_with_linked_lesson(self, fast_config):
         """Test creating a rule linked to a lesson."""
         lesson_id = core.add_lesson(
@@ -732,6 +1339,109 @@ Content for section three.
 
         assert chunk_count >= 3  # At least 3 sections
 
+    def test_chunk_embedding_text_skips_breadcrumb_titles(self):
+        """Test the chunk title is dropped only when it is a breadcrumb header."""
+        assert core._chunk_embedding_text("Auth", "Doc > Auth > Tokens", "Body.") == "Doc > Auth > Tokens\n\nBody."
+        assert core._chunk_embedding_text("API", "API Reference", "Body.") == "API Reference\n\nAPI\n\nBody."
+        assert core._chunk_embedding_text("Intro", None, "Body.") == "Intro\n\nBody."
+
+    def test_resource_and_chunks_embedded_in_one_batch(self, fast_config, patched_embedder):
+        """Test that a document and its chunks share one embedding call."""
+        from unittest.mock import patch
+
+        from ai_lessons.chunking import ChunkingConfig
+
+        content = "# Title\n\n## One\n\nFirst.\n\n## Two\n\nSecond.\n\n## Three\n\nThird.\n"
+
+        with patch.object(patched_embedder, "embed_batch", wraps=patched_embedder.embed_batch) as spy:
+            resource_id = core.add_resource(
+                type="doc",
+                title="Batched Doc",
+                content=content,
+                chunking_config=ChunkingConfig(min_chunk_size=1),
+                config=fast_config,
+            )
+
+        chunks = core.list_chunks(resource_id, config=fast_config)
+        assert len(chunks) >= 3
+        assert [len(call.args[0]) for call in spy.call_args_list] == [len(chunks) + 1]
+
+    def test_chunks_carry_parent_metadata(self, fast_config, patched_embedder):
+        """Test get_chunk and list_chunks return parent title, versions, and tags."""
+        from ai_lessons.chunking import ChunkingConfig
+
+        resource_id = core.add_resource(
+            type="doc",
+            title="Parent Doc",
+            content="# Title\n\n## One\n\nFirst.\n\n## Two\n\nSecond.\n",
+            versions=["v2", "v3"],
+            tags=["api"],
+            chunking_config=ChunkingConfig(min_chunk_size=1),
+            config=fast_config,
+        )
+
+        chunks = core.list_chunks(resource_id, config=fast_config)
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+        assert len(chunks) >= 2
+        for chunk in chunks:
+            assert chunk.resource_title == "Parent Doc"
+            assert sorted(chunk.resource_versions) == ["v2", "v3"]
+            assert chunk.resource_tags == ["api"]
+
+        chunk = core.get_chunk(chunks[1].id, config=fast_config)
+        assert chunk.content == chunks[1].content
+        assert sorted(chunk.resource_versions) == ["v2", "v3"]
+
+        bare = core.get_chunk(chunks[1].id, include_parent=False, config=fast_config)
+        assert bare.resource_title is None
+        assert bare.resource_tags == []
+
+        assert core.get_chunk(f"{resource_id}.999", config=fast_config) is None
+        assert core.list_chunks("missing", config=fast_config) == []
+
+    def test_reimport_reembeds_only_changed_chunks(self, fast_config, patched_embedder, temp_dir):
+        """Test re-importing a file keeps embeddings of unchanged chunks."""
+        from ai_lessons.chunking import ChunkingConfig
+        from ai_lessons.db import get_db
+
+        path = temp_dir / "reimport.md"
+        path.write_text("# Title\n\n## One\n\nFirst.\n\n## Two\n\nSecond.\n")
+        chunking_config = ChunkingConfig(min_chunk_size=1)
+        resource_id = core.add_resource(
+            type="doc", title="Reimport", path=str(path),
+            chunking_config=chunking_config, config=fast_config,
+        )
+        # Start cold, as a fresh process re-importing the file would
+        core._embedding_cache.clear()
+        calls = patched_embedder.call_count
+
+        core.add_resource(
+            type="doc", title="Reimport", path=str(path),
+            chunking_config=chunking_config, config=fast_config,
+        )
+        assert patched_embedder.call_count == calls
+
+        path.write_text("# Title\n\n## One\n\nFirst.\n\n## Two\n\nChanged.\n")
+        core.add_resource(
+            type="doc", title="Reimport", path=str(path),
+            chunking_config=chunking_config, config=fast_config,
+        )
+        # The resource text and the changed chunk
+        assert patched_embedder.call_count == calls + 2
+
+        chunks = core.list_chunks(resource_id, config=fast_config)
+        with get_db(fast_config) as conn:
+            embedded = {
+                row["chunk_id"]
+                for row in conn.execute("SELECT chunk_id FROM chunk_embeddings").fetchall()
+            }
+            resource_embeddings = conn.execute(
+                "SELECT COUNT(*) FROM resource_embeddings WHERE resource_id = ?",
+                (resource_id,),
+            ).fetchone()[0]
+        assert embedded == {chunk.id for chunk in chunks}
+        assert resource_embeddings == 1
+
     def test_chunks_have_metadata(self, fast_config):
         """Test that chunks have breadcrumb and line info."""
         from ai_lessons.chunking import ChunkingConfig
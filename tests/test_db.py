@@ -104,3 +104,377 @@ class TestMigrations:
         assert current < Version("1.0.0"), (
             f"Version {current} is >= 1.0.0, migration tests should be implemented"
         )
+
+
+class TestSchemaUpgrade:
+    """Test upgrading databases from earlier schema versions."""
+
+    def test_pre_v12_database_is_rejected(self, fast_config):
+        """Databases older than v12 are rejected without being migrated."""
+        from ai_lessons.db import get_db, get_schema_version, init_db
+
+        with get_db(fast_config) as conn:
+            # As stamped by releases before user_version was kept
+            conn.execute("PRAGMA user_version = 0")
+            conn.execute("UPDATE meta SET value = '11' WHERE key = 'schema_version'")
+            conn.commit()
+
+        with pytest.raises(RuntimeError, match="fresh database"):
+            init_db(fast_config)
+        assert get_schema_version(fast_config) == 11
+
+    def test_schema_version_in_header(self, fast_config):
+        """The version is kept in user_version, backfilled for older databases."""
+        from ai_lessons.db import SCHEMA_VERSION, get_db, get_schema_version, init_db
+
+        with get_db(fast_config) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+            conn.execute("PRAGMA user_version = 0")
+
+        assert get_schema_version(fast_config) == SCHEMA_VERSION
+        init_db(fast_config)
+        with get_db(fast_config) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    def test_add_columns_is_idempotent(self, fast_config):
+        """Existing columns are skipped; other errors still raise."""
+        from ai_lessons.db import _add_columns, get_db, sqlite3
+
+        with get_db(fast_config) as conn:
+            _add_columns(conn, "resources", ["file_size INTEGER", "extra TEXT"])
+            _add_columns(conn, "resources", ["extra TEXT"])
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(resources)")]
+            with pytest.raises(sqlite3.OperationalError):
+                _add_columns(conn, "no_such_table", ["extra TEXT"])
+
+        assert columns.count("file_size") == 1
+        assert "extra" in columns
+
+    def test_current_database_skips_schema_script(self, fast_config):
+        """Initializing an up-to-date database runs no DDL or meta writes."""
+        from ai_lessons.db import get_db, init_db
+
+        statements = []
+        with get_db(fast_config) as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            init_db(fast_config)
+        finally:
+            with get_db(fast_config) as conn:
+                conn.set_trace_callback(None)
+
+        assert statements
+        assert not [sql for sql in statements if "CREATE TABLE" in sql or "INTO meta" in sql]
+
+
+class TestTransaction:
+    """Test grouping core writes into a single commit."""
+
+    def test_commits_all_writes_on_exit(self, fast_config):
+        """Writes inside the block are visible after it exits."""
+        from ai_lessons import core
+        from ai_lessons.db import transaction
+
+        with transaction(fast_config):
+            rule1 = core.suggest_rule("Rule 1", "Content.", "Why.", config=fast_config)
+            rule2 = core.suggest_rule("Rule 2", "Content.", "Why.", config=fast_config)
+            core.approve_rule(rule1, config=fast_config)
+
+        assert core.get_rule(rule1, config=fast_config).approved is True
+        assert core.get_rule(rule2, config=fast_config).approved is False
+
+    def test_rolls_back_on_error(self, fast_config):
+        """An exception inside the block discards every write in it."""
+        from ai_lessons import core
+        from ai_lessons.db import transaction
+
+        with pytest.raises(RuntimeError):
+            with transaction(fast_config):
+                rule_id = core.suggest_rule("Doomed", "Content.", "Why.", config=fast_config)
+                raise RuntimeError("abort")
+
+        assert core.get_rule(rule_id, config=fast_config) is None
+
+    def test_get_db_reuses_transaction_connection(self, fast_config):
+        """get_db() inside the block yields the transaction's connection."""
+        from ai_lessons.db import get_db, transaction
+
+        with transaction(fast_config) as tx:
+            with get_db(fast_config) as conn:
+                assert conn is tx
+            with transaction(fast_config) as nested:
+                assert nested is tx
+
+
+class TestExecuteQuery:
+    """Test the generic query helper."""
+
+    def test_row_factory(self, fast_config):
+        """Rows are sqlite3.Row by default and plain tuples on request."""
+        from ai_lessons.db import execute_query
+
+        sql = "SELECT name, ordinal FROM confidence_levels ORDER BY ordinal LIMIT 1"
+        row = execute_query(sql, config=fast_config)[0]
+        assert row["ordinal"] == row[1]
+
+        assert execute_query(sql, config=fast_config, row_factory=None) == [tuple(row)]
+
+
+class TestWriteBatch:
+    """Test running several writes in one transaction."""
+
+    def test_applies_all_writes(self, fast_config):
+        """Every statement is applied and their row counts are summed."""
+        from ai_lessons.db import execute_query, execute_write_batch
+
+        affected = execute_write_batch(
+            [
+                ("INSERT INTO source_types (name) VALUES (?)", ("batch-a",)),
+                ("INSERT INTO source_types (name) VALUES (?)", ("batch-b",)),
+                ("DELETE FROM source_types WHERE name = ?", ("batch-a",)),
+            ],
+            config=fast_config,
+        )
+
+        assert affected == 3
+        rows = execute_query(
+            "SELECT name FROM source_types WHERE name LIKE 'batch-%'", config=fast_config
+        )
+        assert [row["name"] for row in rows] == ["batch-b"]
+
+    def test_execute_many_is_atomic(self, fast_config):
+        """A failing row rolls back the rows executed before it."""
+        from ai_lessons.db import execute_many, execute_query, sqlite3
+
+        with pytest.raises(sqlite3.IntegrityError):
+            execute_many(
+                "INSERT INTO source_types (name) VALUES (?)",
+                [("batch-d",), ("batch-d",)],
+                config=fast_config,
+            )
+
+        assert execute_query(
+            "SELECT 1 FROM source_types WHERE name = 'batch-d'", config=fast_config
+        ) == []
+
+    def test_failure_applies_nothing(self, fast_config):
+        """A failing statement rolls back the ones before it."""
+        from ai_lessons.db import execute_query, execute_write_batch, sqlite3
+
+        with pytest.raises(sqlite3.OperationalError):
+            execute_write_batch(
+                [
+                    ("INSERT INTO source_types (name) VALUES (?)", ("batch-c",)),
+                    ("INSERT INTO no_such_table (name) VALUES (?)", ("x",)),
+                ],
+                config=fast_config,
+            )
+
+        rows = execute_query(
+            "SELECT 1 FROM source_types WHERE name = 'batch-c'", config=fast_config
+        )
+        assert rows == []
+
+
+class TestConnectionReuse:
+    """Test per-thread connection reuse in get_db()."""
+
+    def test_reuses_connection_across_blocks(self, fast_config):
+        """Sequential blocks share a connection; nested blocks get their own."""
+        from ai_lessons.db import get_db
+
+        with get_db(fast_config) as first:
+            with get_db(fast_config) as nested:
+                assert nested is not first
+        with get_db(fast_config) as second:
+            assert second is first
+
+    def test_uncommitted_writes_are_rolled_back(self, fast_config):
+        """Leaving a block without commit() discards its writes."""
+        from ai_lessons.db import get_db
+
+        with get_db(fast_config) as conn:
+            conn.execute("INSERT INTO source_types (name) VALUES ('uncommitted')")
+
+        with get_db(fast_config) as conn:
+            row = conn.execute("SELECT 1 FROM source_types WHERE name = 'uncommitted'").fetchone()
+            assert row is None
+
+
+class TestConnectionSettings:
+    """Test per-connection PRAGMAs."""
+
+    def test_pragmas(self, fast_config):
+        """Connections use WAL with NORMAL sync, in-memory temp storage and a larger cache."""
+        from ai_lessons.db import PAGE_CACHE_KIB, get_db
+
+        with get_db(fast_config) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # 1 = NORMAL, 2 = MEMORY
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -PAGE_CACHE_KIB
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+
+
+class TestEmbeddingStorage:
+    """Test int8-quantized embedding storage."""
+
+    def _int8_config(self, temp_dir):
+        from ai_lessons.config import Config, EmbeddingConfig, SearchConfig
+        from ai_lessons.db import init_db
+
+        config = Config(
+            db_path=temp_dir / "int8.db",
+            embedding=EmbeddingConfig(dimensions=384, storage="int8"),
+            search=SearchConfig(),
+        )
+        init_db(config)
+        return config
+
+    def test_int8_vector_search(self, temp_dir, patched_embedder):
+        """Lessons round-trip through int8 tables with float-scale distances."""
+        from ai_lessons import core
+        from ai_lessons.search import vector_search
+
+        config = self._int8_config(temp_dir)
+        lesson_id = core.add_lesson("Quantized", "Stored as int8.", config=config)
+
+        results = vector_search("Quantized\n\nStored as int8.", limit=1, config=config)
+
+        assert [r.id for r in results] == [lesson_id]
+        assert results[0].score > 0.9
+
+    def test_storage_mismatch_raises(self, temp_dir, patched_embedder):
+        """Opening an int8 database with float32 config is rejected."""
+        from ai_lessons.config import Config, EmbeddingConfig
+        from ai_lessons.db import init_db
+
+        config = self._int8_config(temp_dir)
+        float_config = Config(
+            db_path=config.db_path,
+            embedding=EmbeddingConfig(dimensions=384),
+        )
+
+        with pytest.raises(ValueError, match="storage mismatch"):
+            init_db(float_config)
+
+    def test_dimension_mismatch_and_force(self, fast_config):
+        """Other dimensions are rejected until force recreates the vector tables."""
+        from dataclasses import replace
+
+        from ai_lessons.db import get_db, init_db
+
+        other = replace(fast_config, embedding=replace(fast_config.embedding, dimensions=8))
+        with pytest.raises(ValueError, match="dimensions mismatch"):
+            init_db(other)
+
+        init_db(other, force=True)
+        init_db(other)
+        with get_db(other) as conn:
+            dims = conn.execute(
+                "SELECT value FROM meta WHERE key = 'embedding_dimensions'"
+            ).fetchone()[0]
+            tables = [
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE name LIKE '%_embeddings' ORDER BY name"
+                )
+            ]
+        assert dims == "8"
+        assert tables == ["chunk_embeddings", "lesson_embeddings", "resource_embeddings"]
+
+    def test_bulk_insert_embeddings_replaces(self, fast_config, patched_embedder):
+        """Bulk writes replace existing vectors and restore the saved sync level."""
+        from ai_lessons import core
+        from ai_lessons.db import bulk_insert_embeddings, get_db
+        from ai_lessons.embeddings import serialize_embedding
+
+        lesson_id = core.add_lesson("Bulk", "Replaced.", config=fast_config)
+        blob = serialize_embedding([1.0] + [0.0] * 383)
+
+        assert bulk_insert_embeddings("lesson_embeddings", [(lesson_id, blob)], fast_config) == 1
+        with pytest.raises(ValueError, match="Not a vector table"):
+            bulk_insert_embeddings("lessons", [], fast_config)
+
+        with get_db(fast_config) as conn:
+            rows = conn.execute("SELECT embedding FROM lesson_embeddings").fetchall()
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            conn.execute("PRAGMA synchronous=FULL")
+        assert [row[0] for row in rows] == [blob]
+
+        # relax_sync puts back whatever level the connection had
+        assert bulk_insert_embeddings(
+            "lesson_embeddings", [(lesson_id, blob)], fast_config, relax_sync=True
+        ) == 1
+        with get_db(fast_config) as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+    def test_quantize_existing_float32_database(self, fast_config, patched_embedder):
+        """Converting a float32 database keeps its vectors searchable as int8."""
+        from dataclasses import replace
+
+        from ai_lessons import core
+        from ai_lessons.db import quantize_embeddings
+        from ai_lessons.search import vector_search
+
+        lesson_id = core.add_lesson("Converted", "Was float32.", config=fast_config)
+
+        assert quantize_embeddings(fast_config) == 1
+        with pytest.raises(ValueError, match="already"):
+            quantize_embeddings(fast_config)
+
+        int8_config = replace(fast_config, embedding=replace(fast_config.embedding, storage="int8"))
+        results = vector_search("Converted\n\nWas float32.", limit=1, config=int8_config)
+
+        assert [r.id for r in results] == [lesson_id]
+        assert results[0].score > 0.9
+
+
+class TestInPlaceholders:
+    """Test bucketed IN-list placeholders."""
+
+    def test_pads_to_power_of_two(self):
+        """Lists are padded with NULLs to the next power of two."""
+        from ai_lessons.db import in_placeholders
+
+        assert in_placeholders(["a"]) == ("?", ["a"])
+        assert in_placeholders(["a", "b", "c"]) == ("?,?,?,?", ["a", "b", "c", None])
+        assert in_placeholders(list("abcd"))[0] == "?,?,?,?"
+        assert in_placeholders(list("abcde"))[0].count("?") == 8
+
+
+class TestFetchColumn:
+    """Test first-column query helper."""
+
+    def test_returns_first_column(self, fast_config):
+        """Values of the first column come back in result order."""
+        from ai_lessons.db import fetch_column, get_db
+
+        with get_db(fast_config) as conn:
+            values = fetch_column(conn, "SELECT value, 'x' FROM (SELECT 2 AS value UNION ALL SELECT 1) ORDER BY value")
+
+        assert values == [1, 2]
+
+
+class TestIndexes:
+    """Test hot lookups are served by indexes."""
+
+    @pytest.mark.parametrize(
+        ("sql", "index"),
+        [
+            ("SELECT id FROM resources WHERE path = ?", "idx_resources_path"),
+            (
+                "SELECT id FROM resource_chunks WHERE resource_id = ? ORDER BY chunk_index",
+                "idx_resource_chunks_order",
+            ),
+        ],
+    )
+    def test_query_uses_index(self, fast_config, sql, index):
+        """The query plan searches the index instead of scanning or sorting."""
+        from ai_lessons.db import get_db
+
+        with get_db(fast_config) as conn:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,))]
+
+        assert any(f"USING INDEX {index}" in step for step in plan)
+        assert not any(step.startswith("SCAN") or "TEMP B-TREE" in step for step in plan)
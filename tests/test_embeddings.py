@@ -0,0 +1,53 @@
+"""Tests for embedding helpers."""
+
+import numpy as np
+import pytest
+
+from ai_lessons import embeddings
+
+
+class TestNormalization:
+    """Test embeddings are returned unit length."""
+
+    def test_embed_text_is_unit_length(self, fast_config):
+        """embed_text() normalizes whatever the backend returns."""
+        vector = embeddings.embed_text("some text", fast_config)
+
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+
+    def test_embed_batch_is_unit_length(self, fast_config):
+        """embed_batch() normalizes every row."""
+        vectors = embeddings.embed_batch(["one", "two", "three"], fast_config)
+
+        assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0)
+
+    def test_embed_batch_array_matches_embed_batch(self, fast_config):
+        """embed_batch_array() returns the same unit vectors as a float32 matrix."""
+        texts = ["one", "two", "three"]
+        matrix = embeddings.embed_batch_array(texts, fast_config)
+
+        assert matrix.dtype == np.float32
+        assert np.allclose(matrix, embeddings.embed_batch(texts, fast_config))
+        assert embeddings.serialize_embedding(matrix[1]) == matrix[1].tobytes()
+
+    def test_zero_vector_is_left_alone(self):
+        """A zero vector doesn't divide by zero."""
+        assert embeddings._normalize([[0.0, 0.0]]) == [[0.0, 0.0]]
+
+
+class TestEmbedderCache:
+    """Test the global embedder is reused across calls."""
+
+    def test_backend_built_once_per_settings(self, fast_config, mock_embedder):
+        """Passing the same config doesn't rebuild the backend; a new model does."""
+        from unittest.mock import patch
+
+        with patch("ai_lessons.embeddings.get_embedder", return_value=mock_embedder) as factory, \
+             patch("ai_lessons.embeddings._embedder", None):
+            embeddings.embed_text("one", fast_config)
+            embeddings.embed_batch(["two", "three"], fast_config)
+            assert factory.call_count == 1
+
+            fast_config.embedding.model = "all-mpnet-base-v2"
+            embeddings.embed_text("four", fast_config)
+            assert factory.call_count == 2
@@ -0,0 +1,130 @@
+"""Tests for markdown link extraction."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from ai_lessons.chunking import Chunk, ChunkingConfig, chunk_document
+from ai_lessons.links import build_chunk_index, extract_links, find_chunk_for_line
+
+
+class TestExtractLinks:
+    """Test extracting markdown links from document content."""
+
+    def test_extracts_links_with_line_numbers(self, temp_dir):
+        """Relative, absolute and fragment links resolve with their line numbers."""
+        source = str(temp_dir / "docs" / "source.md")
+        content = (
+            "# Title\n"
+            "See [other](other.md) and [up](../up.md#intro).\n"
+            "\n"
+            "[abs](/srv/abs.md) then [here](#local-section)\n"
+        )
+
+        links = extract_links(content, source)
+
+        assert [(link.link_text, link.line_number) for link in links] == [
+            ("other", 2), ("up", 2), ("abs", 4), ("here", 4),
+        ]
+        other, up, absolute, here = links
+        assert other.absolute_path == str((temp_dir / "docs" / "other.md").resolve())
+        assert other.fragment is None
+        assert up.absolute_path == str((temp_dir / "up.md").resolve())
+        assert up.fragment == "intro"
+        assert absolute.absolute_path == "/srv/abs.md"
+        assert here.path == ""
+        assert here.absolute_path == source
+        assert here.fragment == "local-section"
+
+    def test_skips_urls_and_multiline_text(self, temp_dir):
+        """URLs, mailto links and link text broken across lines are ignored."""
+        content = (
+            "[web](https://example.com) [mail](mailto:a@b.c)\n"
+            "[broken\n"
+            "text](target.md)\n"
+        )
+
+        assert extract_links(content, str(temp_dir / "source.md")) == []
+
+    def test_resolves_repeated_targets_once(self, temp_dir, monkeypatch):
+        """A relative target linked several times is resolved only once."""
+        resolved = []
+        original_resolve = Path.resolve
+
+        def counting_resolve(self, *args, **kwargs):
+            resolved.append(self)
+            return original_resolve(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, "resolve", counting_resolve)
+        content = "[a](other.md) [b](other.md#x)\n[c](other.md) [d](/srv/abs.md)\n"
+
+        links = extract_links(content, str(temp_dir / "source.md"))
+
+        assert len(resolved) == 1
+        assert {link.absolute_path for link in links[:3]} == {
+            str(original_resolve(temp_dir / "other.md"))
+        }
+
+
+def _chunk(index: int, start_line: int, end_line: int) -> Chunk:
+    return Chunk(
+        index=index,
+        content="",
+        title=None,
+        breadcrumb=None,
+        start_line=start_line,
+        end_line=end_line,
+        token_count=0,
+    )
+
+
+class TestFindChunkForLine:
+    """Test locating the chunk that contains a line."""
+
+    def test_finds_containing_chunk(self):
+        """Lines map to their chunk; lines in gaps or past the end map to None."""
+        chunks = [_chunk(0, 0, 4), _chunk(1, 5, 9), _chunk(2, 12, 20)]
+        index = build_chunk_index(chunks)
+
+        found = {line: find_chunk_for_line(chunks, line, index) for line in range(1, 24)}
+
+        assert found[1] == found[5] == "0"
+        assert found[6] == found[10] == "1"
+        assert found[11] is None and found[12] is None
+        assert found[13] == found[21] == "2"
+        assert found[22] is None
+        assert find_chunk_for_line(chunks, 7) == "1"
+
+    def test_first_chunk_wins_on_shared_start(self):
+        """Chunks sharing a start line resolve to the first, as a linear scan would."""
+        chunks = [_chunk(0, 0, 0), _chunk(1, 0, 0), _chunk(2, 0, 0)]
+
+        assert find_chunk_for_line(chunks, 1) == "0"
+        assert find_chunk_for_line([], 1) is None
+
+    def test_overlapping_ranges_resolve_to_earlier_chunk(self):
+        """A line shared by two chunks belongs to the earlier one."""
+        chunks = [_chunk(0, 0, 13), _chunk(1, 13, 26), _chunk(2, 26, 39)]
+
+        assert find_chunk_for_line(chunks, 14) == "0"
+        assert find_chunk_for_line(chunks, 15) == "1"
+        assert find_chunk_for_line(chunks, 27) == "1"
+        assert find_chunk_for_line(chunks, 40) == "2"
+
+    def test_matches_linear_scan_for_fixed_size_chunks(self):
+        """Lookups agree with a front-to-back scan over overlapping fixed-size chunks."""
+        content = "\n".join(f"Sentence number {i} ends here." for i in range(200))
+        chunks = chunk_document(
+            content, ChunkingConfig(strategy="fixed", fixed_chunk_size=100)
+        ).chunks
+        index = build_chunk_index(chunks)
+
+        for line_number in range(1, 202):
+            expected = next(
+                (
+                    str(chunk.index) for chunk in chunks
+                    if chunk.start_line <= line_number - 1 <= chunk.end_line
+                ),
+                None,
+            )
+            assert find_chunk_for_line(chunks, line_number, index) == expected